@@ -2,9 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
-import time
 import subprocess
-import importlib
 from typing import Optional
 
 import customtkinter as ctk
@@ -16,9 +14,11 @@ from app_funcs import (
     list_skins,
     list_controllers,
     list_monitors,
-    send_update,
+    ControlClient,
+    SharedChannel,
     b64_encode_settings,
     run_as_overlay_mode,
+    run_as_sender_mode,
     skin_preview_ctk_image,
     monitor_preview_ctk_image,
     draw_layout_on_preview,
@@ -82,6 +82,18 @@ class App(ctk.CTk):
         self.selected_controller = 0
         self.overlay_proc: Optional[subprocess.Popen] = None
 
+        # Warm standby: keep a hidden, pre-initialized overlay process parked
+        # so Start/Stop only show/hide its window.
+        self.warm_standby = False
+        self._overlay_shown = False
+
+        # One long-lived control channel; rapid edits are coalesced per frame.
+        self.control = ControlClient(UDP_PORT)
+        self._control_flush_scheduled = False
+
+        # Same-machine shared memory transport for settings/status (optional).
+        self.use_shm = False
+
         # Preview state
         self.preview_size = (760, 340)
         self._preview_black = _make_black_ctk(self.preview_size)
@@ -108,6 +120,7 @@ class App(ctk.CTk):
         self._set_preview_black()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(100, self._poll_control)
 
     # =========================
     # Window behavior
@@ -129,22 +142,49 @@ class App(ctk.CTk):
     def _overlay_running(self) -> bool:
         return overlay_running(self.overlay_proc)
 
-    def _start_overlay_process(self, settings: dict):
+    def _start_overlay_process(self, settings: dict, standby: bool = False):
         if self._overlay_running():
             return
-        self.overlay_proc = start_overlay_process(settings, udp_port=UDP_PORT)
+        shm = None
+        if self.use_shm:
+            try:
+                shm = SharedChannel.create()
+            except Exception as e:
+                self._toast(f"Shared memory unavailable, using UDP ({e})")
+                shm = None
+
+        self.overlay_proc = start_overlay_process(
+            settings, udp_port=UDP_PORT, standby=standby, shm_name=shm.name if shm else None
+        )
+        self._overlay_shown = not standby
+
+        # The new process starts from these settings, so deltas build on them.
+        self.control.reset(settings, shm=shm)
 
     def _stop_overlay_process(self):
         stop_overlay_process(self.overlay_proc)
         self.overlay_proc = None
+        self._overlay_shown = False
+        self.control.detach_shm()
 
-    def _on_close(self):
-        self._stop_overlay_process()
-        self.destroy()
+    def _on_shm_toggle(self):
+        self.use_shm = bool(self.shm_switch.get())
+        if self._overlay_running():
+            self._toast("Transport change applies the next time the overlay starts.")
+
+    def _on_standby_toggle(self):
+        self.warm_standby = bool(self.standby_switch.get())
+        if self.warm_standby:
+            if not self._overlay_running():
+                self._start_overlay_process(self._build_settings(allow_empty=True) or {}, standby=True)
+                self._toast("Standby overlay warming up.")
+        elif self._overlay_running() and not self._overlay_shown:
+            self._stop_overlay_process()
+            self._toast("Standby overlay closed.")
 
     def _on_close(self):
-        stop_overlay_process(self.overlay_proc)
-        self.overlay_proc = None
+        self._stop_overlay_process()
+        self.control.close()
         self.destroy()
 
     # =========================
@@ -157,7 +197,35 @@ class App(ctk.CTk):
         s = self._build_settings(allow_empty=True)
         if not s:
             return
-        send_update(s)
+        self.control.submit(s)
+        if not self._control_flush_scheduled:
+            self._control_flush_scheduled = True
+            self.after(self.control.window_ms, self._flush_control)
+
+    def _flush_control(self):
+        self._control_flush_scheduled = False
+        self.control.flush()
+
+    def _poll_control(self):
+        if self.control.pump():
+            st = self.control.stats()
+            lat = st["latency"]
+            self.latency_label.configure(
+                text=f"Apply latency: last {lat['last_ms']:.1f} ms | p50 {lat['p50_ms']:.1f} ms | "
+                f"p95 {lat['p95_ms']:.1f} ms (frame {st['acked_frame']})  |  "
+                f"sent {st['sent']} / coalesced {st['coalesced']}"
+            )
+
+        status = self.control.status
+        if status is not None and self._overlay_running():
+            names = ", ".join(c["name"] for c in status["controllers"]) or "none"
+            self.status_label.configure(
+                text=f"Overlay: {status['fps']:.0f} fps | frame {status['frame_ms']:.2f} ms | controllers: {names}"
+            )
+        else:
+            self.status_label.configure(text="")
+
+        self.after(100, self._poll_control)
 
     # =========================
     # Data helpers
@@ -418,6 +486,22 @@ class App(ctk.CTk):
             row=0, column=1, padx=(8, 0), sticky="ew"
         )
 
+        self.standby_switch = ctk.CTkSwitch(
+            actions, text="Warm standby (instant Start/Stop)", command=self._on_standby_toggle
+        )
+        self.standby_switch.grid(row=1, column=0, columnspan=2, pady=(10, 0), sticky="w")
+
+        self.shm_switch = ctk.CTkSwitch(
+            actions, text="Shared-memory transport (same machine)", command=self._on_shm_toggle
+        )
+        self.shm_switch.grid(row=2, column=0, columnspan=2, pady=(6, 0), sticky="w")
+
+        self.latency_label = ctk.CTkLabel(actions, text="", text_color="#BBBBBB")
+        self.latency_label.grid(row=3, column=0, columnspan=2, pady=(6, 0), sticky="w")
+
+        self.status_label = ctk.CTkLabel(actions, text="", text_color="#BBBBBB")
+        self.status_label.grid(row=4, column=0, columnspan=2, sticky="w")
+
         # Right panel (skins)
         self._build_skins_panel(main)
 
@@ -553,9 +637,9 @@ class App(ctk.CTk):
 
     def _assign_skin(self, skin_name: str):
         try:
-            importlib.import_module(f"skins.{skin_name}")
+            overlay.load_skin(skin_name)
         except Exception as e:
-            self._toast(f"Skin import failed: skins.{skin_name} ({e})")
+            self._toast(f"Skin load failed: {skin_name} ({e})")
             return
 
         used = self._used_corners()
@@ -644,12 +728,28 @@ class App(ctk.CTk):
 
         self._set_preview_black()
 
+        if self._overlay_running():
+            if self._overlay_shown:
+                # Already up: Start pushes the current settings, as it always did.
+                self.control.submit(settings)
+                self.control.flush()
+                self._toast("Overlay updated.")
+                return
+            self.control.show(settings)
+            self._overlay_shown = True
+            self._toast("Overlay running (standby).")
+            return
+
         self._start_overlay_process(settings)
-        time.sleep(0.15)
-        send_update(settings)
         self._toast("Overlay running.")
 
     def _stop(self):
+        if self.warm_standby and self._overlay_running():
+            self.control.hide()
+            self._overlay_shown = False
+            self._toast("Overlay hidden (standby).")
+            return
+
         self._stop_overlay_process()
         self._toast("Overlay stopped.")
 
@@ -657,5 +757,7 @@ class App(ctk.CTk):
 if __name__ == "__main__":
     if "--overlay" in sys.argv:
         run_as_overlay_mode()
+    elif "--remote-send" in sys.argv:
+        run_as_sender_mode()
     else:
         App().mainloop()
\ No newline at end of file
@@ -1,29 +1,52 @@
 # app_funcs/__init__.py
-from .paths import base_path
-from .udp import send_update
-from .discovery import list_skins, list_controllers, list_monitors
-from .settings_codec import b64_encode_settings, b64_decode_settings
-from .overlay_mode import run_as_overlay_mode
-from .preview import skin_preview_ctk_image
-from .draw_layout_on_preview import draw_layout_on_preview
-from .monitor_preview import monitor_preview_ctk_image
-from .overlay_preview import build_preview_ctk_image
-from .overlay_process import overlay_running, start_overlay_process, stop_overlay_process
+from __future__ import annotations
 
-__all__ = [
-    "base_path",
-    "send_update",
-    "list_skins",
-    "list_controllers",
-    "list_monitors",
-    "b64_encode_settings",
-    "b64_decode_settings",
-    "run_as_overlay_mode",
-    "skin_preview_ctk_image",
-    "draw_layout_on_preview",
-    "monitor_preview_ctk_image",
-    "build_preview_ctk_image",
-    "overlay_running",
-    "start_overlay_process",
-    "stop_overlay_process",
-]
\ No newline at end of file
+import importlib
+
+# The names app.py imports from the package root, and the submodule each one
+# lives in. They load on first access (PEP 562), so headless users of one
+# helper - the engine, export_frames, overlay_ctl, bench - don't pull in the
+# GUI preview modules and with them customtkinter/PIL.
+_EXPORTS = {
+    "base_path": "paths",
+    "send_update": "udp",
+    "send_show": "udp",
+    "send_hide": "udp",
+    "open_control_socket": "udp",
+    "send_delta": "udp",
+    "recv_acks": "udp",
+    "request": "udp",
+    "wait_for_ack": "udp",
+    "DeltaSession": "protocol",
+    "ControlClient": "control_client",
+    "SharedChannel": "shm_channel",
+    "list_skins": "discovery",
+    "list_controllers": "discovery",
+    "list_monitors": "discovery",
+    "b64_encode_settings": "settings_codec",
+    "b64_decode_settings": "settings_codec",
+    "run_as_overlay_mode": "overlay_mode",
+    "run_as_sender_mode": "overlay_mode",
+    "skin_preview_ctk_image": "preview",
+    "draw_layout_on_preview": "draw_layout_on_preview",
+    "monitor_preview_ctk_image": "monitor_preview",
+    "build_preview_ctk_image": "overlay_preview",
+    "overlay_running": "overlay_process",
+    "start_overlay_process": "overlay_process",
+    "stop_overlay_process": "overlay_process",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
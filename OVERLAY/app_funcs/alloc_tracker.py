@@ -0,0 +1,171 @@
+# app_funcs/alloc_tracker.py
+from __future__ import annotations
+
+import gc
+import os
+import time
+import tracemalloc
+from typing import Optional
+
+# Per-frame allocation diagnostics for the render loop.
+#
+# While armed, every frame is bracketed by tracemalloc snapshots. The diff
+# between them attributes the frame's net allocations to source lines, and
+# tracemalloc's peak (reset at frame start) catches transient garbage that
+# is freed again before the frame ends. GC collections and pause times come
+# from gc.callbacks. Snapshots are slow, so this is a diagnostic mode: arm it
+# for a few hundred frames, read the report, and it switches itself off.
+
+DEFAULT_FRAMES = 120
+DEFAULT_TOP = 15
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_EXCLUDE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _short(filename: str) -> str:
+    path = os.path.abspath(filename)
+    if path.startswith(_APP_DIR + os.sep):
+        return os.path.relpath(path, _APP_DIR).replace(os.sep, "/")
+    return filename
+
+
+class GcPauses:
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.total_ms = [0.0, 0.0, 0.0]
+        self.max_ms = [0.0, 0.0, 0.0]
+        self.collected = [0, 0, 0]
+        self._t0 = 0.0
+
+    def __call__(self, phase: str, info: dict):
+        if phase == "start":
+            self._t0 = time.perf_counter()
+            return
+        gen = info.get("generation", 0)
+        ms = (time.perf_counter() - self._t0) * 1000.0
+        self.collections[gen] += 1
+        self.total_ms[gen] += ms
+        self.max_ms[gen] = max(self.max_ms[gen], ms)
+        self.collected[gen] += info.get("collected", 0)
+
+    def install(self):
+        gc.callbacks.append(self)
+
+    def remove(self):
+        try:
+            gc.callbacks.remove(self)
+        except ValueError:
+            pass
+
+    def report(self) -> dict:
+        return {
+            f"gen{g}": {
+                "collections": self.collections[g],
+                "collected": self.collected[g],
+                "pause_ms_total": round(self.total_ms[g], 3),
+                "pause_ms_max": round(self.max_ms[g], 3),
+            }
+            for g in range(3)
+        }
+
+
+class AllocTracker:
+    def __init__(self, frames: int = DEFAULT_FRAMES, top: int = DEFAULT_TOP, nframe: int = 1):
+        self.frames = max(1, int(frames))
+        self.top = max(1, int(top))
+        self.nframe = max(1, int(nframe))
+
+        self.done = 0
+        self.report: Optional[dict] = None
+
+        self._owns_tracemalloc = False
+        self._before = None
+        self._sizes: dict = {}
+        self._counts: dict = {}
+        self._net: list = []
+        self._peaks: list = []
+        self._overhead_ms = 0.0
+        self._gc = GcPauses()
+        self._t_start = 0.0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframe)
+            self._owns_tracemalloc = True
+        self._gc.install()
+        self._t_start = time.perf_counter()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+
+    def begin_frame(self):
+        t0 = time.perf_counter()
+        self._before = self._snapshot()
+        tracemalloc.reset_peak()
+        self._base, _peak = tracemalloc.get_traced_memory()
+        self._overhead_ms += (time.perf_counter() - t0) * 1000.0
+
+    def end_frame(self) -> bool:
+        """Closes the frame; returns True once the report is ready."""
+        if self._before is None:
+            return False
+        t0 = time.perf_counter()
+        current, peak = tracemalloc.get_traced_memory()
+        after = self._snapshot()
+
+        for stat in after.compare_to(self._before, "lineno"):
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            key = f"{_short(frame.filename)}:{frame.lineno}"
+            self._sizes[key] = self._sizes.get(key, 0) + stat.size_diff
+            self._counts[key] = self._counts.get(key, 0) + max(0, stat.count_diff)
+
+        self._net.append(current - self._base)
+        self._peaks.append(peak - self._base)
+        self._before = None
+        self.done += 1
+        self._overhead_ms += (time.perf_counter() - t0) * 1000.0
+
+        if self.done >= self.frames:
+            self.finish()
+            return True
+        return False
+
+    def finish(self):
+        if self.report is not None:
+            return
+        self._gc.remove()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        n = max(1, self.done)
+        top = sorted(self._sizes.items(), key=lambda kv: kv[1], reverse=True)[: self.top]
+        peaks = sorted(self._peaks)
+        self.report = {
+            "frames": self.done,
+            "elapsed_s": round(time.perf_counter() - self._t_start, 3),
+            "tracker_overhead_ms_per_frame": round(self._overhead_ms / n, 3),
+            "net_bytes_per_frame": round(sum(self._net) / n, 1),
+            "transient_peak_bytes": {
+                "p50": peaks[len(peaks) // 2] if peaks else 0,
+                "max": peaks[-1] if peaks else 0,
+            },
+            "top": [
+                {
+                    "where": where,
+                    "bytes_per_frame": round(size / n, 1),
+                    "blocks_per_frame": round(self._counts.get(where, 0) / n, 2),
+                }
+                for where, size in top
+            ],
+            "gc": self._gc.report(),
+        }
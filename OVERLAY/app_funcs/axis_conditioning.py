@@ -0,0 +1,270 @@
+# app_funcs/axis_conditioning.py
+from __future__ import annotations
+
+from typing import Optional
+
+import pygame
+
+from .calibration import coefficients
+from .input_frames import AXIS_SCALE, MAX_AXES, quantize_axis
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Stick deadzones, response curves and trigger normalization for all axes of
+# all pads at once.
+#
+# Every response is a lookup table indexed by the quantized raw value
+# (quantize_axis, i.e. SDL's own int16 resolution), so conditioning an axis is
+# one gather whatever the deadzone/curve. process() takes a (rows, axes) array
+# of raw values and returns the conditioned stick and trigger views of every
+# axis; with radial=True the (x, y) pairs listed in `pairs` are deadzoned and
+# curved on their magnitude (at most 1) instead of per axis.
+#
+# The defaults reproduce the overlay's scalar dz()/norm_trigger() exactly;
+# rescale=True, a curve and trigger_split=0.0 reproduce controller_to_mouse's
+# helpers (bench axes checks both).
+#
+# AxisLayout also applies per-pad calibration profiles (calibration.py) to
+# the raw values first, as three coefficient arrays; pads without a profile
+# get the identity.
+#
+# Skins see the result through ConditionedInput.stick()/trigger() (scene nodes
+# use those); skins drawing by hand still get scalar dz()/norm_trigger()
+# callables backed by the same tables.
+
+DEFAULT_DEADZONE = 0.12
+DEFAULT_TRIGGER_SPLIT = -0.2
+
+
+def response_lut(deadzone: float, rescale: bool = False, curve: float = 1.0) -> "np.ndarray":
+    """Stick response for every quantized raw value (index = q + AXIS_SCALE)."""
+    x = np.arange(-AXIS_SCALE, AXIS_SCALE + 1, dtype=np.float64) / AXIS_SCALE
+    a = np.abs(x)
+    if rescale:
+        y = np.clip((a - deadzone) / (1.0 - deadzone), 0.0, 1.0)
+    else:
+        y = a.copy()
+    y[a < deadzone] = 0.0
+    if curve != 1.0:
+        y **= curve
+    return np.copysign(y, x)
+
+
+def trigger_lut(split: float = DEFAULT_TRIGGER_SPLIT) -> "np.ndarray":
+    """0..1 trigger value; raw values below `split` are read as a -1..1 trigger."""
+    x = np.arange(-AXIS_SCALE, AXIS_SCALE + 1, dtype=np.float64) / AXIS_SCALE
+    return np.clip(np.where(x < split, (x + 1.0) / 2.0, x), 0.0, 1.0)
+
+
+def stick_pairs(skin, amap: Optional[dict] = None) -> list[tuple[int, int]]:
+    """(x, y) axis indices of the skin's sticks, for radial deadzones."""
+    amap = skin.axis_map if amap is None else amap
+    scene = getattr(skin, "scene", None)
+    if scene:
+        names = [
+            (n.x_axis, n.y_axis) for n in scene
+            if getattr(n, "x_axis", None) in amap and getattr(n, "y_axis", None) in amap
+        ]
+    else:
+        # Hand-drawn skins: LX/LY-style names.
+        names = [(n, n[:-1] + "Y") for n in amap if n.endswith("X") and n[:-1] + "Y" in amap]
+    return [(amap[x], amap[y]) for x, y in names]
+
+
+def pair_index(row_pairs: list, width: int) -> tuple:
+    """Flat (x, y) indices into a (rows, width) array, from one [(x, y), ...] list per row."""
+    xs = [r * width + x for r, pairs in enumerate(row_pairs) for x, _y in pairs]
+    ys = [r * width + y for r, pairs in enumerate(row_pairs) for _x, y in pairs]
+    return np.array(xs, dtype=np.intp), np.array(ys, dtype=np.intp)
+
+
+class AxisConditioner:
+    def __init__(
+        self,
+        deadzone: float = DEFAULT_DEADZONE,
+        radial: bool = False,
+        rescale: bool = False,
+        curve: float = 1.0,
+        trigger_split: float = DEFAULT_TRIGGER_SPLIT,
+    ):
+        if np is None:
+            raise RuntimeError("AxisConditioner needs numpy")
+        self.deadzone = min(max(float(deadzone), 0.0), 0.99)
+        self.radial = bool(radial)
+        self.stick_lut = response_lut(self.deadzone, bool(rescale), float(curve))
+        self.trigger_lut = trigger_lut(float(trigger_split))
+
+    @classmethod
+    def from_settings(cls, cfg) -> Optional["AxisConditioner"]:
+        """Engine setting "axes": true/absent = defaults, false = scalar path."""
+        if cfg is False or np is None:
+            return None
+        opts = cfg if isinstance(cfg, dict) else {}
+        try:
+            return cls(
+                deadzone=float(opts.get("deadzone", DEFAULT_DEADZONE)),
+                radial=bool(opts.get("radial", False)),
+                rescale=bool(opts.get("rescale", False)),
+                curve=float(opts.get("curve", 1.0)),
+            )
+        except (TypeError, ValueError):
+            return cls()
+
+    @staticmethod
+    def _index(raw):
+        # Table index of the nearest quantized value; few ufunc calls, since
+        # for a handful of pads the per-call overhead is the whole cost.
+        q = (raw * AXIS_SCALE + (AXIS_SCALE + 0.5)).astype(np.intp)
+        np.minimum(q, 2 * AXIS_SCALE, out=q)
+        np.maximum(q, 0, out=q)
+        return q
+
+    def process(self, raw, pairs=None):
+        """raw: C-contiguous (rows, axes) floats. pairs: pair_index() for radial.
+
+        Returns (stick, trigger) arrays shaped like raw.
+        """
+        q = self._index(raw)
+        stick = self.stick_lut.take(q)
+        trigger = self.trigger_lut.take(q)
+        if self.radial and pairs is not None and len(pairs[0]):
+            xs, ys = pairs
+            flat = raw.reshape(-1)
+            x = flat.take(xs)
+            y = flat.take(ys)
+            m = np.hypot(x, y)
+            # Square gates reach (1, 1): pull the direction back onto the
+            # unit circle so the corners come out at magnitude 1, not sqrt(2).
+            over = np.maximum(m, 1.0)
+            x /= over
+            y /= over
+            m /= over
+            # Response of the magnitude, spread back over the direction.
+            f = self.stick_lut.take(self._index(m)) / np.maximum(m, 1.0 / AXIS_SCALE)
+            out = stick.reshape(-1)
+            out.put(xs, x * f)
+            out.put(ys, y * f)
+        return stick, trigger
+
+    # Scalar lookups with the same tables, for skins that draw by hand.
+    def dz(self, v: float) -> float:
+        return float(self.stick_lut[quantize_axis(v) + AXIS_SCALE])
+
+    def norm_trigger(self, v: float) -> float:
+        return float(self.trigger_lut[quantize_axis(v) + AXIS_SCALE])
+
+
+class ConditionedInput:
+    """InputState look-alike over one row of a processed batch."""
+
+    def __init__(self, inp, axis_map: dict, raw, stick, trigger):
+        self.inp = inp
+        self.axis_map = axis_map
+        self._raw = raw
+        self._stick = stick
+        self._trigger = trigger
+
+    def button(self, name: str) -> bool:
+        return self.inp.button(name)
+
+    def hat(self, index: int = 0) -> tuple[int, int]:
+        return self.inp.hat(index)
+
+    # axis() is the calibrated value, before deadzone/curve: what hand-drawn
+    # skins and the frame cache key read. Names outside the batch (e.g. a
+    # trigger bound to a half axis, see pad_mapping.py) are read and
+    # conditioned by the wrapped input.
+    def axis(self, name: str) -> float:
+        idx = self.axis_map.get(name)
+        return self.inp.axis(name) if idx is None else float(self._raw[idx])
+
+    def stick(self, name: str, dz=None) -> float:
+        idx = self.axis_map.get(name)
+        if idx is None:
+            return 0.0 if dz is None else self.inp.stick(name, dz)
+        return float(self._stick[idx])
+
+    def trigger(self, name: str, norm_trigger=None) -> float:
+        idx = self.axis_map.get(name)
+        if idx is None:
+            return 0.0 if norm_trigger is None else self.inp.trigger(name, norm_trigger)
+        return float(self._trigger[idx])
+
+
+class AxisLayout:
+    """One row per overlay, rebuilt with the engine layout.
+
+    maps: per-row axis maps resolved for the row's pad (default: skin.axis_map).
+    """
+
+    def __init__(
+        self,
+        conditioner: AxisConditioner,
+        skins: list,
+        profiles: Optional[list] = None,
+        maps: Optional[list] = None,
+    ):
+        self.conditioner = conditioner
+        if maps is None:
+            maps = [skin.axis_map for skin in skins]
+        self.maps = [dict(amap) for amap in maps]
+        self.width = max([MAX_AXES] + [idx + 1 for amap in self.maps for idx in amap.values()])
+        self.raw = np.zeros((len(skins), self.width))
+
+        self.row_pairs = [stick_pairs(skin, amap) for skin, amap in zip(skins, self.maps)]
+        self.pairs = pair_index(self.row_pairs, self.width)
+
+        self.calibrated = bool(profiles) and any(profiles)
+        if self.calibrated:
+            cols = [coefficients(p, self.width) for p in profiles]
+            self.rest, self.gain_pos, self.gain_neg = (np.array([c[k] for c in cols]) for k in range(3))
+
+    def _normalize(self, raw, absent: list):
+        if not self.calibrated:
+            return raw
+        d = raw - self.rest
+        norm = np.maximum(d, 0.0) * self.gain_pos + np.minimum(d, 0.0) * self.gain_neg
+        # Past the captured reach is still full deflection, as raw values are.
+        np.clip(norm, -1.0, 1.0, out=norm)
+        # A missing pad reads centered, not as its profile's view of 0.0.
+        norm[absent] = 0.0
+        return norm
+
+    def sample(self, inputs: list) -> list[ConditionedInput]:
+        """inputs: one InputState per row. Reads every pad once, conditions all rows."""
+        raw = self.raw
+        raw.fill(0.0)
+        absent = []
+        for r, inp in enumerate(inputs):
+            js = inp.joystick
+            if not js:
+                absent.append(r)
+                continue
+            try:
+                n = min(js.get_numaxes(), self.width)
+                raw[r, :n] = [js.get_axis(i) for i in range(n)]
+            except pygame.error:
+                raw[r].fill(0.0)
+                absent.append(r)
+        norm = self._normalize(raw, absent)
+        stick, trigger = self.conditioner.process(norm, self.pairs)
+        return [
+            ConditionedInput(inp, self.maps[r], norm[r], stick[r], trigger[r])
+            for r, inp in enumerate(inputs)
+        ]
+
+    def replay(self, row: int, inp) -> ConditionedInput:
+        """Conditions a single look-alike input (frame cache misses) as row `row`.
+
+        Its axis values are already calibrated: cache keys are built from
+        ConditionedInput.axis().
+        """
+        amap = self.maps[row]
+        norm = np.zeros((1, self.width))
+        for name, idx in amap.items():
+            norm[0, idx] = inp.axis(name)
+        stick, trigger = self.conditioner.process(norm, pair_index([self.row_pairs[row]], self.width))
+        return ConditionedInput(inp, amap, norm[0], stick[0], trigger[0])
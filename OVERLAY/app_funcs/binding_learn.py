@@ -0,0 +1,324 @@
+# app_funcs/binding_learn.py
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable, Optional
+
+import pygame
+
+from .pad_mapping import AXES, HAT_MASKS, parse_binding
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Learns a pad's SDL-style mapping ({"a": "b0", "lefttrigger": "+a2", ...})
+# by prompting for each semantic input in turn.
+#
+# Input comes from the joystick event stream (EventSource): SDL queues every
+# button edge and axis change, so a press shorter than the loop's sleep is
+# still seen. Pads that post no events (fake/remote pads) are diffed by
+# PollSource into the same (kind, index, value) stream.
+#
+# baseline() measures every axis hands-off: rest value, peak wobble and
+# variance. During a step each axis event appends the full axis vector to a
+# window; per axis, the window's peak deflection from rest must clear the
+# axis' threshold (PRESS_DELTA, raised for noisy axes), and among those the
+# axis with the largest variance about its rest value wins, so a trigger pull
+# that jiggles a stick still picks the trigger. The first button edge or
+# single-direction hat press wins outright.
+#
+# Whatever is detected is classified for the asked name (a stick axis and its
+# direction, a whole or half trigger axis, a button on a hat or an axis), and
+# a source already bound to another name is refused and reported, so a
+# repeated press can't take two names. Each step ends as soon as something is
+# detected and let go, so a full pad takes as long as the presses do.
+
+LEARN_ORDER = (
+    "a", "b", "x", "y",
+    "leftshoulder", "rightshoulder", "back", "start", "leftstick", "rightstick",
+    "dpup", "dpdown", "dpleft", "dpright",
+    "lefttrigger", "righttrigger",
+    "leftx", "lefty", "rightx", "righty",
+)
+
+PROMPTS = {
+    "a": "press A (bottom face button)",
+    "b": "press B (right face button)",
+    "x": "press X (left face button)",
+    "y": "press Y (top face button)",
+    "back": "press Back / Select",
+    "guide": "press the Guide / Home button",
+    "start": "press Start",
+    "leftstick": "click the left stick in",
+    "rightstick": "click the right stick in",
+    "leftshoulder": "press the left shoulder (LB / L1)",
+    "rightshoulder": "press the right shoulder (RB / R1)",
+    "dpup": "press D-pad up",
+    "dpdown": "press D-pad down",
+    "dpleft": "press D-pad left",
+    "dpright": "press D-pad right",
+    "lefttrigger": "pull the left trigger (LT / L2)",
+    "righttrigger": "pull the right trigger (RT / R2)",
+    "leftx": "push the left stick RIGHT",
+    "lefty": "push the left stick DOWN",
+    "rightx": "push the right stick RIGHT",
+    "righty": "push the right stick DOWN",
+}
+
+REST_S = 0.3
+STEP_S = 5.0
+RELEASE_S = 1.0
+SAMPLE_S = 0.002
+# Deflection from rest that counts as moved on purpose, and the cap for noisy axes.
+PRESS_DELTA = 0.5
+MAX_THRESHOLD = 0.9
+NOISE_K = 6.0
+RELEASE_DELTA = 0.25
+WINDOW = 1024
+
+_JOY_EVENTS = (pygame.JOYAXISMOTION, pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYHATMOTION)
+_SINGLE_MASKS = set(HAT_MASKS.values())
+
+
+def _hat_mask(value) -> int:
+    x, y = value
+    return (y > 0) | (x > 0) << 1 | (y < 0) << 2 | (x < 0) << 3
+
+
+# -----------------------
+# Input sources
+# -----------------------
+class EventSource:
+    """One pad's joystick events from the pygame queue."""
+
+    def __init__(self, js):
+        self.instance_id = js.get_instance_id()
+
+    def poll(self) -> list[tuple]:
+        out = []
+        for e in pygame.event.get(_JOY_EVENTS):
+            if getattr(e, "instance_id", None) != self.instance_id:
+                continue
+            if e.type == pygame.JOYAXISMOTION:
+                out.append(("axis", e.axis, e.value))
+            elif e.type == pygame.JOYHATMOTION:
+                out.append(("hat", e.hat, tuple(e.value)))
+            else:
+                out.append(("button", e.button, e.type == pygame.JOYBUTTONDOWN))
+        return out
+
+
+class PollSource:
+    """The same stream diffed from polled state, for pads that post no events."""
+
+    def __init__(self, js):
+        self.js = js
+        self._last = self._read()
+
+    def _read(self) -> tuple:
+        js = self.js
+        return (
+            [bool(js.get_button(i)) for i in range(js.get_numbuttons())],
+            [js.get_axis(i) for i in range(js.get_numaxes())],
+            [tuple(js.get_hat(i)) for i in range(js.get_numhats())],
+        )
+
+    def poll(self) -> list[tuple]:
+        pygame.event.pump()
+        (b0, a0, h0), now = self._last, self._read()
+        self._last = now
+        b1, a1, h1 = now
+        out = [("button", i, v) for i, (u, v) in enumerate(zip(b0, b1)) if u != v]
+        out += [("axis", i, v) for i, (u, v) in enumerate(zip(a0, a1)) if u != v]
+        out += [("hat", i, v) for i, (u, v) in enumerate(zip(h0, h1)) if u != v]
+        return out
+
+
+def source_for(js):
+    return EventSource(js) if isinstance(js, pygame.joystick.JoystickType) else PollSource(js)
+
+
+# -----------------------
+# Learner
+# -----------------------
+def _key(text: str) -> tuple:
+    kind, idx, arg, _invert = parse_binding(text)
+    return kind, idx, arg
+
+
+class BindingLearner:
+    def __init__(
+        self,
+        js,
+        source=None,
+        say: Callable[[str], None] = print,
+        rest_s: float = REST_S,
+        step_s: float = STEP_S,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if np is None:
+            raise RuntimeError("BindingLearner needs numpy")
+        self.js = js
+        self.source = source or source_for(js)
+        self.say = say
+        self.rest_s = rest_s
+        self.step_s = step_s
+        self.clock = clock
+        self.sleep = sleep
+
+        self.n_axes = js.get_numaxes()
+        self.axes = np.array([js.get_axis(i) for i in range(self.n_axes)], dtype=np.float64)
+        self.rest = self.axes.copy()
+        self.noise = np.zeros(self.n_axes)
+        self.noise_var = np.zeros(self.n_axes)
+        self.threshold = np.full(self.n_axes, PRESS_DELTA)
+        self.window = np.zeros((WINDOW, self.n_axes))
+
+        self.bound: dict = {}    # source key -> semantic name
+        self.learned: dict = {}  # semantic name -> binding text
+        self.skipped: list = []
+
+    def _poll(self) -> list[tuple]:
+        """Source events, with axis events already applied to self.axes."""
+        events = self.source.poll()
+        for kind, idx, value in events:
+            if kind == "axis" and idx < self.n_axes:
+                self.axes[idx] = value
+        return events
+
+    def baseline(self):
+        """Hands-off rest value, wobble and variance per axis."""
+        self.say("Hands off the sticks and triggers...")
+        self._poll()
+        rows = [self.axes.copy()]
+        t0 = self.clock()
+        while self.clock() - t0 < self.rest_s:
+            # Sampled per tick, not per event: an idle axis sends none.
+            self._poll()
+            rows.append(self.axes.copy())
+            self.sleep(SAMPLE_S)
+        rows = np.array(rows)
+        self.rest = rows.mean(axis=0)
+        self.noise = np.abs(rows - self.rest).max(axis=0)
+        self.noise_var = rows.var(axis=0)
+        self.threshold = np.clip(NOISE_K * self.noise, PRESS_DELTA, MAX_THRESHOLD)
+
+    # -----------------------
+    # Conflicts
+    # -----------------------
+    def owner(self, text: str) -> Optional[str]:
+        """Name already bound to this source (or an overlapping half/whole axis)."""
+        kind, idx, arg = _key(text)
+        if kind != "a":
+            return self.bound.get((kind, idx, arg))
+        for (k, i, half), name in self.bound.items():
+            if k == "a" and i == idx and (half == 0 or arg == 0 or half == arg):
+                return name
+        return None
+
+    def reserve(self, name: str, text: str):
+        """Marks a source as taken without learning it (e.g. known stick axes)."""
+        if parse_binding(text) is not None:
+            self.bound[_key(text)] = name
+
+    def _claim(self, name: str, text: str, refused: set) -> bool:
+        owner = self.owner(text)
+        if owner is None:
+            self.bound[_key(text)] = name
+            self.learned[name] = text
+            self.say(f"    {name} = {text}")
+            return True
+        if text not in refused:
+            refused.add(text)
+            self.say(f"    {text} is already {owner}; ignored")
+        return False
+
+    # -----------------------
+    # Detection
+    # -----------------------
+    def _axis_text(self, name: str, i: int, signed: float) -> str:
+        if name in AXES and not name.endswith("trigger"):
+            # Sticks are prompted in their positive direction (right, down).
+            return f"a{i}~" if signed < 0 else f"a{i}"
+        if name in AXES and abs(self.rest[i]) >= 0.5:
+            # A trigger resting at one end uses the whole axis.
+            return f"a{i}~" if self.rest[i] > 0 else f"a{i}"
+        return f"+a{i}" if signed > 0 else f"-a{i}"
+
+    def _axis_candidates(self, name: str, rows) -> list[str]:
+        d = rows - self.rest
+        peak = np.abs(d).max(axis=0)
+        score = (d * d).mean(axis=0) - self.noise_var
+        moved = np.flatnonzero(peak >= self.threshold)
+        out = []
+        for i in moved[np.argsort(-score[moved])]:
+            signed = d[np.abs(d[:, i]).argmax(), i]
+            out.append(self._axis_text(name, int(i), float(signed)))
+        return out
+
+    def _released(self, text: str, events: list) -> bool:
+        """Applies `events`; True once the input bound to `text` is let go."""
+        kind, idx, arg, _invert = parse_binding(text)
+        released = False
+        for k, i, value in events:
+            if k == "axis" and i < self.n_axes:
+                self.axes[i] = value
+            elif k == "button" and kind == "b" and i == idx and not value:
+                released = True
+            elif k == "hat" and kind == "h" and i == idx and not _hat_mask(value) & arg:
+                released = True
+        if kind == "a":
+            return abs(self.axes[idx] - self.rest[idx]) < RELEASE_DELTA
+        return released
+
+    def _wait_release(self, text: str, pending: list):
+        # A quick tap's release is usually in the same batch as its press.
+        deadline = self.clock() + RELEASE_S
+        events = pending
+        while not self._released(text, events) and self.clock() < deadline:
+            self.sleep(SAMPLE_S)
+            events = self.source.poll()
+
+    def learn_one(self, name: str) -> Optional[str]:
+        self._poll()
+        n = 0
+        refused: set = set()
+        deadline = self.clock() + self.step_s
+        while self.clock() < deadline:
+            moved = False
+            events = self.source.poll()
+            for pos, (kind, idx, value) in enumerate(events):
+                text = None
+                if kind == "axis":
+                    if idx < self.n_axes:
+                        self.axes[idx] = value
+                        self.window[n % WINDOW] = self.axes
+                        n += 1
+                        moved = True
+                elif kind == "button" and value:
+                    text = f"b{idx}"
+                elif kind == "hat" and _hat_mask(value) in _SINGLE_MASKS:
+                    text = f"h{idx}.{_hat_mask(value)}"
+                if text is not None and self._claim(name, text, refused):
+                    self._wait_release(text, events[pos + 1:])
+                    return text
+            if moved:
+                for text in self._axis_candidates(name, self.window[:min(n, WINDOW)]):
+                    if text not in refused and self._claim(name, text, refused):
+                        self._wait_release(text, [])
+                        return text
+            self.sleep(SAMPLE_S)
+        self.skipped.append(name)
+        self.say("    (skipped)")
+        return None
+
+    def learn(self, names: Iterable[str] = LEARN_ORDER) -> dict:
+        """{name: binding text} for every name that was pressed in time."""
+        names = list(dict.fromkeys(names))
+        for k, name in enumerate(names, 1):
+            self.say(f"[{k}/{len(names)}] {PROMPTS.get(name, 'press ' + name)}")
+            self.learn_one(name)
+        return dict(self.learned)
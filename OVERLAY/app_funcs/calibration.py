@@ -0,0 +1,295 @@
+# app_funcs/calibration.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from typing import Callable, Optional
+
+import pygame
+
+from .paths import user_data_path
+
+# Per-controller calibration profiles, keyed by SDL joystick GUID.
+#
+# capture() measures a pad once: its rest value and noise per axis (hands
+# off), then the range each axis actually reaches (sticks swept, triggers
+# pressed). fit_axis() turns that into a kind and three coefficients, so the
+# overlay's hot path normalizes every axis of every pad the same way:
+#
+#   d = raw - rest
+#   value = max(d, 0) * gain_pos + min(d, 0) * gain_neg
+#
+#   stick    rest ~0, moves both ways     -> -1..1 with each half scaled to its own reach
+#   trigger  moves one way from its rest  -> 0..1 (either style, inverted ones too)
+#            at an end (-1..1 or 1..-1), or from ~0 upwards (0..1)
+#   unused   barely moves                 -> identity
+#
+# Any other one-sided axis is a stick that wasn't swept both ways: it stays a
+# stick, its short half borrows the long half's gain, and capture() warns.
+#
+# No per-frame guessing at the trigger style (norm_trigger's v < -0.2), and
+# pads that stop short of +-1 still reach full deflection.
+#
+# All profiles live in one small JSON file in the user data directory.
+# CalibrationStore re-reads it only when its mtime changes, so lookups at
+# layout time are dict hits. A hand-edited or damaged profile is dropped on
+# load (the pad runs uncalibrated) rather than reaching the render loop.
+
+PROFILE_VERSION = 1
+DEFAULT_FILE = "calibration.json"
+
+STICK = "stick"
+TRIGGER = "trigger"
+UNUSED = "unused"
+
+# Reach (in raw units) below which a direction counts as "doesn't move".
+MIN_RANGE = 0.25
+# Rest-step wobble above this means the pad was touched (or is drifting badly).
+MAX_REST_NOISE = 0.15
+# A one-sided axis is a trigger if it rests at least this far out (full-range
+# style) or within REST_ZERO of 0 and only moves up (0..1 style).
+TRIGGER_REST = 0.5
+REST_ZERO = 0.1
+REST_S = 0.6
+SWEEP_S = 6.0
+SAMPLE_S = 0.005
+
+IDENTITY = (0.0, 1.0, 1.0)
+
+
+def default_path() -> str:
+    return user_data_path(DEFAULT_FILE)
+
+
+def joystick_guid(js) -> Optional[str]:
+    get_guid = getattr(js, "get_guid", None)
+    if get_guid is None:
+        return None
+    try:
+        return str(get_guid()) or None
+    except pygame.error:
+        return None
+
+
+# -----------------------
+# Fitting
+# -----------------------
+def fit_axis(rest: float, lo: float, hi: float, noise: float = 0.0) -> dict:
+    up = hi - rest
+    down = rest - lo
+    axis = {
+        "rest": round(rest, 5), "min": round(lo, 5), "max": round(hi, 5), "noise": round(noise, 5),
+    }
+    one_way = min(up, down) < MIN_RANGE
+    if max(up, down) < MIN_RANGE:
+        kind, coeffs = UNUSED, IDENTITY
+    elif one_way and up >= down and (rest <= -TRIGGER_REST or abs(rest) <= REST_ZERO):
+        kind, coeffs = TRIGGER, (rest, 1.0 / up, 0.0)
+    elif one_way and down > up and rest >= TRIGGER_REST:
+        kind, coeffs = TRIGGER, (rest, 0.0, -1.0 / down)
+    else:
+        reach = max(up, down)
+        up, down = (v if v >= MIN_RANGE else reach for v in (up, down))
+        kind, coeffs = STICK, (rest, 1.0 / up, 1.0 / down)
+    axis["kind"] = kind
+    axis["rest"], axis["gain_pos"], axis["gain_neg"] = (round(c, 6) for c in coeffs)
+    return axis
+
+
+def _axis_coefficients(axis) -> Optional[tuple]:
+    """(rest, gain_pos, gain_neg) of one profile axis, None if any is missing or not finite."""
+    if not isinstance(axis, dict):
+        return None
+    out = []
+    for key in ("rest", "gain_pos", "gain_neg"):
+        v = axis.get(key)
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v):
+            return None
+        out.append(float(v))
+    return tuple(out)
+
+
+def valid_profile(profile) -> bool:
+    if not isinstance(profile, dict) or profile.get("version") != PROFILE_VERSION:
+        return False
+    axes = profile.get("axes")
+    return isinstance(axes, list) and all(_axis_coefficients(axis) is not None for axis in axes)
+
+
+def _one_sided(axis: dict) -> bool:
+    """True if the sweep only reached MIN_RANGE in one direction."""
+    return min(axis["max"] - axis["rest"], axis["rest"] - axis["min"]) < MIN_RANGE
+
+
+def coefficients(profile: Optional[dict], width: int) -> tuple[list, list, list]:
+    """(rest, gain_pos, gain_neg) per axis index, identity where uncalibrated."""
+    rest, gain_pos, gain_neg = [IDENTITY[0]] * width, [IDENTITY[1]] * width, [IDENTITY[2]] * width
+    axes = profile.get("axes") if isinstance(profile, dict) else None
+    for i, axis in enumerate(axes[:width] if isinstance(axes, list) else []):
+        coeffs = _axis_coefficients(axis)
+        if coeffs is not None:
+            rest[i], gain_pos[i], gain_neg[i] = coeffs
+    return rest, gain_pos, gain_neg
+
+
+def apply(profile: Optional[dict], i: int, raw: float) -> float:
+    """Scalar form of the normalization, for tools and checks."""
+    rest, gain_pos, gain_neg = coefficients(profile, i + 1)
+    d = raw - rest[i]
+    return max(d, 0.0) * gain_pos[i] + min(d, 0.0) * gain_neg[i]
+
+
+class CalibratedInput:
+    """InputState look-alike normalizing every mapped axis through a profile.
+
+    The engine's scalar path (no numpy, or "axes": false); AxisLayout does the
+    same normalization in its batch.
+    """
+
+    def __init__(self, inp, profile: dict):
+        self.inp = inp
+        self.joystick = inp.joystick
+        self.axis_map = inp.axis_map
+        width = max([0] + [idx + 1 for idx in self.axis_map.values()])
+        self._rest, self._gain_pos, self._gain_neg = coefficients(profile, width)
+
+    def button(self, name: str) -> bool:
+        return self.inp.button(name)
+
+    def hat(self, index: int = 0) -> tuple[int, int]:
+        return self.inp.hat(index)
+
+    def axis(self, name: str) -> float:
+        v = self.inp.axis(name)
+        idx = self.axis_map.get(name)
+        if idx is None:
+            return v
+        d = v - self._rest[idx]
+        v = d * self._gain_pos[idx] if d > 0.0 else d * self._gain_neg[idx]
+        # Past the captured reach is still full deflection, as in AxisLayout.
+        return -1.0 if v < -1.0 else 1.0 if v > 1.0 else v
+
+    def stick(self, name: str, dz) -> float:
+        return dz(self.axis(name))
+
+    def trigger(self, name: str, norm_trigger) -> float:
+        return norm_trigger(self.axis(name))
+
+
+# -----------------------
+# Guided capture
+# -----------------------
+def _read_axes(js, n: int) -> list[float]:
+    pygame.event.pump()
+    return [js.get_axis(i) for i in range(n)]
+
+
+def capture(
+    js,
+    say: Callable[[str], None] = print,
+    rest_s: float = REST_S,
+    sweep_s: float = SWEEP_S,
+    read: Optional[Callable[[], list]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict:
+    """Interactive two-step measurement of one opened joystick; returns a profile."""
+    n_axes = js.get_numaxes()
+    read = read or (lambda: _read_axes(js, n_axes))
+
+    say("Step 1/2: hands off the sticks and triggers...")
+    samples = []
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < rest_s or not samples:
+        samples.append(read())
+        sleep(SAMPLE_S)
+    rest = [sum(col) / len(col) for col in zip(*samples)]
+    noise = [max(abs(v - r) for v in col) for col, r in zip(zip(*samples), rest)]
+    moved = [i for i, v in enumerate(noise) if v > MAX_REST_NOISE]
+    if moved:
+        say(f"Warning: axes {moved} moved during step 1; their rest values may be off.")
+
+    say(f"Step 2/2: for {sweep_s:g}s, roll each stick around its edge and fully press each trigger...")
+    lo = list(rest)
+    hi = list(rest)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < sweep_s:
+        for i, v in enumerate(read()):
+            if v < lo[i]:
+                lo[i] = v
+            elif v > hi[i]:
+                hi[i] = v
+        sleep(SAMPLE_S)
+
+    axes = [fit_axis(rest[i], lo[i], hi[i], noise[i]) for i in range(n_axes)]
+    partial = [i for i, a in enumerate(axes) if a["kind"] == STICK and _one_sided(a)]
+    if partial:
+        say(f"Warning: axes {partial} only moved one way in step 2; sweep the sticks all the way round and run again.")
+    return {
+        "version": PROFILE_VERSION,
+        "guid": joystick_guid(js),
+        "name": js.get_name(),
+        "captured": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "axes": axes,
+    }
+
+
+# -----------------------
+# Storage
+# -----------------------
+class CalibrationStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        self._stamp = None
+        self._profiles: dict = {}
+
+    def load(self) -> dict:
+        """guid -> profile; re-reads the file only when it changed."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._stamp, self._profiles = None, {}
+            return self._profiles
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                profiles = data.get("profiles", {}) if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                profiles = {}
+            if not isinstance(profiles, dict):
+                profiles = {}
+            self._profiles = {
+                guid: p for guid, p in profiles.items()
+                if valid_profile(p) and p.get("guid") == guid
+            }
+        return self._profiles
+
+    def get(self, guid: Optional[str]) -> Optional[dict]:
+        if not guid:
+            return None
+        return self.load().get(guid)
+
+    def _write(self, profiles: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"profiles": profiles}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def save(self, profile: dict):
+        if not profile.get("guid"):
+            raise ValueError("profile has no controller GUID")
+        profiles = dict(self.load())
+        profiles[profile["guid"]] = profile
+        self._write(profiles)
+
+    def forget(self, guid: str) -> bool:
+        profiles = dict(self.load())
+        if profiles.pop(guid, None) is None:
+            return False
+        self._write(profiles)
+        return True
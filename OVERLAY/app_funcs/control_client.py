@@ -0,0 +1,177 @@
+# app_funcs/control_client.py
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from . import protocol
+from .shm_channel import SharedChannel
+from .udp import open_control_socket, send_delta, recv_acks
+
+# One overlay frame at 120 FPS; anything submitted inside this window is
+# collapsed into a single datagram carrying the latest state.
+COALESCE_WINDOW_MS = 8
+
+
+class ControlClient:
+    """
+    Long-lived App-side control channel to one overlay process.
+
+    Keeps a single socket and delta session, coalesces rapid submits so only
+    the newest settings go out, and counts what was sent vs. collapsed. When a
+    shared memory channel is attached, settings go through it instead of UDP
+    and the overlay's status record is read back from it.
+    """
+
+    def __init__(self, udp_port: int, window_ms: int = COALESCE_WINDOW_MS):
+        self.udp_port = udp_port
+        self.window_ms = window_ms
+        self.sock = open_control_socket()
+        self.session = protocol.DeltaSession()
+        self.shm: Optional[SharedChannel] = None
+        self.status: Optional[dict] = None
+        self._shm_applied_gen = 0
+        self._shm_keys: set = set()
+
+        self._pending: Optional[dict] = None
+        self._pending_since = 0.0
+
+        self.counters = {
+            "submitted": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "unchanged": 0,
+            "acked": 0,
+            "shm_fallback": 0,
+        }
+
+    # ---------- lifecycle ----------
+    def reset(self, settings: dict, shm: Optional[SharedChannel] = None):
+        # A fresh overlay process starts from these settings.
+        self._pending = None
+        self.session = protocol.DeltaSession()
+        self.session.reset(settings)
+        self.detach_shm()
+        self.shm = shm
+        self._shm_keys = set(settings)
+        if shm is not None:
+            # The process was started with these settings; a failed write loses nothing.
+            self._try_shm(settings)
+
+    def detach_shm(self):
+        if self.shm is not None:
+            self.shm.close()
+        self.shm = None
+        self.status = None
+        self._shm_applied_gen = 0
+        self._shm_keys: set = set()
+
+    def close(self):
+        self.detach_shm()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    # ---------- updates ----------
+    def submit(self, settings: dict):
+        self.counters["submitted"] += 1
+        if self._pending is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self._pending_since = time.perf_counter()
+        self._pending = settings
+
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    def due(self) -> bool:
+        return self._pending is not None and (time.perf_counter() - self._pending_since) * 1000.0 >= self.window_ms
+
+    def flush(self) -> bool:
+        if self._pending is None:
+            return False
+        settings, self._pending = self._pending, None
+        return self._send(settings, protocol.MSG_UPDATE)
+
+    def pump(self) -> int:
+        """Flushes a due update and drains acks; returns the number of new acks."""
+        if self.due():
+            self.flush()
+        n = recv_acks(self.session, self.sock)
+        if self.shm is not None:
+            n += self._read_shm_status()
+        self.counters["acked"] += n
+        return n
+
+    def _read_shm_status(self) -> int:
+        st = self.shm.read_status()
+        if st is None:
+            return 0
+        self.status = st
+        applied = st["applied_gen"]
+        if applied == self._shm_applied_gen:
+            return 0
+        self._shm_applied_gen = applied
+        latency_ms = self.shm.applied_latency_ms(applied, st["applied_us"])
+        if latency_ms is None:
+            return 0
+        self.session.latencies_ms.append(latency_ms)
+        self.session.acked_frame = st["frame"]
+        return 1
+
+    def _try_shm(self, settings: dict) -> bool:
+        """Writes the settings record; False (and counted) if it doesn't fit, so UDP carries it."""
+        # The overlay merges the record, so name every key dropped since start.
+        self._shm_keys |= set(settings)
+        removed = sorted(self._shm_keys - set(settings))
+        try:
+            self.shm.write_settings(dict(settings, **{protocol.REMOVED: removed}) if removed else settings)
+        except ValueError:
+            self.counters["shm_fallback"] += 1
+            return False
+        return True
+
+    # ---------- commands ----------
+    def show(self, settings: dict) -> bool:
+        if self._pending is not None:
+            self._pending = None
+            self.counters["coalesced"] += 1
+        if self.shm is not None and self._try_shm(settings):
+            self.session.latest = settings
+            return self._send(None, protocol.MSG_SHOW)
+        return self._send(settings, protocol.MSG_SHOW)
+
+    def hide(self) -> bool:
+        self.flush()
+        return self._send(None, protocol.MSG_HIDE)
+
+    def stop(self) -> bool:
+        self._pending = None
+        return self._send(None, protocol.MSG_STOP)
+
+    def _send(self, settings: Optional[dict], msg_type: int) -> bool:
+        if self.shm is not None and settings is not None and msg_type == protocol.MSG_UPDATE:
+            if settings == self.session.latest:
+                self.counters["unchanged"] += 1
+                return False
+            if self._try_shm(settings):
+                self.session.latest = settings
+                self.counters["sent"] += 1
+                return True
+        if send_delta(self.session, self.sock, settings, self.udp_port, msg_type):
+            self.counters["sent"] += 1
+            return True
+        if settings is not None and msg_type == protocol.MSG_UPDATE:
+            self.counters["unchanged"] += 1
+        return False
+
+    # ---------- stats ----------
+    def stats(self) -> dict:
+        out = dict(self.counters)
+        out["latency"] = self.session.latency_stats()
+        out["acked_frame"] = self.session.acked_frame
+        out["transport"] = "shm" if self.shm is not None else "udp"
+        if self.status is not None:
+            out["overlay"] = self.status
+        return out
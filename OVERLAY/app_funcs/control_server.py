@@ -0,0 +1,339 @@
+# app_funcs/control_server.py
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import stat
+import threading
+import time
+from typing import Optional
+
+from . import protocol
+from .alloc_tracker import DEFAULT_FRAMES, DEFAULT_TOP
+from .trace import TRACER, now as trace_now
+
+# Overlay-side control endpoint.
+#
+# One asyncio loop on a daemon thread serves:
+#   - UDP on 127.0.0.1:<port>: binary delta protocol (acked by the engine)
+#     and JSON commands
+#   - optionally a local TCP port and/or Unix socket speaking newline
+#     delimited JSON, one reply line per request line
+#
+# JSON commands: update, show, hide, stop, query_settings, query_stats,
+# list_controllers, ping, alloc_start, query_alloc, trace_start, trace_stop,
+# trace_dump. Queries always reply;
+# update/show/hide/stop reply only when the request carries an "id", so
+# fire-and-forget senders keep working unchanged.
+
+QUERY_COMMANDS = {
+    "query_settings", "query_stats", "list_controllers", "ping",
+    "alloc_start", "query_alloc", "trace_start", "trace_stop", "trace_dump",
+}
+
+# Limits for numeric command arguments, checked before they reach the engine.
+ALLOC_FRAMES = (1, 100_000)
+ALLOC_TOP = (1, 1000)
+TRACE_CAPACITY = (1, 10_000_000)
+
+
+def _int_arg(msg: dict, key: str, default: int, limits: tuple[int, int]) -> int:
+    """msg[key] as an int within limits; ValueError names the bad argument."""
+    value = msg.get(key, default)
+    lo, hi = limits
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    if not lo <= value <= hi:
+        raise ValueError(f"{key} must be between {lo} and {hi}, got {value!r}")
+    return int(value)
+
+
+def handle_binary_message(live, data: bytes, addr, last_seq: dict):
+    try:
+        msg_type, session, seq, payload = protocol.decode_message(data)
+        if msg_type == protocol.MSG_ACK:
+            return
+        if session in last_seq and not protocol.seq_newer(seq, last_seq[session]):
+            return  # stale or duplicate
+        patch = protocol.decode_fields(payload) if payload else {}
+    except Exception:
+        return
+
+    last_seq[session] = seq
+    ack = (addr, session, seq)
+
+    if msg_type == protocol.MSG_STOP:
+        patch = {"_stop": True}
+
+    # Settings first: a show that wakes the loop must draw with them.
+    live.apply_update(patch, ack=ack)
+    if msg_type == protocol.MSG_SHOW:
+        live.set_visible(True)
+    elif msg_type == protocol.MSG_HIDE:
+        live.set_visible(False)
+
+
+def handle_json_command(live, msg: dict) -> Optional[dict]:
+    """Applies/answers one JSON command; returns the reply or None."""
+    msg_type = msg.get("type")
+    reply: dict = {"type": "reply", "ok": True}
+    if "id" in msg:
+        reply["id"] = msg["id"]
+
+    if msg_type in ("update", "show"):
+        patch = msg.get("settings", {})
+        if isinstance(patch, dict):
+            live.apply_update(patch)
+        if msg_type == "show":
+            live.set_visible(True)
+    elif msg_type == "hide":
+        live.set_visible(False)
+    elif msg_type == "stop":
+        live.apply_update({"_stop": True})
+    elif msg_type == "query_settings":
+        reply["settings"] = live.snapshot()
+    elif msg_type == "query_stats":
+        reply["stats"] = dict(live.stats)
+    elif msg_type == "list_controllers":
+        reply["controllers"] = list(live.controllers)
+    elif msg_type == "ping":
+        reply["t"] = time.time()
+    elif msg_type == "alloc_start":
+        try:
+            request = {
+                "frames": _int_arg(msg, "frames", DEFAULT_FRAMES, ALLOC_FRAMES),
+                "top": _int_arg(msg, "top", DEFAULT_TOP, ALLOC_TOP),
+            }
+        except ValueError as e:
+            reply["ok"] = False
+            reply["error"] = str(e)
+            return reply
+        live.alloc_report = None
+        live.alloc_request = request
+    elif msg_type == "query_alloc":
+        # None while the tracker is still collecting.
+        reply["report"] = live.alloc_report
+    elif msg_type == "trace_start":
+        try:
+            capacity = _int_arg(msg, "capacity", 200_000, TRACE_CAPACITY)
+        except ValueError as e:
+            reply["ok"] = False
+            reply["error"] = str(e)
+            return reply
+        if msg.get("clear", True):
+            TRACER.clear()
+        TRACER.start(capacity)
+        reply["trace"] = TRACER.stats()
+    elif msg_type == "trace_stop":
+        TRACER.stop()
+        reply["trace"] = TRACER.stats()
+    elif msg_type == "trace_dump":
+        path = str(msg.get("path") or f"overlay_trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            reply["events"] = TRACER.dump(path)
+            reply["path"] = os.path.abspath(path)
+        except OSError as e:
+            reply["ok"] = False
+            reply["error"] = str(e)
+    else:
+        reply["ok"] = False
+        reply["error"] = f"unknown command {msg_type!r}"
+        return reply
+
+    if msg_type in QUERY_COMMANDS or "id" in msg:
+        return reply
+    return None
+
+
+def _decode_json(data: bytes) -> Optional[dict]:
+    try:
+        msg = json.loads(data.decode("utf-8", errors="ignore"))
+    except Exception:
+        return None
+    return msg if isinstance(msg, dict) else None
+
+
+def _encode_json(reply: dict) -> bytes:
+    return json.dumps(reply, separators=(",", ":")).encode("utf-8")
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "ControlServer"):
+        self.server = server
+        self.last_seq: dict = {}
+
+    def connection_made(self, transport):
+        self.server.udp_transport = transport
+
+    def datagram_received(self, data, addr):
+        server = self.server
+        server.counters["udp"] += 1
+        t0 = trace_now()
+
+        if protocol.is_binary(data):
+            handle_binary_message(server.live, data, addr, self.last_seq)
+            TRACER.complete("udp binary", t0, "control")
+            return
+
+        msg = _decode_json(data)
+        if msg is None:
+            server.counters["bad"] += 1
+            return
+        reply = handle_json_command(server.live, msg)
+        if reply is not None:
+            server.udp_transport.sendto(_encode_json(reply), addr)
+        TRACER.complete("udp json", t0, "control", {"type": msg.get("type")} if TRACER.enabled else None)
+
+    def error_received(self, exc):
+        # Windows reports ICMP port-unreachable from a dead sender here.
+        pass
+
+
+def _unlink_socket(path: str):
+    # Only ever remove a socket; a regular file at the path is left to fail the bind.
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except OSError:
+        pass
+
+
+class ControlServer:
+    def __init__(
+        self,
+        live,
+        udp_port: int,
+        *,
+        stream_port: Optional[int] = None,
+        stream_path: Optional[str] = None,
+        host: str = "127.0.0.1",
+    ):
+        self.live = live
+        self.udp_port = udp_port
+        self.stream_port = stream_port
+        self.stream_path = stream_path
+        self.host = host
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.udp_transport = None
+        self._servers = []
+        self._clients = set()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+
+        self.counters = {"udp": 0, "stream": 0, "bad": 0}
+
+    # ---------- lifecycle ----------
+    def start(self, timeout: float = 5.0):
+        self._thread = threading.Thread(target=self._run, name="overlay-control", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._open())
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            self.loop.close()
+            return
+
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self._shutdown())
+            self.loop.close()
+
+    async def _open(self):
+        await self.loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self), local_addr=(self.host, self.udp_port)
+        )
+        if self.stream_port:
+            self._servers.append(await asyncio.start_server(self._handle_stream, self.host, self.stream_port))
+        if self.stream_path and hasattr(asyncio, "start_unix_server"):
+            # A previous overlay that died without close() leaves its socket file behind.
+            _unlink_socket(self.stream_path)
+            self._servers.append(await asyncio.start_unix_server(self._handle_stream, self.stream_path))
+
+    async def _shutdown(self):
+        if self.udp_transport is not None:
+            self.udp_transport.close()
+        for srv in self._servers:
+            srv.close()
+        # Drop connected stream clients, otherwise wait_closed() waits on them.
+        clients = list(self._clients)
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        for srv in self._servers:
+            await srv.wait_closed()
+
+    def close(self, timeout: float = 2.0):
+        if self.loop is None or self._thread is None:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        except RuntimeError:
+            pass  # loop already closed
+        self._thread.join(timeout)
+        if self.stream_path:
+            _unlink_socket(self.stream_path)
+
+    # ---------- stream clients ----------
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit: the line can't be framed, so drop the client.
+                    self.counters["bad"] += 1
+                    writer.write(_encode_json({"type": "reply", "ok": False, "error": "line too long"}) + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                self.counters["stream"] += 1
+                t0 = trace_now()
+                msg = _decode_json(line)
+                if msg is None:
+                    self.counters["bad"] += 1
+                    reply = {"type": "reply", "ok": False, "error": "bad json"}
+                else:
+                    # Stream clients always get an answer, one line per request.
+                    reply = handle_json_command(self.live, msg) or {"type": "reply", "ok": True}
+                writer.write(_encode_json(reply) + b"\n")
+                TRACER.complete("stream json", t0, "control")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled on shutdown; return normally so the stream protocol
+            # doesn't log the cancellation as an error.
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    # ---------- engine -> senders ----------
+    def send_acks(self, acks: list, frame: int):
+        if not acks or self.loop is None or self.udp_transport is None:
+            return
+        # Called right after the frame took the updates in: that is the apply time.
+        applied_us = protocol.now_us()
+        packets = [(protocol.encode_ack(session, seq, frame, applied_us), addr) for addr, session, seq in acks]
+        try:
+            self.loop.call_soon_threadsafe(self._sendto_all, packets)
+        except RuntimeError:
+            pass
+
+    def _sendto_all(self, packets):
+        for data, addr in packets:
+            self.udp_transport.sendto(data, addr)
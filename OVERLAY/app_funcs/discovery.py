@@ -6,6 +6,7 @@ import pygame
 
 import overlay
 from .paths import base_path
+from .skin_format import list_data_skins
 
 
 def list_skins() -> list[str]:
@@ -17,9 +18,9 @@ def list_skins() -> list[str]:
     for fn in os.listdir(skins_dir):
         if fn.endswith(".py") and not fn.startswith("_") and fn != "__init__.py":
             out.append(os.path.splitext(fn)[0])
+    out.extend(list_data_skins(skins_dir))
 
-    out.sort()
-    return out
+    return sorted(set(out))
 
 
 def list_controllers(max_n: int = 4) -> list[str]:
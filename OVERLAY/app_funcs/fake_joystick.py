@@ -0,0 +1,406 @@
+# app_funcs/fake_joystick.py
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import time
+from typing import Callable, Optional
+
+# Scripted stand-ins for pygame joysticks, for tests and benchmarks on
+# machines without pads (or without a display).
+#
+# A Timeline is a list of segments (press, hat, axis step, stick sweep,
+# seeded random stress) evaluated at time t; a FakeJoystick exposes it
+# through the same get_button/get_axis/get_hat/get_num* surface as
+# pygame.joystick.Joystick; a FakeJoystickDriver has the get_count()/
+# Joystick(i) surface of the pygame.joystick module plus plug/unplug for
+# hot-plug events. Anything that takes a joystick or reads pygame.joystick
+# can be pointed at these, either directly or via install(driver).
+#
+# RETRO_OVERLAY_FAKE_PADS selects a driver from the environment:
+#   "random[:seed[:pads]]", "sweep", "demo" or a path to a JSON script
+#   {"pads": [{"name": ..., "timeline": [{"type": "press", ...}, ...]}],
+#    "loop": seconds}
+
+ENV_VAR = "RETRO_OVERLAY_FAKE_PADS"
+
+NUM_BUTTONS = 12
+NUM_AXES = 6
+NUM_HATS = 1
+
+RANDOM_PRESS_P = 0.2
+
+
+# -----------------------
+# Timelines
+# -----------------------
+class Timeline:
+    def __init__(self, loop: Optional[float] = None):
+        self.loop = loop
+        self.segments: list = []  # (start, end, kind, data), sorted by start
+
+    def _add(self, start: float, end: float, kind: str, data) -> "Timeline":
+        self.segments.append((float(start), float(end), kind, data))
+        self.segments.sort(key=lambda seg: seg[0])
+        return self
+
+    def press(self, button: int, at: float, hold: float = 0.1) -> "Timeline":
+        return self._add(at, at + hold, "button", int(button))
+
+    def sequence(self, buttons: list, start: float = 0.0, hold: float = 0.08, gap: float = 0.05) -> "Timeline":
+        t = start
+        for b in buttons:
+            self.press(b, t, hold)
+            t += hold + gap
+        return self
+
+    def hat(self, x: int, y: int, at: float, hold: float = 0.1) -> "Timeline":
+        return self._add(at, at + hold, "hat", (int(x), int(y)))
+
+    def axis(self, axis: int, value: float, at: float, hold: Optional[float] = None) -> "Timeline":
+        return self._add(at, math.inf if hold is None else at + hold, "axis", (int(axis), float(value)))
+
+    def sweep(
+        self,
+        axes: tuple = (0, 1),
+        start: float = 0.0,
+        duration: float = 1.0,
+        shape: str = "circle",
+        cycles: float = 1.0,
+        radius: float = 1.0,
+    ) -> "Timeline":
+        return self._add(start, start + duration, "sweep", (tuple(axes), shape, cycles / duration, radius))
+
+    def random(
+        self,
+        seed: int = 0,
+        start: float = 0.0,
+        duration: Optional[float] = None,
+        rate_hz: float = 20.0,
+        buttons: int = NUM_BUTTONS,
+        axes: int = NUM_AXES,
+    ) -> "Timeline":
+        end = math.inf if duration is None else start + duration
+        return self._add(start, end, "random", (int(seed), float(rate_hz), int(buttons), int(axes)))
+
+    @classmethod
+    def from_spec(cls, steps: list, loop: Optional[float] = None) -> "Timeline":
+        tl = cls(loop=loop)
+        for st in steps:
+            st = dict(st)
+            kind = st.pop("type")
+            if kind == "sweep" and "axes" in st:
+                st["axes"] = tuple(st["axes"])
+            getattr(tl, kind)(**st)
+        return tl
+
+    def state(self, t: float) -> tuple:
+        """(buttons bitmask, {axis: value}, hat) at time t."""
+        if self.loop:
+            t %= self.loop
+
+        buttons = 0
+        axes: dict = {}
+        hat = (0, 0)
+
+        for start, end, kind, data in self.segments:
+            if start > t:
+                break
+            if t >= end:
+                continue
+
+            if kind == "button":
+                buttons |= 1 << data
+            elif kind == "hat":
+                hat = data
+            elif kind == "axis":
+                axes[data[0]] = data[1]
+            elif kind == "sweep":
+                (ax, *rest), shape, freq, radius = data
+                phase = (t - start) * freq
+                if shape == "line":
+                    # Triangle wave -1 -> 1 -> -1 on every listed axis.
+                    v = radius * (1.0 - 4.0 * abs((phase % 1.0) - 0.5))
+                    axes[ax] = v
+                    for other in rest:
+                        axes[other] = v
+                else:
+                    a = 2.0 * math.pi * phase
+                    axes[ax] = radius * math.cos(a)
+                    if rest:
+                        axes[rest[0]] = radius * (math.sin(2.0 * a) if shape == "figure8" else math.sin(a))
+            elif kind == "random":
+                seed, rate_hz, n_buttons, n_axes = data
+                # One independent draw per bucket keeps any t O(1) and reproducible.
+                rng = random.Random((seed << 32) ^ int((t - start) * rate_hz))
+                for b in range(n_buttons):
+                    if rng.random() < RANDOM_PRESS_P:
+                        buttons |= 1 << b
+                for a in range(n_axes):
+                    axes[a] = rng.uniform(-1.0, 1.0)
+                hat = (rng.choice((-1, 0, 0, 1)), rng.choice((-1, 0, 0, 1)))
+
+        return buttons, axes, hat
+
+
+# -----------------------
+# Joystick
+# -----------------------
+def _realtime_clock() -> Callable[[], float]:
+    t0 = time.perf_counter()
+    # Millisecond steps, so repeated get_* calls within a poll share one state.
+    return lambda: round(time.perf_counter() - t0, 3)
+
+
+class FakeJoystick:
+    def __init__(
+        self,
+        index: int = 0,
+        timeline: Optional[Timeline] = None,
+        *,
+        name: Optional[str] = None,
+        num_buttons: int = NUM_BUTTONS,
+        num_axes: int = NUM_AXES,
+        num_hats: int = NUM_HATS,
+        clock: Optional[Callable[[], float]] = None,
+        guid: Optional[str] = None,
+    ):
+        self.index = index
+        self.instance_id = index
+        self.timeline = timeline or Timeline()
+        self.name = name or f"Fake Controller {index}"
+        self.guid = guid or f"fa4e{index:028x}"
+        self.num_buttons = num_buttons
+        self.num_axes = num_axes
+        self.num_hats = num_hats
+        self.clock = clock or _realtime_clock()
+
+        self._initialized = False
+        self._t = None
+        self._state = (0, {}, (0, 0))
+
+    def _current(self) -> tuple:
+        t = self.clock()
+        if t != self._t:
+            self._t = t
+            self._state = self.timeline.state(t)
+        return self._state
+
+    def init(self):
+        self._initialized = True
+
+    def quit(self):
+        self._initialized = False
+
+    def get_init(self) -> bool:
+        return self._initialized
+
+    def get_id(self) -> int:
+        return self.index
+
+    def get_instance_id(self) -> int:
+        return self.instance_id
+
+    def get_guid(self) -> str:
+        return self.guid
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_power_level(self) -> str:
+        return "wired"
+
+    def get_numbuttons(self) -> int:
+        return self.num_buttons
+
+    def get_numaxes(self) -> int:
+        return self.num_axes
+
+    def get_numhats(self) -> int:
+        return self.num_hats
+
+    def get_numballs(self) -> int:
+        return 0
+
+    def get_button(self, i: int) -> int:
+        return (self._current()[0] >> i) & 1 if 0 <= i < self.num_buttons else 0
+
+    def get_axis(self, i: int) -> float:
+        if not 0 <= i < self.num_axes:
+            return 0.0
+        return max(-1.0, min(1.0, self._current()[1].get(i, 0.0)))
+
+    def get_hat(self, i: int) -> tuple[int, int]:
+        return self._current()[2] if 0 <= i < self.num_hats else (0, 0)
+
+    def rumble(self, low: float, high: float, duration: int) -> bool:
+        return False
+
+    def stop_rumble(self):
+        pass
+
+
+# -----------------------
+# Driver (pygame.joystick surface)
+# -----------------------
+class FakeJoystickDriver:
+    def __init__(self, pads: Optional[list] = None, manual_clock: bool = False):
+        self._now = 0.0
+        self.clock = (lambda: self._now) if manual_clock else _realtime_clock()
+        self.pads: list[FakeJoystick] = []
+        self._next_instance = 0
+        self._initialized = False
+        for js in pads or []:
+            self._attach(js)
+
+    def _attach(self, js: FakeJoystick) -> FakeJoystick:
+        js.clock = self.clock
+        js.instance_id = self._next_instance
+        self._next_instance += 1
+        self.pads.append(js)
+        return js
+
+    # Manual clock, for deterministic runs and compressed time.
+    def set_time(self, t: float):
+        self._now = float(t)
+
+    def advance(self, dt: float):
+        self._now += dt
+
+    # pygame.joystick module surface
+    def init(self):
+        self._initialized = True
+
+    def quit(self):
+        self._initialized = False
+
+    def get_init(self) -> bool:
+        return self._initialized
+
+    def get_count(self) -> int:
+        return len(self.pads)
+
+    def Joystick(self, index: int) -> FakeJoystick:
+        if not 0 <= index < len(self.pads):
+            raise _pygame_error("Invalid joystick device number")
+        return self.pads[index]
+
+    # Hot-plug
+    def plug(self, js: Optional[FakeJoystick] = None, timeline: Optional[Timeline] = None) -> int:
+        js = js or FakeJoystick(len(self.pads), timeline)
+        self._attach(js)
+        _post("JOYDEVICEADDED", device_index=len(self.pads) - 1, guid=js.guid)
+        return len(self.pads) - 1
+
+    def unplug(self, index: int) -> Optional[FakeJoystick]:
+        if not 0 <= index < len(self.pads):
+            return None
+        js = self.pads.pop(index)
+        js.quit()
+        _post("JOYDEVICEREMOVED", instance_id=js.instance_id)
+        return js
+
+
+def _pygame_error(msg: str) -> Exception:
+    try:
+        import pygame
+
+        return pygame.error(msg)
+    except ImportError:
+        return RuntimeError(msg)
+
+
+def _post(event_name: str, **attrs):
+    try:
+        import pygame
+
+        pygame.event.post(pygame.event.Event(getattr(pygame, event_name), attrs))
+    except Exception:
+        pass
+
+
+_saved: dict = {}
+
+
+def install(driver: FakeJoystickDriver):
+    """Points pygame.joystick.get_count/Joystick/init at the driver."""
+    import pygame
+
+    if not _saved:
+        for name in ("init", "quit", "get_init", "get_count", "Joystick"):
+            _saved[name] = getattr(pygame.joystick, name)
+    for name in ("init", "quit", "get_init", "get_count", "Joystick"):
+        setattr(pygame.joystick, name, getattr(driver, name))
+    return driver
+
+
+def uninstall():
+    import pygame
+
+    for name, fn in _saved.items():
+        setattr(pygame.joystick, name, fn)
+    _saved.clear()
+
+
+# -----------------------
+# Presets
+# -----------------------
+def demo_timeline() -> Timeline:
+    tl = Timeline(loop=8.0)
+    tl.sequence([0, 1, 2, 3, 4, 5, 6, 7], start=0.0, hold=0.15, gap=0.1)
+    tl.sweep((0, 1), start=2.0, duration=2.0, shape="circle", cycles=2)
+    tl.sweep((2, 3), start=4.0, duration=2.0, shape="figure8", cycles=1)
+    tl.sweep((4,), start=6.0, duration=1.0, shape="line")
+    tl.sweep((5,), start=7.0, duration=1.0, shape="line")
+    for i, (x, y) in enumerate(((0, 1), (1, 0), (0, -1), (-1, 0))):
+        tl.hat(x, y, at=6.0 + i * 0.5, hold=0.4)
+    return tl
+
+
+def driver_from_spec(spec: str, manual_clock: bool = False) -> FakeJoystickDriver:
+    spec = spec.strip()
+    kind, _sep, rest = spec.partition(":")
+
+    if kind == "random":
+        parts = [p for p in rest.split(":") if p]
+        seed = int(parts[0]) if parts else 0
+        pads = int(parts[1]) if len(parts) > 1 else 1
+        return FakeJoystickDriver(
+            [FakeJoystick(i, Timeline().random(seed=seed + i)) for i in range(pads)], manual_clock
+        )
+    if kind == "sweep":
+        tl = Timeline(loop=4.0).sweep((0, 1), 0.0, 4.0, "circle", 2).sweep((2, 3), 0.0, 4.0, "line", 2)
+        return FakeJoystickDriver([FakeJoystick(0, tl)], manual_clock)
+    if kind == "demo":
+        return FakeJoystickDriver([FakeJoystick(0, demo_timeline())], manual_clock)
+
+    with open(spec, "r", encoding="utf-8") as f:
+        script = json.load(f)
+    loop = script.get("loop")
+    pads = []
+    for i, pad in enumerate(script.get("pads", [])):
+        pads.append(FakeJoystick(
+            i,
+            Timeline.from_spec(pad.get("timeline", []), loop=pad.get("loop", loop)),
+            name=pad.get("name"),
+            num_buttons=int(pad.get("buttons", NUM_BUTTONS)),
+            num_axes=int(pad.get("axes", NUM_AXES)),
+            num_hats=int(pad.get("hats", NUM_HATS)),
+        ))
+    return FakeJoystickDriver(pads, manual_clock)
+
+
+def driver_from_env() -> Optional[FakeJoystickDriver]:
+    spec = os.environ.get(ENV_VAR, "").strip()
+    if not spec:
+        return None
+    return driver_from_spec(spec)
+
+
+def install_from_env() -> Optional[FakeJoystickDriver]:
+    driver = driver_from_env()
+    if driver is not None:
+        install(driver)
+    return driver
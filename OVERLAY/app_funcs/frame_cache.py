@@ -0,0 +1,162 @@
+# app_funcs/frame_cache.py
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+
+import pygame
+
+# Per-overlay LRU of fully drawn skin frames.
+#
+# The key is the pad state as the skin can actually show it: the mapped
+# buttons, hat 0 and every mapped axis quantized to the skin's pixel
+# resolution at the current scale. A skin lists that resolution in design
+# pixels per unit of deflection as `axis_px` (stick travel, trigger height);
+# unlisted axes get DEFAULT_AXIS_STEPS. Misses are drawn from the quantized
+# state rather than the raw one, so a cached frame is exactly what skin.draw
+# would produce for its key. Skins with `cacheable = False` are never cached.
+#
+# Only skins drawn by hand (skin.draw, no scene) go through a cache. Scene
+# skins (app_funcs/scene.py) already repaint just the nodes whose state
+# changed and nothing on an idle frame, which is what a hit would save.
+#
+# A stick in motion can produce more distinct keys than the budget holds, and
+# an LRU over a cycle larger than itself never hits while every miss still
+# pays the copy into the cache. After each WINDOW lookups hitting under
+# MIN_HIT_RATE the cache stops storing for BYPASS_WINDOWS windows (lookups
+# still serve what it has), then measures again.
+#
+# A cache belongs to one (skin, scale); the engine drops it when either
+# changes.
+
+DEFAULT_MAX_BYTES = 24 * 1024 * 1024
+DEFAULT_AXIS_STEPS = 256
+WINDOW = 120
+MIN_HIT_RATE = 0.1
+BYPASS_WINDOWS = 8
+
+
+class QuantizedInput:
+    """InputState look-alike that replays a cache key."""
+
+    def __init__(self, buttons: dict, axes: dict, hat: tuple):
+        self._buttons = buttons
+        self._axes = axes
+        self._hat = hat
+
+    def button(self, name: str) -> bool:
+        return self._buttons.get(name, False)
+
+    def axis(self, name: str) -> float:
+        return self._axes.get(name, 0.0)
+
+    def stick(self, name: str, dz) -> float:
+        return dz(self.axis(name))
+
+    def trigger(self, name: str, norm_trigger) -> float:
+        return norm_trigger(self.axis(name))
+
+    def hat(self, index: int = 0) -> tuple[int, int]:
+        return self._hat if index == 0 else (0, 0)
+
+
+class FrameCache:
+    def __init__(self, skin, scale: float, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max(0, int(max_bytes))
+        self.btn_names = tuple(skin.btn_map)
+        self.axis_names = tuple(skin.axis_map)
+
+        axis_px = getattr(skin, "axis_px", {}) or {}
+        self.steps = tuple(
+            max(1, math.ceil(axis_px[name] * scale)) if name in axis_px else DEFAULT_AXIS_STEPS
+            for name in self.axis_names
+        )
+
+        self._frames: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+        self._window_lookups = 0
+        self._window_hits = 0
+        self._bypass_left = 0
+
+    def key(self, inp) -> tuple:
+        """Quantized state of an InputState (reads the pad once)."""
+        buttons = 0
+        for i, name in enumerate(self.btn_names):
+            if inp.button(name):
+                buttons |= 1 << i
+        axes = tuple(
+            round(max(-1.0, min(1.0, inp.axis(name))) * steps)
+            for name, steps in zip(self.axis_names, self.steps)
+        )
+        return buttons, axes, tuple(inp.hat(0))
+
+    def input_for(self, key: tuple) -> QuantizedInput:
+        buttons, axes, hat = key
+        return QuantizedInput(
+            {name: bool(buttons >> i & 1) for i, name in enumerate(self.btn_names)},
+            {name: q / steps for name, q, steps in zip(self.axis_names, axes, self.steps)},
+            hat,
+        )
+
+    def _count(self, hit: bool):
+        self._window_lookups += 1
+        self._window_hits += hit
+        if self._window_lookups < WINDOW:
+            return
+        if self._bypass_left:
+            self._bypass_left -= 1
+        elif self._window_hits < WINDOW * MIN_HIT_RATE:
+            self._bypass_left = BYPASS_WINDOWS
+        self._window_lookups = self._window_hits = 0
+
+    def get(self, key: tuple):
+        surf = self._frames.get(key)
+        self._count(surf is not None)
+        if surf is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return surf
+
+    def put(self, key: tuple, surf: pygame.Surface) -> pygame.Surface:
+        """Stores a copy of a freshly drawn frame and returns it (or surf itself, not stored)."""
+        size = surf.get_width() * surf.get_height() * surf.get_bytesize()
+        if size > self.max_bytes:
+            return surf
+        if self._bypass_left:
+            self.bypassed += 1
+            return surf
+        frame = surf.copy()
+
+        while self._frames and self.bytes + size > self.max_bytes:
+            _key, old = self._frames.popitem(last=False)
+            self.bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+            self.evictions += 1
+
+        self._frames[key] = frame
+        self.bytes += size
+        return frame
+
+    def clear(self):
+        self._frames.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._frames),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bypassed": self.bypassed,
+            "storing": not self._bypass_left,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,141 @@
+# app_funcs/input_feed.py
+from __future__ import annotations
+
+import ipaddress
+import socket
+import struct
+from typing import Iterator, Optional
+
+from .input_frames import FRAME_SIZE, now_us, pack_frame, sample_joystick, unpack_frame
+
+# Local input broadcast: the overlay already polls every pad, so it publishes
+# per-controller input frames for other tools (OBS input displays, bridges,
+# analytics) instead of each of them opening the devices again.
+#
+# Target is "host:port" (UDP unicast or multicast) or "unix:/path" (datagram
+# Unix socket, where supported). Frames go out at most rate_hz; a controller
+# whose state hasn't changed is only re-sent every heartbeat_s.
+
+DEFAULT_TARGET = "239.255.43.21:29310"
+DEFAULT_RATE_HZ = 120
+HEARTBEAT_S = 1.0
+
+
+def parse_target(target: str) -> tuple:
+    target = (target or DEFAULT_TARGET).strip()
+    if target.startswith("unix:"):
+        return ("unix", target[len("unix:"):])
+    host, _sep, port = target.rpartition(":")
+    return ("udp", (host or "127.0.0.1", int(port)))
+
+
+def _is_multicast(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_multicast
+    except ValueError:
+        return False
+
+
+class InputFeed:
+    def __init__(self, target: str = DEFAULT_TARGET, rate_hz: float = DEFAULT_RATE_HZ, heartbeat_s: float = HEARTBEAT_S):
+        self.kind, self.addr = parse_target(target)
+        self.period_us = int(1_000_000 / max(1.0, float(rate_hz)))
+        self.heartbeat_us = int(heartbeat_s * 1_000_000)
+
+        if self.kind == "unix":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            if _is_multicast(self.addr[0]):
+                # Stay on this machine's segment and loop back to local listeners.
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+                self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self.sock.setblocking(False)
+
+        self._next_us = 0
+        self._seq = 0
+        self._last_state: dict[int, tuple] = {}
+        self._last_sent_us: dict[int, int] = {}
+
+        self.sent = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def publish(self, joysticks: list, t_us: Optional[int] = None) -> int:
+        """
+        Samples (controller_index, joystick) pairs and sends changed frames.
+        Call once per engine frame; returns the number of frames sent.
+        """
+        t = now_us() if t_us is None else t_us
+        if t < self._next_us:
+            return 0
+        self._next_us = t + self.period_us
+
+        n = 0
+        for ci, js in joysticks:
+            if js is None:
+                continue
+            try:
+                state = sample_joystick(js)
+            except Exception:
+                continue
+
+            if state == self._last_state.get(ci) and t - self._last_sent_us.get(ci, 0) < self.heartbeat_us:
+                self.skipped += 1
+                continue
+
+            self._seq = (self._seq + 1) & 0xFFFFFFFF
+            try:
+                self.sock.sendto(pack_frame(ci, self._seq, t, state), self.addr)
+            except OSError:
+                self.errors += 1
+                continue
+
+            self._last_state[ci] = state
+            self._last_sent_us[ci] = t
+            self.sent += 1
+            n += 1
+        return n
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "skipped": self.skipped, "errors": self.errors}
+
+
+# -----------------------
+# Consumers
+# -----------------------
+def subscribe(target: str = DEFAULT_TARGET, timeout: Optional[float] = None) -> socket.socket:
+    kind, addr = parse_target(target)
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(addr)
+    else:
+        host, port = addr
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if _is_multicast(host):
+            sock.bind(("", port))
+            mreq = struct.pack("4s4s", socket.inet_aton(host), socket.inet_aton("0.0.0.0"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        else:
+            sock.bind((host, port))
+    sock.settimeout(timeout)
+    return sock
+
+
+def iter_frames(sock: socket.socket) -> Iterator[dict]:
+    while True:
+        try:
+            data = sock.recv(FRAME_SIZE * 4)
+        except socket.timeout:
+            return
+        try:
+            yield unpack_frame(data)
+        except ValueError:
+            continue
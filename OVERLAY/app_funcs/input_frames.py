@@ -0,0 +1,109 @@
+# app_funcs/input_frames.py
+from __future__ import annotations
+
+import struct
+import time
+
+# Fixed-size, per-controller input frame.
+#
+#   magic "RI" | version u8 | controller u8 | seq u32 | t_us u64
+#   | buttons u32 bitmask | hat x i8 | hat y i8 | axis count u8 | epoch u8
+#   | MAX_AXES x i16 (axis * 32767)
+#
+# 36 bytes little-endian, the same layout whether it goes out on the local
+# broadcast feed or over the network to a remote overlay. epoch is picked at
+# random by each sender instance (0 from senders that predate it), so a
+# receiver can tell a restarted sender, whose seq starts over, from stale
+# datagrams.
+#
+# Clock sync runs on the same socket pair, receiver -> sender and back:
+#
+#   magic "RS" | version u8 | kind u8 (0 ping, 1 pong) | t_ping u64 | t_reply u64
+#
+# t_ping is the receiver's clock when it sent the ping, echoed back; t_reply
+# is the sender's clock when it answered (0 in a ping).
+
+FRAME_MAGIC = b"RI"
+FRAME_VERSION = 1
+
+MAX_BUTTONS = 32
+MAX_AXES = 6
+AXIS_SCALE = 32767
+
+FRAME = struct.Struct("<2sBBIQIbbBB6h")
+FRAME_SIZE = FRAME.size
+
+SYNC_MAGIC = b"RS"
+SYNC_PING = 0
+SYNC_PONG = 1
+SYNC = struct.Struct("<2sBBQQ")
+
+
+def now_us() -> int:
+    return time.perf_counter_ns() // 1000
+
+
+def quantize_axis(v: float) -> int:
+    if v >= 1.0:
+        return AXIS_SCALE
+    if v <= -1.0:
+        return -AXIS_SCALE
+    return int(round(v * AXIS_SCALE))
+
+
+def sample_joystick(js) -> tuple:
+    """Returns (buttons, hat_x, hat_y, n_axes, axes) for a pygame-style joystick."""
+    buttons = 0
+    for i in range(min(js.get_numbuttons(), MAX_BUTTONS)):
+        if js.get_button(i):
+            buttons |= 1 << i
+
+    hat_x = hat_y = 0
+    if js.get_numhats() > 0:
+        hat_x, hat_y = js.get_hat(0)
+
+    n_axes = min(js.get_numaxes(), MAX_AXES)
+    axes = [quantize_axis(js.get_axis(i)) for i in range(n_axes)]
+    axes += [0] * (MAX_AXES - n_axes)
+
+    return buttons, int(hat_x), int(hat_y), n_axes, tuple(axes)
+
+
+def pack_frame(controller: int, seq: int, t_us: int, state: tuple, epoch: int = 0) -> bytes:
+    buttons, hat_x, hat_y, n_axes, axes = state
+    return FRAME.pack(
+        FRAME_MAGIC, FRAME_VERSION, controller & 0xFF, seq & 0xFFFFFFFF, t_us,
+        buttons, hat_x, hat_y, n_axes, epoch & 0xFF, *axes,
+    )
+
+
+def unpack_frame(data: bytes) -> dict:
+    if len(data) < FRAME_SIZE:
+        raise ValueError("short input frame")
+    magic, version, controller, seq, t_us, buttons, hat_x, hat_y, n_axes, epoch, *axes = FRAME.unpack_from(data, 0)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("not a v1 input frame")
+    return {
+        "controller": controller,
+        "seq": seq,
+        "t_us": t_us,
+        "buttons": buttons,
+        "hat": (hat_x, hat_y),
+        "n_axes": n_axes,
+        "epoch": epoch,
+        "axes": axes,
+    }
+
+
+def pack_sync(kind: int, t_ping: int, t_reply: int = 0) -> bytes:
+    return SYNC.pack(SYNC_MAGIC, FRAME_VERSION, kind, t_ping, t_reply)
+
+
+def unpack_sync(data: bytes) -> tuple[int, int, int]:
+    """Returns (kind, t_ping, t_reply)."""
+    if len(data) < SYNC.size:
+        raise ValueError("short sync packet")
+    magic, version, kind, t_ping, t_reply = SYNC.unpack_from(data, 0)
+    if magic != SYNC_MAGIC or version != FRAME_VERSION or kind not in (SYNC_PING, SYNC_PONG):
+        raise ValueError("not a v1 sync packet")
+    return kind, t_ping, t_reply
@@ -0,0 +1,289 @@
+# app_funcs/input_log.py
+from __future__ import annotations
+
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from .input_frames import AXIS_SCALE, now_us, sample_joystick
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Append-only recording of what the overlay displayed.
+#
+#   header (32 bytes): magic "RIL1" | version u16 | record size u16
+#                      | start t_us u64 | start wall clock f64 (epoch s)
+#                      | keyframe interval us u64
+#   records (28 bytes): t_us u64 | buttons u32 | hat x i8 | hat y i8
+#                      | controller u8 | flags u8 | 6 x i16 axes
+#
+# t_us is the engine's perf_counter clock; start_t_us/start_wall map it back
+# to wall time. A record is written when a pad's state changes, plus a full
+# FLAG_KEYFRAME record per pad every keyframe interval so a reader can start
+# anywhere. Records are packed into a buffer on the render thread and written
+# by a background thread, so the frame never touches the disk.
+#
+# InputLogReader maps a finished (or still growing) log read-only and views
+# the records as a NumPy structured array without copying. Keyframe
+# positions are indexed once and cached next to the log as <path>.idx, so
+# seeks are a bisect over keyframe times plus a scan of at most one keyframe
+# interval, and time ranges come back as slices of the mapped array.
+
+LOG_MAGIC = b"RIL1"
+LOG_VERSION = 1
+
+HEADER = struct.Struct("<4sHHQdQ")
+RECORD = struct.Struct("<QIbbBB6h")
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+
+FLAG_KEYFRAME = 0x01
+FLAG_DISCONNECT = 0x02
+
+DEFAULT_KEYFRAME_S = 1.0
+FLUSH_BYTES = 64 * 1024
+FLUSH_S = 0.5
+INDEX_HEADER_ROWS = 2
+
+
+class InputRecorder:
+    def __init__(self, path: str, keyframe_s: float = DEFAULT_KEYFRAME_S):
+        self.path = path
+        self.keyframe_us = int(max(0.01, keyframe_s) * 1_000_000)
+        self.start_us = now_us()
+
+        self._f = open(path, "wb")
+        self._f.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, RECORD_SIZE, self.start_us, time.time(), self.keyframe_us))
+
+        self._buf = bytearray()
+        self._last_flush = time.perf_counter()
+        self._last_state: dict[int, tuple] = {}
+        self._last_key_us: dict[int, int] = {}
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="input-log", daemon=True)
+        self._thread.start()
+
+        self.records = 0
+        self.keyframes = 0
+        self.bytes_written = HEADER_SIZE
+
+    def _writer(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            try:
+                self._f.write(chunk)
+            except (OSError, ValueError):
+                continue
+        self._f.close()
+
+    def _append(self, ci: int, t: int, state: tuple, flags: int):
+        buttons, hat_x, hat_y, _n_axes, axes = state
+        self._buf += RECORD.pack(t, buttons, hat_x, hat_y, ci & 0xFF, flags, *axes)
+        self.records += 1
+
+    def record(self, joysticks: list, t_us: Optional[int] = None) -> int:
+        """Samples (controller_index, joystick) pairs; call once per engine frame."""
+        t = now_us() if t_us is None else t_us
+        n = 0
+        seen = set()
+        for ci, js in joysticks:
+            if js is None:
+                continue
+            try:
+                state = sample_joystick(js)
+            except Exception:
+                continue
+            seen.add(ci)
+
+            key = t - self._last_key_us.get(ci, -self.keyframe_us) >= self.keyframe_us
+            if not key and state == self._last_state.get(ci):
+                continue
+
+            self._append(ci, t, state, FLAG_KEYFRAME if key else 0)
+            if key:
+                self._last_key_us[ci] = t
+                self.keyframes += 1
+            self._last_state[ci] = state
+            n += 1
+
+        for ci in [c for c in self._last_state if c not in seen]:
+            # Pad went away: one marker record so replay doesn't hold its last state.
+            self._append(ci, t, (0, 0, 0, 0, (0,) * 6), FLAG_DISCONNECT)
+            del self._last_state[ci]
+            self._last_key_us.pop(ci, None)
+
+        if len(self._buf) >= FLUSH_BYTES or time.perf_counter() - self._last_flush >= FLUSH_S:
+            self.flush()
+        return n
+
+    def flush(self):
+        self._last_flush = time.perf_counter()
+        if self._buf:
+            self.bytes_written += len(self._buf)
+            self._queue.put(bytes(self._buf))
+            self._buf.clear()
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(5.0)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.records,
+            "keyframes": self.keyframes,
+            "bytes": self.bytes_written + len(self._buf),
+            "queued": self._queue.qsize(),
+        }
+
+
+# -----------------------
+# Reader
+# -----------------------
+def record_dtype():
+    return np.dtype([
+        ("t_us", "<u8"),
+        ("buttons", "<u4"),
+        ("hat_x", "i1"),
+        ("hat_y", "i1"),
+        ("controller", "u1"),
+        ("flags", "u1"),
+        ("axes", "<i2", (6,)),
+    ])
+
+
+class InputLogReader:
+    def __init__(self, path: str, use_index_cache: bool = True):
+        if np is None:
+            raise RuntimeError("InputLogReader needs numpy")
+
+        self.path = path
+        self._f = open(path, "rb")
+        st = os.fstat(self._f.fileno())
+        size = st.st_size
+        if size < HEADER_SIZE:
+            self._f.close()
+            raise ValueError(f"{path}: not an input log")
+
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rec_size, self.start_us, self.start_wall, self.keyframe_us = HEADER.unpack_from(self._mm, 0)
+        if magic != LOG_MAGIC or version != LOG_VERSION or rec_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path}: unsupported input log")
+
+        # A log still being written may end in a partial record; ignore it.
+        count = (size - HEADER_SIZE) // RECORD_SIZE
+        self.records = np.frombuffer(self._mm, dtype=record_dtype(), count=count, offset=HEADER_SIZE)
+
+        self._key_rows, self._key_t = self._load_index(use_index_cache, st)
+
+    def close(self):
+        # Views into the map must go before the map itself can close.
+        self.records = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ---------- keyframe index ----------
+    def _load_index(self, use_cache: bool, st: os.stat_result):
+        idx_path = self.path + ".idx"
+        n = len(self.records)
+        # The log the index was built for: record count and start time, file
+        # size and mtime. A different log with the same count must not match.
+        header = np.array([[n, self.start_us], [st.st_size, st.st_mtime_ns]], dtype="<u8")
+
+        if use_cache:
+            try:
+                cached = np.load(idx_path)
+                if cached.ndim == 2 and cached.shape[1] == 2 and np.array_equal(cached[:INDEX_HEADER_ROWS], header):
+                    return cached[INDEX_HEADER_ROWS:, 0].astype(np.int64), cached[INDEX_HEADER_ROWS:, 1]
+            except (OSError, ValueError):
+                pass
+
+        rows = np.flatnonzero(self.records["flags"] & FLAG_KEYFRAME)
+        times = self.records["t_us"][rows]
+
+        if use_cache:
+            table = np.empty((len(rows) + INDEX_HEADER_ROWS, 2), dtype="<u8")
+            table[:INDEX_HEADER_ROWS] = header
+            table[INDEX_HEADER_ROWS:, 0] = rows
+            table[INDEX_HEADER_ROWS:, 1] = times
+            try:
+                with open(idx_path, "wb") as f:
+                    np.save(f, table)
+            except OSError:
+                pass
+        return rows.astype(np.int64), times
+
+    # ---------- time helpers ----------
+    def t_from_seconds(self, seconds: float) -> int:
+        return self.start_us + int(seconds * 1_000_000)
+
+    def t_from_wall(self, epoch_s: float) -> int:
+        return self.start_us + int((epoch_s - self.start_wall) * 1_000_000)
+
+    @property
+    def duration_s(self) -> float:
+        if not len(self.records):
+            return 0.0
+        return (int(self.records["t_us"][-1]) - self.start_us) / 1_000_000
+
+    # ---------- seeks ----------
+    def seek(self, t_us: int) -> int:
+        """Index of the first record at or after t_us."""
+        # Last keyframe strictly before t_us: records sharing t_us with a
+        # keyframe can be written ahead of it in the same frame.
+        k = bisect_left(self._key_t, t_us) - 1
+        lo = int(self._key_rows[k]) if k >= 0 else 0
+        hi = int(self._key_rows[k + 1]) + 1 if k + 1 < len(self._key_rows) else len(self.records)
+        # Only the rows between two keyframes get searched (and copied).
+        return lo + int(np.searchsorted(self.records["t_us"][lo:hi], t_us, side="left"))
+
+    def range(self, t0_us: int, t1_us: int):
+        """Records with t0_us <= t < t1_us, as a view into the mapped file."""
+        return self.records[self.seek(t0_us):self.seek(t1_us)]
+
+    def range_seconds(self, start_s: float, end_s: float):
+        return self.range(self.t_from_seconds(start_s), self.t_from_seconds(end_s))
+
+    def state_at(self, t_us: int) -> dict:
+        """Latest record per controller at time t_us (from the last keyframe on)."""
+        end = self.seek(t_us + 1)
+        # Keyframes land on the first frame after each interval, so a pad's
+        # latest one can be a little more than keyframe_us back.
+        start = self.seek(t_us - 2 * self.keyframe_us)
+        window = self.records[start:end]
+
+        out = {}
+        for ci in np.unique(window["controller"]):
+            rec = window[np.flatnonzero(window["controller"] == ci)[-1]]
+            if not rec["flags"] & FLAG_DISCONNECT:
+                out[int(ci)] = rec
+        return out
+
+    @staticmethod
+    def axes_float(rec) -> list:
+        return [int(v) / AXIS_SCALE for v in rec["axes"]]
@@ -0,0 +1,113 @@
+# app_funcs/latency_probe.py
+from __future__ import annotations
+
+import time
+from collections import deque
+
+import pygame
+
+from .input_frames import sample_joystick
+
+# Input-to-display latency probe (setting "latency_probe").
+#
+# Every visible frame the engine hands over the drawn pads right after their
+# state became current (event pump / remote release). A pad whose sampled
+# state differs from the last one gets a timestamp; the next present closes it
+# and the sample -> present delay goes into that controller's window.
+#
+# A joystick may also expose state_ns: the perf_counter_ns time its current
+# state originated (remote pads: the sender's sample time on our clock, bench
+# pads: the scripted change time). Those changes additionally report
+# origin -> present, which includes the wait for the next sample.
+
+DEFAULT_WINDOW = 4096
+
+
+def _summary(vals) -> dict:
+    v = sorted(vals)
+    n = len(v)
+    if not n:
+        return {"count": 0}
+    return {
+        "count": n,
+        "p50_ms": round(v[n // 2] / 1e6, 3),
+        "p95_ms": round(v[min(n - 1, int(n * 0.95))] / 1e6, 3),
+        "p99_ms": round(v[min(n - 1, int(n * 0.99))] / 1e6, 3),
+        "max_ms": round(v[-1] / 1e6, 3),
+    }
+
+
+class LatencyProbe:
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = max(16, int(window))
+        self._states = {}
+        # ci -> (sample_ns, origin_ns or None), waiting for the next present
+        self._pending = {}
+        self._sample = {}
+        self._origin = {}
+        self.changes = 0
+
+    def _hist(self, table: dict, ci: int) -> deque:
+        h = table.get(ci)
+        if h is None:
+            h = table[ci] = deque(maxlen=self.window)
+        return h
+
+    def sample(self, items, t_ns: int | None = None):
+        """items: (controller index, joystick or None) pairs about to be drawn."""
+        t = time.perf_counter_ns() if t_ns is None else t_ns
+        for ci, js in items:
+            if js is None:
+                self._states.pop(ci, None)
+                continue
+            try:
+                state = sample_joystick(js)
+            except pygame.error:
+                continue
+            if self._states.get(ci) == state:
+                continue
+            first = ci not in self._states
+            self._states[ci] = state
+            if first or ci in self._pending:
+                # A freshly opened pad isn't a change; a second change before
+                # the present keeps the older (first undisplayed) timestamp.
+                continue
+            origin = getattr(js, "state_ns", None)
+            # Pads that compute their state on read (fake/scripted) can be
+            # newer than the frame's sample point; it was seen no earlier than that.
+            self._pending[ci] = (t if origin is None else max(t, origin), origin)
+
+    def presented(self, t_ns: int | None = None):
+        if not self._pending:
+            return
+        t = time.perf_counter_ns() if t_ns is None else t_ns
+        for ci, (t_sample, t_origin) in self._pending.items():
+            self._hist(self._sample, ci).append(t - t_sample)
+            if t_origin is not None:
+                self._hist(self._origin, ci).append(t - t_origin)
+            self.changes += 1
+        self._pending.clear()
+
+    def forget(self, ci: int | None = None):
+        """Drops per-pad state (layout rebuilt / pad re-opened)."""
+        if ci is None:
+            self._states.clear()
+            self._pending.clear()
+        else:
+            self._states.pop(ci, None)
+            self._pending.pop(ci, None)
+
+    def reset(self):
+        self.forget()
+        self._sample.clear()
+        self._origin.clear()
+        self.changes = 0
+
+    def stats(self) -> dict:
+        out = {"changes": self.changes, "controllers": {}}
+        for ci in sorted(self._sample):
+            entry = {"sample_to_present": _summary(self._sample[ci])}
+            if self._origin.get(ci):
+                entry["origin_to_present"] = _summary(self._origin[ci])
+            out["controllers"][str(ci)] = entry
+        return out
@@ -11,6 +11,9 @@ DEFAULT_UDP_PORT = 29301
 def run_as_overlay_mode() -> None:
     port = DEFAULT_UDP_PORT
     settings = {}
+    shm_name = None
+    stream_port = None
+    stream_path = None
 
     if "--port" in sys.argv:
         try:
@@ -28,4 +31,75 @@ def run_as_overlay_mode() -> None:
         except Exception:
             settings = {}
 
-    overlay.run_overlay_live(settings, udp_port=port)
\ No newline at end of file
+    if "--record" in sys.argv:
+        try:
+            settings["input_record"] = sys.argv[sys.argv.index("--record") + 1]
+        except Exception:
+            pass
+
+    if "--shm" in sys.argv:
+        try:
+            shm_name = sys.argv[sys.argv.index("--shm") + 1]
+        except Exception:
+            shm_name = None
+
+    if "--control-tcp" in sys.argv:
+        try:
+            stream_port = int(sys.argv[sys.argv.index("--control-tcp") + 1])
+        except Exception:
+            stream_port = None
+
+    if "--control-unix" in sys.argv:
+        try:
+            stream_path = sys.argv[sys.argv.index("--control-unix") + 1]
+        except Exception:
+            stream_path = None
+
+    remote_port = None
+    remote_jitter_ms = None
+
+    if "--remote-listen" in sys.argv:
+        try:
+            remote_port = int(sys.argv[sys.argv.index("--remote-listen") + 1])
+        except Exception:
+            remote_port = None
+
+    if "--jitter-ms" in sys.argv:
+        try:
+            remote_jitter_ms = float(sys.argv[sys.argv.index("--jitter-ms") + 1])
+        except Exception:
+            remote_jitter_ms = None
+
+    overlay.run_overlay_live(
+        settings,
+        udp_port=port,
+        standby="--standby" in sys.argv,
+        shm_name=shm_name,
+        stream_port=stream_port,
+        stream_path=stream_path,
+        remote_port=remote_port,
+        remote_jitter_ms=remote_jitter_ms,
+    )
+
+
+def run_as_sender_mode() -> None:
+    from .input_feed import parse_target
+    from .remote_input import DEFAULT_REMOTE_PORT, DEFAULT_SEND_HZ, run_sender
+
+    target = ("127.0.0.1", DEFAULT_REMOTE_PORT)
+    rate_hz = DEFAULT_SEND_HZ
+
+    try:
+        kind, addr = parse_target(sys.argv[sys.argv.index("--remote-send") + 1])
+        if kind == "udp":
+            target = addr
+    except Exception:
+        pass
+
+    if "--rate" in sys.argv:
+        try:
+            rate_hz = float(sys.argv[sys.argv.index("--rate") + 1])
+        except Exception:
+            rate_hz = DEFAULT_SEND_HZ
+
+    run_sender(target, rate_hz=rate_hz)
\ No newline at end of file
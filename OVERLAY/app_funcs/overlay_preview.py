@@ -15,12 +15,14 @@ def build_preview_ctk_image(
     monitor_rect: Tuple[int, int, int, int],
     settings: Dict[str, Any],
     max_size: Tuple[int, int] = (560, 315),
+    joysticks: Optional[Dict[int, Any]] = None,
 ) -> Optional[ctk.CTkImage]:
     """
     Returns a CTkImage showing:
     - current monitor screenshot (if provided)
     - controller skins placed in their corners using current settings
-    This is only a preview (no input polling).
+    This is only a preview (no input polling); pass joysticks
+    {controller_index: joystick} to draw live or scripted input instead.
     """
     left, top, right, bottom = monitor_rect
     mon_w = max(1, right - left)
@@ -59,7 +61,8 @@ def build_preview_ctk_image(
             skin_surf = pygame.Surface((out_w, out_h), pygame.SRCALPHA)
             skin_surf.fill((0, 0, 0, 0))
 
-            dummy = overlay.InputState(None, getattr(skin, "btn_map", {}), getattr(skin, "axis_map", {}))
+            js = (joysticks or {}).get(int(cfg.get("controller_index", 0)))
+            dummy = overlay.InputState(js, getattr(skin, "btn_map", {}), getattr(skin, "axis_map", {}))
             skin.draw(skin_surf, dummy, overlay.dz, overlay.norm_trigger, scale)
 
             px, py = overlay.compute_position_in_rect(
@@ -11,7 +11,13 @@ from .settings_codec import b64_encode_settings
 def overlay_running(proc: Optional[subprocess.Popen]) -> bool:
     return proc is not None and proc.poll() is None
 
-def start_overlay_process(settings: dict, *, udp_port: int) -> subprocess.Popen:
+def start_overlay_process(
+    settings: dict,
+    *,
+    udp_port: int,
+    standby: bool = False,
+    shm_name: Optional[str] = None,
+) -> subprocess.Popen:
     settings_b64 = b64_encode_settings(settings)
 
     if getattr(sys, "frozen", False):
@@ -27,6 +33,14 @@ def start_overlay_process(settings: dict, *, udp_port: int) -> subprocess.Popen:
             settings_b64,
         ]
 
+    # Standby overlays start hidden and wait for a "show" message.
+    if standby:
+        cmd.append("--standby")
+
+    # Same-machine shared memory settings/status block created by the App.
+    if shm_name:
+        cmd += ["--shm", shm_name]
+
     return subprocess.Popen(cmd)
 
 def stop_overlay_process(proc: Optional[subprocess.Popen]):
@@ -0,0 +1,342 @@
+# app_funcs/pad_mapping.py
+from __future__ import annotations
+
+import os
+import sys
+from typing import Optional
+
+import pygame
+
+from .calibration import joystick_guid
+from .paths import user_data_path
+
+try:
+    from pygame._sdl2 import controller as sdl_controller
+except Exception:  # pygame built without the SDL2 controller module
+    sdl_controller = None
+
+# Semantic input names (SDL GameController naming) resolved per device.
+#
+# A skin may declare `bindings = {"A": "a", "LB": "leftshoulder", "LX":
+# "leftx", ...}` instead of raw indices. At layout time the engine finds the
+# pad's mapping, once per device:
+#
+#   1. gamecontrollerdb.txt in the user data directory (SDL's community DB
+#      format, matched by GUID and platform) - user overrides
+#   2. SDL's own GameController mapping for the device (pygame._sdl2)
+#   3. XINPUT_MAPPING, the index order the stock skins always assumed
+#
+# and compiles the skin's names against it (PadBindings): names with a plain
+# button/axis source land in btn_map/axis_map index tables like a hand-written
+# skin's, everything else (buttons read off hats or axes, half/inverted axes,
+# a d-pad made of buttons) in flat binding tuples that MappedInput reads.
+#
+# load_skin() fills a bindings skin's btn_map/axis_map from XINPUT_MAPPING,
+# so previews and tools that don't resolve a device keep working.
+
+BUTTONS = (
+    "a", "b", "x", "y", "back", "guide", "start", "leftstick", "rightstick",
+    "leftshoulder", "rightshoulder", "dpup", "dpdown", "dpleft", "dpright",
+    "misc1", "paddle1", "paddle2", "paddle3", "paddle4", "touchpad",
+)
+AXES = ("leftx", "lefty", "rightx", "righty", "lefttrigger", "righttrigger")
+DPAD = ("dpup", "dpdown", "dpleft", "dpright")
+HAT_MASKS = {"dpup": 1, "dpright": 2, "dpdown": 4, "dpleft": 8}
+
+XINPUT_MAPPING = (
+    "a:b0,b:b1,x:b2,y:b3,leftshoulder:b4,rightshoulder:b5,back:b6,start:b7,"
+    "leftstick:b8,rightstick:b9,guide:b10,"
+    "leftx:a0,lefty:a1,rightx:a2,righty:a3,lefttrigger:a4,righttrigger:a5,"
+    "dpup:h0.1,dpright:h0.2,dpdown:h0.4,dpleft:h0.8"
+)
+
+DB_FILE = "gamecontrollerdb.txt"
+PLATFORM = {"win32": "Windows", "darwin": "Mac OS X"}.get(sys.platform, "Linux")
+
+# Half-deflection threshold for buttons read off an axis.
+AXIS_PRESS = 0.5
+
+
+# -----------------------
+# Parsing
+# -----------------------
+def parse_binding(text: str) -> Optional[tuple]:
+    """'b3' / 'h0.4' / 'a2' / '+a2' / '-a2' / 'a2~' -> (kind, index, arg, invert).
+
+    arg is the hat mask for 'h', the half (+1/-1, 0 = whole axis) for 'a'.
+    """
+    t = text.strip()
+    invert = t.endswith("~")
+    if invert:
+        t = t[:-1]
+    half = 0
+    if t[:1] in ("+", "-"):
+        half = 1 if t[0] == "+" else -1
+        t = t[1:]
+    try:
+        if t.startswith("b"):
+            return ("b", int(t[1:]), 0, False)
+        if t.startswith("h"):
+            hat, mask = t[1:].split(".")
+            return ("h", int(hat), int(mask), False)
+        if t.startswith("a"):
+            return ("a", int(t[1:]), half, invert)
+    except ValueError:
+        return None
+    return None
+
+
+def binding_text(binding: tuple) -> str:
+    """Inverse of parse_binding()."""
+    kind, idx, arg, invert = binding
+    if kind == "h":
+        return f"h{idx}.{arg}"
+    if kind == "b":
+        return f"b{idx}"
+    half = "+" if arg > 0 else "-" if arg < 0 else ""
+    return f"{half}a{idx}{'~' if invert else ''}"
+
+
+def parse_mapping(mapping) -> dict:
+    """SDL mapping fields ("a:b0,b:b1,..." or a get_mapping() dict) -> {name: binding}."""
+    if isinstance(mapping, str):
+        items = (field.split(":", 1) for field in mapping.split(",") if ":" in field)
+    else:
+        items = mapping.items()
+    out = {}
+    for name, text in items:
+        name = name.strip()
+        if name in BUTTONS or name in AXES:
+            binding = parse_binding(str(text))
+            if binding is not None:
+                out[name] = binding
+    return out
+
+
+XINPUT = parse_mapping(XINPUT_MAPPING)
+
+
+def mapping_line(guid: str, name: str, fields: dict) -> str:
+    """SDL DB line for {semantic: "b0" / "+a2" / ...}."""
+    name = name.replace(",", " ").strip() or "Controller"
+    body = "".join(f"{k}:{v}," for k, v in fields.items())
+    return f"{guid},{name},{body}platform:{PLATFORM},"
+
+
+def default_maps(bindings: dict) -> tuple[dict, dict]:
+    """btn_map/axis_map for a bindings skin on an XInput-ordered pad."""
+    pad = PadBindings(bindings, XINPUT)
+    return pad.btn_map, pad.axis_map
+
+
+# -----------------------
+# Device resolution
+# -----------------------
+def sdl_mapping(js) -> Optional[dict]:
+    """SDL's GameController mapping for an opened local joystick, if it has one."""
+    if sdl_controller is None or not isinstance(js, pygame.joystick.JoystickType):
+        return None
+    try:
+        if not sdl_controller.get_init():
+            sdl_controller.init()
+            # The overlay reads joysticks; don't double the event traffic.
+            sdl_controller.set_eventstate(False)
+        if not sdl_controller.is_controller(js.get_id()):
+            return None
+        ctrl = sdl_controller.Controller.from_joystick(js)
+        try:
+            mapping = parse_mapping(ctrl.get_mapping())
+        finally:
+            ctrl.quit()
+    except (pygame.error, AttributeError, TypeError, ValueError):
+        return None
+    return mapping or None
+
+
+class MappingDB:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or user_data_path(DB_FILE)
+        self._stamp = None
+        self._by_guid: dict = {}
+
+    def load(self) -> dict:
+        """guid -> {name: binding}; re-read only when the file changed."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._stamp, self._by_guid = None, {}
+            return self._by_guid
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return self._by_guid
+        self._stamp = stamp
+        by_guid = {}
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith("#"):
+                        continue
+                    parts = line.split(",", 2)
+                    if len(parts) < 3:
+                        continue
+                    guid, _name, fields = parts
+                    if "platform:" in fields and f"platform:{PLATFORM}," not in fields + ",":
+                        continue
+                    mapping = parse_mapping(fields)
+                    if mapping:
+                        by_guid[guid.strip().lower()] = mapping
+        except OSError:
+            by_guid = {}
+        self._by_guid = by_guid
+        return by_guid
+
+    def save(self, guid: str, name: str, fields: dict):
+        """Writes one mapping line ({semantic: "b0", ...}), replacing this GUID's line for this platform."""
+        line = mapping_line(guid, name, fields)
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+        kept = []
+        for old in lines:
+            parts = old.split(",", 2)
+            same = len(parts) == 3 and parts[0].strip().lower() == guid.lower()
+            if same and ("platform:" not in parts[2] or f"platform:{PLATFORM}," in parts[2] + ","):
+                continue
+            kept.append(old)
+        kept.append(line)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(kept) + "\n")
+        os.replace(tmp, self.path)
+
+    def resolve(self, js) -> tuple[str, dict]:
+        """(source, mapping) for a joystick: "user", "sdl" or "xinput"."""
+        guid = joystick_guid(js)
+        if guid:
+            mapping = self.load().get(guid.lower())
+            if mapping:
+                return "user", mapping
+        mapping = sdl_mapping(js)
+        if mapping:
+            return "sdl", mapping
+        return "xinput", XINPUT
+
+
+# -----------------------
+# Compiled bindings
+# -----------------------
+class PadBindings:
+    """A skin's bindings (skin name -> semantic name) compiled for one device mapping."""
+
+    def __init__(self, bindings: dict, mapping: dict, source: str = "xinput"):
+        self.source = source
+        self.btn_map = {}
+        self.axis_map = {}
+        # skin name -> binding, for sources that aren't a plain button/axis
+        self.buttons = {}
+        self.axes = {}
+        for name, semantic in bindings.items():
+            binding = mapping.get(semantic)
+            if binding is None:
+                continue
+            kind, idx, arg, invert = binding
+            if semantic in AXES:
+                if kind == "a" and not arg and not invert:
+                    self.axis_map[name] = idx
+                else:
+                    self.axes[name] = binding
+            elif kind == "b":
+                self.btn_map[name] = idx
+            else:
+                self.buttons[name] = binding
+
+        # Hat 0 as skins see it: passed through when the pad's d-pad is hat 0.
+        dpad = tuple(mapping.get(n) for n in DPAD)
+        standard = all(b == ("h", 0, HAT_MASKS[n], False) for b, n in zip(dpad, DPAD))
+        self.dpad = None if standard or not any(dpad) else dpad
+
+
+def _hat_mask(js, hat: int) -> int:
+    x, y = js.get_hat(hat)
+    return (y > 0) | (x > 0) << 1 | (y < 0) << 2 | (x < 0) << 3
+
+
+def read_button(js, binding: tuple) -> bool:
+    kind, idx, arg, invert = binding
+    if kind == "b":
+        return bool(js.get_button(idx))
+    if kind == "h":
+        return bool(_hat_mask(js, idx) & arg)
+    v = -js.get_axis(idx) if invert else js.get_axis(idx)
+    return v < -AXIS_PRESS if arg < 0 else v > AXIS_PRESS
+
+
+def read_axis(js, binding: tuple) -> float:
+    kind, idx, arg, invert = binding
+    if kind == "b":
+        return 1.0 if js.get_button(idx) else 0.0
+    if kind == "h":
+        return 1.0 if _hat_mask(js, idx) & arg else 0.0
+    v = -js.get_axis(idx) if invert else js.get_axis(idx)
+    # Half axes (e.g. both triggers on one DirectInput axis) read 0..1.
+    return max(v * arg, 0.0) if arg else v
+
+
+class MappedInput:
+    """InputState look-alike reading a skin's names through PadBindings."""
+
+    def __init__(self, joystick, pad: PadBindings):
+        self.joystick = joystick
+        self.pad = pad
+        self.btn_map = pad.btn_map
+        self.axis_map = pad.axis_map
+
+    def button(self, name: str) -> bool:
+        js = self.joystick
+        if not js:
+            return False
+        try:
+            idx = self.btn_map.get(name)
+            if idx is not None:
+                return bool(js.get_button(idx))
+            binding = self.pad.buttons.get(name)
+            return binding is not None and read_button(js, binding)
+        except pygame.error:
+            return False
+
+    def axis(self, name: str) -> float:
+        js = self.joystick
+        if not js:
+            return 0.0
+        try:
+            idx = self.axis_map.get(name)
+            if idx is not None:
+                return float(js.get_axis(idx))
+            binding = self.pad.axes.get(name)
+            return 0.0 if binding is None else float(read_axis(js, binding))
+        except pygame.error:
+            return 0.0
+
+    def stick(self, name: str, dz) -> float:
+        return dz(self.axis(name))
+
+    def trigger(self, name: str, norm_trigger) -> float:
+        return norm_trigger(self.axis(name))
+
+    def hat(self, index: int = 0) -> tuple[int, int]:
+        js = self.joystick
+        if not js:
+            return (0, 0)
+        try:
+            if index == 0 and self.pad.dpad is not None:
+                up, down, left, right = (b is not None and read_button(js, b) for b in self.pad.dpad)
+                return (right - left, up - down)
+            if js.get_numhats() <= index:
+                return (0, 0)
+            return js.get_hat(index)
+        except pygame.error:
+            return (0, 0)
@@ -3,4 +3,10 @@ import sys
 
 
 def base_path() -> str:
-    return getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__ + "/..")))
\ No newline at end of file
+    return getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__ + "/..")))
+
+
+def user_data_path(*parts: str) -> str:
+    # Writable per-user location (base_path() is read-only in a frozen build).
+    root = os.environ.get("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(root, "RetroOverlay", *parts)
@@ -0,0 +1,180 @@
+# app_funcs/perf_hud.py
+from __future__ import annotations
+
+import time
+
+import pygame
+
+from .input_frames import sample_joystick
+
+# Debug HUD drawn by the overlay engine itself (setting "hud").
+#
+# Everything expensive happens once: the glyph atlas renders the printable
+# ASCII range a single time, and text lines become one Surface.blits() call
+# of atlas sub-rects. The frame-time graph is its own surface that scrolls
+# left one pixel per frame and only paints the new column. The text panel is
+# refreshed a few times per second; per frame the HUD costs a scroll, one
+# column and one blit onto the screen.
+
+HUD_FONT_SIZE = 15
+HUD_WIDTH = 260
+GRAPH_HEIGHT = 48
+GRAPH_MAX_MS = 33.3
+TEXT_EVERY_FRAMES = 10
+IDLE_AFTER_S = 2.0
+DRAW_EMA = 0.1
+PAD = 6
+
+HUD_BG = (20, 20, 24)
+HUD_FG = (225, 225, 225)
+GRAPH_OK = (80, 200, 120)
+GRAPH_SLOW = (230, 90, 70)
+GRAPH_TARGET = (70, 70, 90)
+
+_FONTS = "consolas,dejavusansmono,menlo,couriernew,monospace"
+
+
+class GlyphAtlas:
+    def __init__(self, size: int = HUD_FONT_SIZE, fg=HUD_FG, bg=HUD_BG):
+        try:
+            font = pygame.font.SysFont(_FONTS, size)
+        except Exception:
+            font = pygame.font.Font(None, size)
+
+        chars = [chr(c) for c in range(32, 127)]
+        glyphs = [font.render(ch, True, fg, bg) for ch in chars]
+        self.height = max(g.get_height() for g in glyphs)
+
+        self.surface = pygame.Surface((sum(g.get_width() for g in glyphs), self.height))
+        self.surface.fill(bg)
+        self.rects = {}
+        x = 0
+        for ch, g in zip(chars, glyphs):
+            self.surface.blit(g, (x, 0))
+            self.rects[ch] = pygame.Rect(x, 0, g.get_width(), self.height)
+            x += g.get_width()
+        self._fallback = self.rects["?"]
+
+    def draw(self, dst: pygame.Surface, text: str, x: int, y: int) -> int:
+        """Blits text at (x, y); returns the x after the last glyph."""
+        seq = []
+        for ch in text:
+            r = self.rects.get(ch, self._fallback)
+            seq.append((self.surface, (x, y), r))
+            x += r.width
+        dst.blits(seq, doreturn=False)
+        return x
+
+
+def _pad_signature(js) -> tuple:
+    if js is None:
+        return ()
+    try:
+        return sample_joystick(js)
+    except pygame.error:
+        return ()
+
+
+class PerfHud:
+    def __init__(self, target_fps: float = 120.0):
+        self.atlas = GlyphAtlas()
+        self.line_h = self.atlas.height + 1
+        self.target_fps = target_fps
+
+        self.graph = pygame.Surface((HUD_WIDTH - 2 * PAD, GRAPH_HEIGHT))
+        self.graph.fill(HUD_BG)
+        self._target_y = self._graph_y(1000.0 / target_fps) if target_fps > 0 else -1
+
+        self.surface = None
+        self._graph_top = PAD
+        self._draw_ms = {}
+        self._sigs = {}
+        self._t_sample = 0.0
+        self._last_change = time.perf_counter()
+        self._age_ms = 0.0
+        self._frame_ms = 0.0
+        self._frames = 0
+
+    def _graph_y(self, ms: float) -> int:
+        h = GRAPH_HEIGHT
+        return h - 1 - min(h - 1, int(ms / GRAPH_MAX_MS * (h - 1)))
+
+    # -----------------------
+    # Fed by the engine
+    # -----------------------
+    def sample(self, loaded: list):
+        """Called once the frame's input is current; notes changes for idle/age."""
+        now = time.perf_counter()
+        self._t_sample = now
+        for item in loaded:
+            sig = _pad_signature(item["joystick"])
+            if self._sigs.get(item["ci"]) != sig:
+                self._sigs[item["ci"]] = sig
+                self._last_change = now
+
+    def draw_cost(self, item: dict, ns: int):
+        key = item["trace_name"]
+        ms = ns / 1_000_000.0
+        prev = self._draw_ms.get(key)
+        self._draw_ms[key] = ms if prev is None else prev + (ms - prev) * DRAW_EMA
+
+    def presented(self, frame_ms: float):
+        self._age_ms = (time.perf_counter() - self._t_sample) * 1000.0
+        self._frame_ms = frame_ms
+
+        g = self.graph
+        w = g.get_width()
+        g.scroll(-1, 0)
+        g.fill(HUD_BG, (w - 1, 0, 1, GRAPH_HEIGHT))
+        if self._target_y >= 0:
+            g.set_at((w - 1, self._target_y), GRAPH_TARGET)
+        y = self._graph_y(frame_ms)
+        slow = self.target_fps > 0 and frame_ms > 1000.0 / self.target_fps
+        g.fill(GRAPH_SLOW if slow else GRAPH_OK, (w - 1, y, 1, GRAPH_HEIGHT - y))
+
+    def forget_layout(self):
+        self._draw_ms.clear()
+        self._sigs.clear()
+
+    # -----------------------
+    # Rendering
+    # -----------------------
+    def _lines(self, fps: float) -> list:
+        idle_s = time.perf_counter() - self._last_change
+        state = f"idle {idle_s:.0f}s" if idle_s >= IDLE_AFTER_S else "active"
+        lines = [f"{fps:6.1f} fps  {self._frame_ms:6.2f} ms", None]
+        for name, ms in self._draw_ms.items():
+            lines.append(f"{name[5:]:<18}{ms:6.2f} ms")
+        lines.append(f"input age {self._age_ms:5.2f} ms  {state}")
+        return lines
+
+    def render(self, fps: float) -> pygame.Surface:
+        self._frames += 1
+        if self.surface is None or self._frames % TEXT_EVERY_FRAMES == 0:
+            lines = self._lines(fps)
+            h = PAD * 2 + GRAPH_HEIGHT + self.line_h * (len(lines) - 1) + 2
+            if self.surface is None or self.surface.get_height() != h:
+                self.surface = pygame.Surface((HUD_WIDTH, h))
+            self.surface.fill(HUD_BG)
+            y = PAD
+            for line in lines:
+                if line is None:
+                    self._graph_top = y
+                    y += GRAPH_HEIGHT + 2
+                    continue
+                self.atlas.draw(self.surface, line, PAD, y)
+                y += self.line_h
+
+        self.surface.blit(self.graph, (PAD, self._graph_top))
+        return self.surface
+
+
+def hud_corner(cfg) -> str | None:
+    """Corner for a "hud" setting value: true / "ul".."lr" / {"corner": ...}."""
+    if not cfg:
+        return None
+    if isinstance(cfg, dict):
+        cfg = cfg.get("corner", "ul")
+    if isinstance(cfg, str) and cfg.lower().strip() in ("ul", "ur", "ll", "lr"):
+        return cfg.lower().strip()
+    return "ul"
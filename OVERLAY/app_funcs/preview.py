@@ -1,5 +1,3 @@
-import importlib
-
 import pygame
 import customtkinter as ctk
 from PIL import Image
@@ -7,10 +5,11 @@ from PIL import Image
 import overlay
 
 
-def skin_preview_ctk_image(skin_name: str, preview_w: int = 240, preview_h: int = 150) -> ctk.CTkImage | None:
+def skin_preview_ctk_image(
+    skin_name: str, preview_w: int = 240, preview_h: int = 150, joystick=None
+) -> ctk.CTkImage | None:
     try:
-        skin_mod = importlib.import_module(f"skins.{skin_name}")
-        skin = skin_mod.build()
+        skin = overlay.load_skin(skin_name)
     except Exception:
         return None
 
@@ -36,7 +35,7 @@ def skin_preview_ctk_image(skin_name: str, preview_w: int = 240, preview_h: int
         surf = pygame.Surface((out_w, out_h), pygame.SRCALPHA)
         surf.fill((0, 0, 0, 0))
 
-        inp = overlay.InputState(None, getattr(skin, "btn_map", {}), getattr(skin, "axis_map", {}))
+        inp = overlay.InputState(joystick, getattr(skin, "btn_map", {}), getattr(skin, "axis_map", {}))
         skin.draw(surf, inp, overlay.dz, overlay.norm_trigger, scale_fit)
 
         raw = pygame.image.tostring(surf, "RGBA")
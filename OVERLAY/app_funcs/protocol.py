@@ -0,0 +1,303 @@
+# app_funcs/protocol.py
+from __future__ import annotations
+
+import copy
+import json
+import random
+import struct
+import time
+from collections import deque
+from typing import Optional
+
+# Binary App <-> overlay control protocol.
+#
+# Every datagram starts with a fixed header:
+#   magic "RO" | version u8 | msg type u8 | session u16 | seq u32
+#
+# UPDATE / SHOW carry only the settings fields that changed, HIDE / STOP carry
+# nothing, and ACK carries the frame number at which the acked seq was applied
+# and the overlay's apply time (perf_counter µs, one clock for every process on
+# the machine), so the App's latency doesn't include its own polling delay.
+# The overlay drops anything whose seq is not newer than the last one it
+# applied for that session, so reordered datagrams can't roll settings back.
+#
+# A key the App no longer sends is carried as a tombstone (the "_removed" list
+# of a patch, field F_REMOVED) until an ack shows the overlay dropped it.
+
+MAGIC = b"RO"
+PROTOCOL_VERSION = 1
+
+MSG_UPDATE = 1
+MSG_SHOW = 2
+MSG_HIDE = 3
+MSG_STOP = 4
+MSG_ACK = 5
+
+_HEADER = struct.Struct("<2sBBHI")
+_ACK = struct.Struct("<IQ")
+
+HEADER_SIZE = _HEADER.size
+
+# Field ids for the settings keys the App sends on every change.
+F_MONITOR_INDEX = 1
+F_SCALE = 2
+F_MARGIN = 3
+F_TRANSPARENCY = 4
+F_OVERLAYS = 5
+# Names of keys to delete.
+F_REMOVED = 6
+# Anything else rides along as a small JSON object.
+F_EXTRA = 255
+
+_SCALAR_FIELDS = {
+    "monitor_index": (F_MONITOR_INDEX, struct.Struct("<h"), int),
+    "scale": (F_SCALE, struct.Struct("<f"), float),
+    "margin": (F_MARGIN, struct.Struct("<h"), int),
+    "transparency": (F_TRANSPARENCY, struct.Struct("<B"), int),
+}
+_SCALAR_BY_ID = {fid: (key, st) for key, (fid, st, _cast) in _SCALAR_FIELDS.items()}
+
+_CORNERS = ["ul", "ur", "ll", "lr"]
+_OVERLAY = struct.Struct("<BBB")
+_LEN8 = struct.Struct("<B")
+_LEN16 = struct.Struct("<H")
+
+MAX_PENDING = 64
+
+# Patch key listing settings keys to delete (see LiveConfig.apply_update).
+REMOVED = "_removed"
+
+
+def seq_newer(a: int, b: int) -> bool:
+    """True if seq a comes after seq b, allowing for u32 wraparound."""
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+
+def _encode_overlays(overlays: list) -> bytes:
+    out = [_LEN8.pack(min(len(overlays), 255))]
+    for o in overlays[:255]:
+        name = str(o.get("skin_name", "default")).encode("utf-8")[:255]
+        corner = str(o.get("corner", "ul")).lower().strip()
+        ci = int(o.get("controller_index", 0))
+        out.append(_OVERLAY.pack(ci & 0xFF, _CORNERS.index(corner) if corner in _CORNERS else 0, len(name)))
+        out.append(name)
+    return b"".join(out)
+
+
+def _decode_overlays(buf: bytes, off: int) -> tuple[list, int]:
+    (count,) = _LEN8.unpack_from(buf, off)
+    off += _LEN8.size
+    overlays = []
+    for _ in range(count):
+        ci, corner, n = _OVERLAY.unpack_from(buf, off)
+        off += _OVERLAY.size
+        name = buf[off:off + n].decode("utf-8", errors="ignore")
+        off += n
+        overlays.append({"controller_index": ci, "skin_name": name, "corner": _CORNERS[corner % 4]})
+    return overlays, off
+
+
+def encode_fields(patch: dict) -> bytes:
+    out = []
+    extra = {}
+    for k, v in patch.items():
+        if k == REMOVED and isinstance(v, list):
+            names = [str(name).encode("utf-8")[:255] for name in v[:255]]
+            out.append(bytes((F_REMOVED,)) + _LEN8.pack(len(names)))
+            out.extend(_LEN8.pack(len(n)) + n for n in names)
+        elif k in _SCALAR_FIELDS:
+            fid, st, cast = _SCALAR_FIELDS[k]
+            out.append(bytes((fid,)) + st.pack(cast(v)))
+        elif k == "overlays" and isinstance(v, list):
+            out.append(bytes((F_OVERLAYS,)) + _encode_overlays(v))
+        else:
+            extra[k] = v
+
+    if extra:
+        raw = json.dumps(extra, separators=(",", ":")).encode("utf-8")
+        out.append(bytes((F_EXTRA,)) + _LEN16.pack(len(raw)) + raw)
+
+    return b"".join(out)
+
+
+def decode_fields(buf: bytes) -> dict:
+    patch = {}
+    off = 0
+    while off < len(buf):
+        fid = buf[off]
+        off += 1
+        if fid in _SCALAR_BY_ID:
+            key, st = _SCALAR_BY_ID[fid]
+            (v,) = st.unpack_from(buf, off)
+            off += st.size
+            patch[key] = round(v, 6) if isinstance(v, float) else v
+        elif fid == F_OVERLAYS:
+            patch["overlays"], off = _decode_overlays(buf, off)
+        elif fid == F_REMOVED:
+            (count,) = _LEN8.unpack_from(buf, off)
+            off += _LEN8.size
+            names = []
+            for _ in range(count):
+                (n,) = _LEN8.unpack_from(buf, off)
+                off += _LEN8.size
+                names.append(buf[off:off + n].decode("utf-8", errors="ignore"))
+                off += n
+            patch[REMOVED] = names
+        elif fid == F_EXTRA:
+            (n,) = _LEN16.unpack_from(buf, off)
+            off += _LEN16.size
+            extra = json.loads(buf[off:off + n].decode("utf-8"))
+            off += n
+            if isinstance(extra, dict):
+                patch.update(extra)
+        else:
+            raise ValueError(f"unknown field id {fid}")
+    return patch
+
+
+def encode_message(msg_type: int, session: int, seq: int, payload: bytes = b"") -> bytes:
+    return _HEADER.pack(MAGIC, PROTOCOL_VERSION, msg_type, session & 0xFFFF, seq & 0xFFFFFFFF) + payload
+
+
+def now_us() -> int:
+    return time.perf_counter_ns() // 1000
+
+
+def encode_ack(session: int, seq: int, frame: int, applied_us: int = 0) -> bytes:
+    return encode_message(MSG_ACK, session, seq, _ACK.pack(frame & 0xFFFFFFFF, applied_us))
+
+
+def is_binary(data: bytes) -> bool:
+    return data[:2] == MAGIC
+
+
+def decode_message(data: bytes) -> tuple[int, int, int, bytes]:
+    """Returns (msg_type, session, seq, payload); raises ValueError on junk."""
+    if len(data) < HEADER_SIZE:
+        raise ValueError("short datagram")
+    magic, version, msg_type, session, seq = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("bad magic")
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"unsupported protocol version {version}")
+    return msg_type, session, seq, data[HEADER_SIZE:]
+
+
+def decode_ack(payload: bytes) -> tuple[int, Optional[int]]:
+    """(frame, applied_us); applied_us is None when the overlay didn't send one."""
+    frame, applied_us = _ACK.unpack_from(payload, 0)
+    return frame, applied_us or None
+
+
+def diff_keys(old: dict, new: dict) -> set:
+    return {k for k, v in new.items() if k not in old or old[k] != v}
+
+
+class DeltaSession:
+    """
+    Sender-side protocol state.
+
+    Deltas are computed against the last *acked* settings (plus anything still
+    in flight), so a lost datagram is folded into the next one instead of
+    leaving the overlay stale. Keys missing from the new settings go out as
+    tombstones. If an unacked datagram has to be evicted, the overlay may hold
+    state the session no longer knows about, so full settings are sent until
+    one of them is acked.
+    """
+
+    def __init__(self, session_id: Optional[int] = None):
+        self.session_id = random.getrandbits(16) if session_id is None else session_id & 0xFFFF
+        self.seq = 0
+        self.acked: dict = {}
+        self.latest: dict = {}
+        self.acked_seq = 0
+        self.acked_frame = 0
+        self.pending: dict[int, tuple[float, dict]] = {}
+        self.latencies_ms: deque = deque(maxlen=256)
+        # Keys of evicted datagrams, and the first seq of the full resync.
+        self.evicted_keys: set = set()
+        self.resync_seq: Optional[int] = None
+        self.resyncs = 0
+
+    def reset(self, baseline: Optional[dict] = None):
+        self.acked = copy.deepcopy(baseline or {})
+        self.latest = self.acked
+        self.acked_seq = self.seq
+        self.pending.clear()
+        self.evicted_keys.clear()
+        self.resync_seq = None
+
+    def _next(self, settings: dict) -> int:
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        self.pending[self.seq] = (now_us(), copy.deepcopy(settings))
+        while len(self.pending) > MAX_PENDING:
+            _t, evicted = self.pending.pop(next(iter(self.pending)))
+            self.evicted_keys |= set(evicted)
+            if self.resync_seq is None:
+                self.resync_seq = (self.seq + 1) & 0xFFFFFFFF
+                self.resyncs += 1
+        return self.seq
+
+    def encode_update(self, settings: dict, msg_type: int = MSG_UPDATE) -> Optional[bytes]:
+        # The overlay holds the acked state or any newer in-flight one, so send
+        # every key that differs from any of them.
+        self.latest = settings
+        keys = diff_keys(self.acked, settings)
+        held = set(self.acked) | self.evicted_keys
+        for _t, sent in self.pending.values():
+            keys |= diff_keys(sent, settings)
+            held |= set(sent)
+        removed = sorted(k for k in held if k not in settings)
+        if self.resync_seq is not None:
+            keys = set(settings)
+
+        if not keys and not removed and msg_type == MSG_UPDATE:
+            return None
+
+        patch = {k: settings[k] for k in settings if k in keys}
+        if removed:
+            patch[REMOVED] = removed
+        seq = self._next(settings)
+        return encode_message(msg_type, self.session_id, seq, encode_fields(patch))
+
+    def encode_command(self, msg_type: int) -> bytes:
+        seq = self._next(self.latest)
+        return encode_message(msg_type, self.session_id, seq)
+
+    def handle_ack(self, seq: int, frame: int, applied_us: Optional[int] = None) -> Optional[float]:
+        """Records an ack and returns its change-to-applied latency in ms.
+
+        Without the overlay's applied_us the ack's arrival time stands in.
+        """
+        entry = self.pending.pop(seq, None)
+        if entry is None:
+            return None
+
+        t_sent_us, settings = entry
+        if self.acked_seq == 0 or seq_newer(seq, self.acked_seq):
+            self.acked = settings
+            self.acked_seq = seq
+            self.acked_frame = frame
+            if self.resync_seq is not None and not seq_newer(self.resync_seq, seq):
+                # A full state landed: nothing evicted is left on the overlay.
+                self.resync_seq = None
+                self.evicted_keys.clear()
+            # Older in-flight datagrams will be dropped as stale by the overlay.
+            for s in [s for s in self.pending if not seq_newer(s, seq)]:
+                self.pending.pop(s, None)
+
+        latency_ms = ((applied_us or now_us()) - t_sent_us) / 1000.0
+        self.latencies_ms.append(latency_ms)
+        return latency_ms
+
+    def latency_stats(self) -> dict:
+        vals = sorted(self.latencies_ms)
+        if not vals:
+            return {"count": 0}
+        return {
+            "count": len(vals),
+            "last_ms": self.latencies_ms[-1],
+            "p50_ms": vals[len(vals) // 2],
+            "p95_ms": vals[min(len(vals) - 1, int(len(vals) * 0.95))],
+            "max_ms": vals[-1],
+        }
@@ -0,0 +1,439 @@
+# app_funcs/remote_input.py
+from __future__ import annotations
+
+import heapq
+import random
+import select
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from .input_frames import (
+    AXIS_SCALE,
+    FRAME_SIZE,
+    MAX_AXES,
+    MAX_BUTTONS,
+    SYNC_MAGIC,
+    SYNC_PING,
+    SYNC_PONG,
+    now_us,
+    pack_frame,
+    pack_sync,
+    sample_joystick,
+    unpack_frame,
+    unpack_sync,
+)
+from .protocol import seq_newer
+from .trace import TRACER, now as trace_now
+
+# Dual-PC mode: a sender on the gaming PC samples the pads and streams input
+# frames (app_funcs/input_frames.py) over UDP; the overlay on the streaming PC
+# renders from a jitter buffer instead of local joysticks.
+#
+# Each controller has its own sequence number so loss and reordering are
+# detected per pad. Frames are held until send_time + min_offset + delay,
+# where min_offset is the minimum observed (receive - send): the clock
+# difference plus the fastest one-way trip. "jitter_buffer_delay_ms" is apply
+# time against that, i.e. how long a frame waited beyond the fastest trip.
+#
+# For real latency the receiver also pings the sender every SYNC_INTERVAL_S
+# and takes the clock difference from the lowest-RTT exchange of the last
+# SYNC_WINDOW, NTP-style: (t_ping + t_pong) / 2 - t_reply, assuming the path
+# is symmetric. With that, "end_to_end_ms" is apply time minus the sender's
+# sample time (transit plus buffer), and a remote pad's state_ns is its real
+# sample time, so the latency probe's origin -> present spans both PCs. The
+# sender answers pings while it waits between sends (RemoteSender.sleep); one
+# that only calls send() answers late, biasing the offset by up to half a
+# send period.
+#
+# A pad that sends nothing for DISCONNECT_AFTER_S reads as released (no
+# buttons, centered sticks and hat) until its frames come back, and its seq
+# history is dropped. Each sender instance stamps its frames with a random
+# epoch; a new epoch is a restarted sender whose seq starts over, so the
+# receiver starts a fresh session (seqs, clock offset, buffered frames) and
+# ignores the old epoch's stragglers for RETIRE_S.
+
+DEFAULT_REMOTE_PORT = 29320
+DEFAULT_SEND_HZ = 250
+IDLE_SEND_HZ = 20
+DEFAULT_JITTER_MS = 15
+DISCONNECT_AFTER_S = 1.0
+RETIRE_S = 2.0
+OFFSET_WINDOW = 512
+SYNC_INTERVAL_S = 0.2
+SYNC_WINDOW = 32
+
+
+# -----------------------
+# Sender (gaming PC)
+# -----------------------
+class RemoteSender:
+    def __init__(self, target: tuple[str, int], rate_hz: float = DEFAULT_SEND_HZ, idle_hz: float = IDLE_SEND_HZ):
+        self.target = target
+        self.period_us = int(1_000_000 / max(1.0, rate_hz))
+        self.idle_period_us = int(1_000_000 / max(1.0, idle_hz))
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.epoch = random.randint(1, 255)
+
+        self._seq: dict[int, int] = {}
+        self._last_state: dict[int, tuple] = {}
+        self._last_sent_us: dict[int, int] = {}
+        self.sent = 0
+        self.errors = 0
+        self.pongs = 0
+
+    def close(self):
+        self.sock.close()
+
+    def _answer_pings(self, t: int):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # Windows reports an earlier send to a closed port here.
+                continue
+            try:
+                kind, t_ping, _ = unpack_sync(data)
+            except ValueError:
+                continue
+            if kind != SYNC_PING:
+                continue
+            try:
+                self.sock.sendto(pack_sync(SYNC_PONG, t_ping, t), addr)
+                self.pongs += 1
+            except OSError:
+                self.errors += 1
+
+    def sleep(self, seconds: float):
+        """Waits between sends, answering clock sync pings as they arrive."""
+        deadline = time.perf_counter() + seconds
+        while True:
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                return
+            try:
+                ready, _, _ = select.select([self.sock], [], [], left)
+            except (OSError, ValueError):
+                time.sleep(left)
+                return
+            if ready:
+                self._answer_pings(now_us())
+
+    def send(self, joysticks: list, t_us: Optional[int] = None) -> int:
+        t = now_us() if t_us is None else t_us
+        self._answer_pings(t)
+        n = 0
+        for ci, js in joysticks:
+            if js is None:
+                continue
+            try:
+                state = sample_joystick(js)
+            except Exception:
+                continue
+
+            # Unchanged pads still go out at idle_hz so a lost frame heals quickly.
+            if state == self._last_state.get(ci) and t - self._last_sent_us.get(ci, 0) < self.idle_period_us:
+                continue
+
+            seq = self._seq[ci] = (self._seq.get(ci, 0) + 1) & 0xFFFFFFFF
+            try:
+                self.sock.sendto(pack_frame(ci, seq, t, state, self.epoch), self.target)
+            except OSError:
+                self.errors += 1
+                continue
+            self._last_state[ci] = state
+            self._last_sent_us[ci] = t
+            self.sent += 1
+            n += 1
+        return n
+
+
+def run_sender(target: tuple[str, int], rate_hz: float = DEFAULT_SEND_HZ, max_controllers: int = 4, joystick_factory=None):
+    import pygame
+
+    pygame.init()
+    pygame.joystick.init()
+
+    def open_all():
+        out = []
+        for i in range(min(pygame.joystick.get_count(), max_controllers)):
+            try:
+                if joystick_factory is not None:
+                    js = joystick_factory(i)
+                else:
+                    js = pygame.joystick.Joystick(i)
+                    js.init()
+            except pygame.error:
+                js = None
+            out.append((i, js))
+        return out
+
+    sender = RemoteSender(target, rate_hz=rate_hz)
+    joysticks = open_all()
+    period = 1.0 / max(1.0, rate_hz)
+    next_t = time.perf_counter()
+
+    print(f"Streaming {len(joysticks)} controller(s) to {target[0]}:{target[1]} at {rate_hz:.0f} Hz. Ctrl+C to stop.")
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type in (pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED):
+                    joysticks = open_all()
+            sender.send(joysticks)
+
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                sender.sleep(delay)
+            else:
+                next_t = time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sender.close()
+
+
+# -----------------------
+# Receiver (streaming PC)
+# -----------------------
+class RemoteJoystick:
+    """Joystick-shaped view of the latest released remote frame for one pad."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.connected = False
+        self.buttons = 0
+        self.hat = (0, 0)
+        self.n_axes = MAX_AXES
+        self.axes = [0] * MAX_AXES
+        self.last_us = 0
+        # Sender's sample time of the current state, on our perf_counter_ns clock.
+        self.state_ns = None
+        # Frames don't carry the device; set where it's known (export --guid).
+        self.guid: Optional[str] = None
+
+    def init(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def get_init(self) -> bool:
+        return True
+
+    def get_name(self) -> str:
+        return f"Remote Controller {self.index}"
+
+    def get_guid(self) -> str:
+        return self.guid or ""
+
+    def get_numbuttons(self) -> int:
+        return MAX_BUTTONS
+
+    def get_numaxes(self) -> int:
+        return self.n_axes
+
+    def get_numhats(self) -> int:
+        return 1
+
+    def get_button(self, i: int) -> int:
+        return (self.buttons >> i) & 1
+
+    def get_axis(self, i: int) -> float:
+        return self.axes[i] / AXIS_SCALE if 0 <= i < MAX_AXES else 0.0
+
+    def get_hat(self, i: int) -> tuple[int, int]:
+        return self.hat if i == 0 else (0, 0)
+
+
+class RemoteInputReceiver:
+    def __init__(self, port: int = DEFAULT_REMOTE_PORT, jitter_ms: float = DEFAULT_JITTER_MS, host: str = "0.0.0.0"):
+        self.delay_us = int(jitter_ms * 1000)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.25)
+
+        self.lock = threading.Lock()
+        self._heap: list = []  # (release_us, tiebreak, frame)
+        self._tiebreak = 0
+        self._offsets: deque = deque(maxlen=OFFSET_WINDOW)
+        self.offset_us: Optional[int] = None
+
+        # Clock sync with the current sender: (rtt, offset) per exchange.
+        self._sender_addr = None
+        self._next_ping_us = 0
+        self._sync: deque = deque(maxlen=SYNC_WINDOW)
+        self.clock_offset_us: Optional[int] = None
+        self.rtt_us: Optional[int] = None
+
+        self.joysticks: dict[int, RemoteJoystick] = {}
+        self._last_seq: dict[int, int] = {}
+        self.epoch: Optional[int] = None
+        self._retired: dict[int, int] = {}  # epoch -> time it was replaced
+
+        self.counters = {"received": 0, "applied": 0, "stale": 0, "lost": 0, "bad": 0, "restarts": 0}
+        self.latencies_ms: deque = deque(maxlen=2048)
+        self.end_to_end_ms: deque = deque(maxlen=2048)
+
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="remote-input", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop = True
+        self._thread.join(1.0)
+        self.sock.close()
+
+    def joystick(self, index: int) -> RemoteJoystick:
+        js = self.joysticks.get(index)
+        if js is None:
+            js = self.joysticks[index] = RemoteJoystick(index)
+        return js
+
+    def _run(self):
+        while not self._stop:
+            self._ping()
+            try:
+                data, addr = self.sock.recvfrom(FRAME_SIZE * 4)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._stop:
+                    return
+                continue
+
+            recv_us = now_us()
+            if data[:2] == SYNC_MAGIC:
+                self._pong(data, addr, recv_us)
+                continue
+            t0 = trace_now()
+            try:
+                fr = unpack_frame(data)
+            except ValueError:
+                self.counters["bad"] += 1
+                continue
+
+            with self.lock:
+                self.counters["received"] += 1
+                if fr["epoch"] != self.epoch and not self._new_epoch(fr["epoch"], recv_us):
+                    self.counters["stale"] += 1
+                    continue
+                self._sender_addr = addr
+                self._offsets.append(recv_us - fr["t_us"])
+                self.offset_us = min(self._offsets)
+                release = fr["t_us"] + self.offset_us + self.delay_us
+                self._tiebreak += 1
+                heapq.heappush(self._heap, (release, self._tiebreak, fr))
+            TRACER.complete("remote recv", t0, "input")
+
+    def _ping(self):
+        t = now_us()
+        if self._sender_addr is None or t < self._next_ping_us:
+            return
+        self._next_ping_us = t + int(SYNC_INTERVAL_S * 1_000_000)
+        try:
+            self.sock.sendto(pack_sync(SYNC_PING, t), self._sender_addr)
+        except OSError:
+            pass
+
+    def _pong(self, data: bytes, addr, recv_us: int):
+        try:
+            kind, t_ping, t_reply = unpack_sync(data)
+        except ValueError:
+            self.counters["bad"] += 1
+            return
+        rtt = recv_us - t_ping
+        # Only answers from the current sender to one of our pings count.
+        if kind != SYNC_PONG or addr != self._sender_addr or rtt < 0:
+            return
+        with self.lock:
+            self._sync.append((rtt, (t_ping + recv_us) // 2 - t_reply))
+            self.rtt_us, self.clock_offset_us = min(self._sync)
+
+    def _new_epoch(self, epoch: int, t_us: int) -> bool:
+        """Switches to a restarted sender's session; False for a retired epoch's stragglers."""
+        retired = self._retired.get(epoch)
+        if retired is not None and t_us - retired < RETIRE_S * 1_000_000:
+            return False
+        self._retired = {e: t for e, t in self._retired.items() if t_us - t < RETIRE_S * 1_000_000}
+        if self.epoch is not None:
+            self._retired[self.epoch] = t_us
+            self.counters["restarts"] += 1
+        self.epoch = epoch
+        # The new sender's seqs start over and its clock may differ.
+        self._last_seq.clear()
+        self._offsets.clear()
+        self._heap.clear()
+        self._sync.clear()
+        self.clock_offset_us = self.rtt_us = None
+        self._next_ping_us = 0
+        return True
+
+    def advance(self, t_us: Optional[int] = None) -> int:
+        """Releases every buffered frame that is due; call once per engine frame."""
+        t = now_us() if t_us is None else t_us
+        n = 0
+        with self.lock:
+            while self._heap and self._heap[0][0] <= t:
+                _release, _tb, fr = heapq.heappop(self._heap)
+                ci = fr["controller"]
+                seq = fr["seq"]
+
+                last = self._last_seq.get(ci)
+                if last is not None and not seq_newer(seq, last):
+                    self.counters["stale"] += 1
+                    continue
+                if last is not None:
+                    self.counters["lost"] += ((seq - last) & 0xFFFFFFFF) - 1
+                self._last_seq[ci] = seq
+
+                js = self.joystick(ci)
+                js.connected = True
+                js.buttons = fr["buttons"]
+                js.hat = fr["hat"]
+                js.n_axes = fr["n_axes"] or MAX_AXES
+                js.axes = fr["axes"]
+                js.last_us = t
+                self.counters["applied"] += 1
+                self.latencies_ms.append((t - fr["t_us"] - (self.offset_us or 0)) / 1000.0)
+                if self.clock_offset_us is not None:
+                    js.state_ns = (fr["t_us"] + self.clock_offset_us) * 1000
+                    self.end_to_end_ms.append((t - js.state_ns // 1000) / 1000.0)
+                else:
+                    # No sync yet: a lower bound, off by the fastest trip.
+                    js.state_ns = (fr["t_us"] + (self.offset_us or 0)) * 1000
+                n += 1
+
+            for js in self.joysticks.values():
+                if js.connected and t - js.last_us > DISCONNECT_AFTER_S * 1_000_000:
+                    # Dropped mid-press: don't leave a button held forever.
+                    js.connected = False
+                    js.buttons = 0
+                    js.hat = (0, 0)
+                    js.axes = [0] * MAX_AXES
+                    # Its sender may come back with seq starting over.
+                    self._last_seq.pop(js.index, None)
+        return n
+
+    def stats(self) -> dict:
+        out = dict(self.counters)
+        out["jitter_buffer_ms"] = self.delay_us / 1000.0
+        out["buffered"] = len(self._heap)
+        out["connected"] = sorted(ci for ci, js in self.joysticks.items() if js.connected)
+        if self.rtt_us is not None:
+            out["rtt_ms"] = round(self.rtt_us / 1000.0, 3)
+            out["clock_offset_ms"] = round(self.clock_offset_us / 1000.0, 3)
+        for key, window in (("jitter_buffer_delay_ms", self.latencies_ms), ("end_to_end_ms", self.end_to_end_ms)):
+            vals = sorted(window)
+            if vals:
+                out[key] = {
+                    "p50": round(vals[len(vals) // 2], 3),
+                    "p95": round(vals[min(len(vals) - 1, int(len(vals) * 0.95))], 3),
+                    "max": round(vals[-1], 3),
+                }
+        return out
@@ -0,0 +1,89 @@
+# app_funcs/scene.py
+from __future__ import annotations
+
+# Retained-mode rendering for skins that declare a scene (skin.scene, a list
+# of skins/shapes/nodes.py nodes in paint order).
+#
+# One Scene per overlay remembers every node's last state. update() computes
+# the new states, and for each node that changed repaints every node
+# overlapping its extent, in paint order, over a cleared scratch rect and
+# copies just that rect back - so the pixels come out exactly as a full
+# skin.draw() would paint them. (Painting straight onto the overlay with a
+# clip rect isn't exact: pygame rasterizes rounded rects differently when
+# clipped.) The returned rects are all the engine has to blit and present.
+# Skins without a scene keep going through skin.draw().
+
+
+class Scene:
+    def __init__(self, nodes: list):
+        self.nodes = list(nodes)
+        self._states = None
+        self._scale = None
+        self._extents = []
+        self._scratch = None
+
+        self.frames = 0
+        self.idle_frames = 0
+        self.node_draws = 0
+
+    def _layout(self, scale: float):
+        self._scale = scale
+        self._extents = [n.extent(scale) for n in self.nodes]
+
+    def _read(self, inp, dz, norm_trigger, scale) -> list:
+        return [n.state(inp, dz, norm_trigger, scale) for n in self.nodes]
+
+    def draw_all(self, surf, inp, dz, norm_trigger, scale: float):
+        """Paints every node onto an already cleared surface."""
+        if scale != self._scale:
+            self._layout(scale)
+        self._states = self._read(inp, dz, norm_trigger, scale)
+        for node, state in zip(self.nodes, self._states):
+            node.draw(surf, state, scale)
+        self.frames += 1
+        self.node_draws += len(self.nodes)
+
+    def update(self, surf, inp, dz, norm_trigger, scale: float, background) -> list:
+        """Repaints changed nodes; returns the surface rects that changed."""
+        if self._states is None or scale != self._scale:
+            surf.fill(background)
+            self.draw_all(surf, inp, dz, norm_trigger, scale)
+            return [surf.get_rect()]
+
+        states = self._read(inp, dz, norm_trigger, scale)
+        bounds = surf.get_rect()
+        dirty = [
+            self._extents[i].clip(bounds)
+            for i, (new, old) in enumerate(zip(states, self._states))
+            if new != old
+        ]
+        self._states = states
+        self.frames += 1
+        if not dirty:
+            self.idle_frames += 1
+            return []
+
+        scratch = self._scratch
+        if scratch is None or scratch.get_size() != surf.get_size():
+            scratch = self._scratch = surf.copy()
+            # Copied back verbatim, background included.
+            scratch.set_colorkey(None)
+        for rect in dirty:
+            scratch.fill(background, rect)
+            for node, extent, state in zip(self.nodes, self._extents, states):
+                if extent.colliderect(rect):
+                    node.draw(scratch, state, scale)
+                    self.node_draws += 1
+            surf.blit(scratch, rect, rect)
+        return dirty
+
+    def invalidate(self):
+        self._states = None
+
+    def stats(self) -> dict:
+        return {
+            "nodes": len(self.nodes),
+            "frames": self.frames,
+            "idle_frames": self.idle_frames,
+            "node_draws_per_frame": round(self.node_draws / self.frames, 2) if self.frames else 0.0,
+        }
@@ -0,0 +1,196 @@
+# app_funcs/shm_channel.py
+from __future__ import annotations
+
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+from . import protocol
+
+# Same-machine settings/status channel backed by one shared memory block.
+#
+#   header   magic "ROSM" | version u32
+#   settings gen u32 | length u32 | payload (protocol.encode_fields bytes)
+#   status   gen u32 | frame u32 | fps f32 | frame_ms f32 | applied_gen u32
+#            | applied_us u64 | controller count u8 | pad | MAX_CONTROLLERS x (index u8, name 31s)
+#
+# Each record is guarded by a seqlock: the single writer bumps gen to odd,
+# writes, then bumps it to even. Readers retry while gen is odd or changed
+# underneath them, so polling is one unpack_from with no syscall.
+#
+# applied_us is the overlay's perf_counter time (µs, one clock for every
+# process on the machine) of the frame that took settings gen applied_gen in;
+# status is only published every few frames and read by the App on a timer,
+# so latency is measured against it rather than against the read.
+
+SHM_MAGIC = b"ROSM"
+SHM_VERSION = 2
+
+SETTINGS_CAPACITY = 16384
+MAX_CONTROLLERS = 4
+READ_RETRIES = 8
+
+_HEADER = struct.Struct("<4sI")
+_GEN = struct.Struct("<I")
+_SETTINGS_HEAD = struct.Struct("<II")
+_STATUS = struct.Struct("<IIffIQB3x")
+_CTRL = struct.Struct("<B31s")
+
+OFF_SETTINGS = _HEADER.size
+OFF_SETTINGS_PAYLOAD = OFF_SETTINGS + _SETTINGS_HEAD.size
+OFF_STATUS = OFF_SETTINGS_PAYLOAD + SETTINGS_CAPACITY
+OFF_STATUS_CTRLS = OFF_STATUS + _STATUS.size
+SHM_SIZE = OFF_STATUS_CTRLS + _CTRL.size * MAX_CONTROLLERS
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The App owns the block; the overlay must not unlink it on exit.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name != "posix":
+            return shm
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        except Exception:
+            pass
+        return shm
+
+
+class SharedChannel:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        self.owner = owner
+        self.name = shm.name
+        self._settings_gen_written: dict[int, float] = {}
+
+    # ---------- lifecycle ----------
+    @classmethod
+    def create(cls, name: Optional[str] = None) -> "SharedChannel":
+        shm = shared_memory.SharedMemory(name=name, create=True, size=SHM_SIZE)
+        shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+        _HEADER.pack_into(shm.buf, 0, SHM_MAGIC, SHM_VERSION)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedChannel":
+        shm = _attach(name)
+        magic, version = _HEADER.unpack_from(shm.buf, 0)
+        if magic != SHM_MAGIC or version != SHM_VERSION:
+            shm.close()
+            raise ValueError(f"shared memory block {name!r} is not a v{SHM_VERSION} overlay channel")
+        return cls(shm, owner=False)
+
+    def close(self):
+        self.buf = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except Exception:
+                pass
+
+    # ---------- seqlock helpers ----------
+    def _gen(self, off: int) -> int:
+        return _GEN.unpack_from(self.buf, off)[0]
+
+    def _begin_write(self, off: int) -> int:
+        gen = (self._gen(off) + 1) & 0xFFFFFFFF
+        _GEN.pack_into(self.buf, off, gen)
+        return gen
+
+    def _end_write(self, off: int, gen: int) -> int:
+        gen = (gen + 1) & 0xFFFFFFFF
+        _GEN.pack_into(self.buf, off, gen)
+        return gen
+
+    # ---------- settings (App -> overlay) ----------
+    def write_settings(self, settings: dict) -> int:
+        payload = protocol.encode_fields(settings)
+        if len(payload) > SETTINGS_CAPACITY:
+            raise ValueError(f"settings record too large ({len(payload)} > {SETTINGS_CAPACITY} bytes)")
+
+        gen = self._begin_write(OFF_SETTINGS)
+        _GEN.pack_into(self.buf, OFF_SETTINGS + _GEN.size, len(payload))
+        self.buf[OFF_SETTINGS_PAYLOAD:OFF_SETTINGS_PAYLOAD + len(payload)] = payload
+        gen = self._end_write(OFF_SETTINGS, gen)
+
+        self._settings_gen_written[gen] = protocol.now_us()
+        while len(self._settings_gen_written) > protocol.MAX_PENDING:
+            self._settings_gen_written.pop(next(iter(self._settings_gen_written)))
+        return gen
+
+    def settings_gen(self) -> int:
+        return self._gen(OFF_SETTINGS)
+
+    def read_settings(self, last_gen: int) -> Optional[tuple[int, dict]]:
+        """Returns (gen, settings) if a newer complete record is available."""
+        for _ in range(READ_RETRIES):
+            g1 = self._gen(OFF_SETTINGS)
+            if g1 == last_gen or g1 == 0:
+                return None
+            if g1 & 1:
+                continue
+            _g, n = _SETTINGS_HEAD.unpack_from(self.buf, OFF_SETTINGS)
+            payload = bytes(self.buf[OFF_SETTINGS_PAYLOAD:OFF_SETTINGS_PAYLOAD + min(n, SETTINGS_CAPACITY)])
+            if self._gen(OFF_SETTINGS) != g1:
+                continue
+            try:
+                return g1, protocol.decode_fields(payload)
+            except Exception:
+                return None
+        return None
+
+    # ---------- status (overlay -> App) ----------
+    def write_status(
+        self, frame: int, fps: float, frame_ms: float, applied_gen: int, controllers: list, applied_us: int = 0
+    ):
+        ctrls = controllers[:MAX_CONTROLLERS]
+        gen = self._begin_write(OFF_STATUS)
+        _STATUS.pack_into(
+            self.buf, OFF_STATUS, gen, frame & 0xFFFFFFFF, fps, frame_ms, applied_gen, applied_us, len(ctrls)
+        )
+        for i, (index, name) in enumerate(ctrls):
+            _CTRL.pack_into(self.buf, OFF_STATUS_CTRLS + i * _CTRL.size, index & 0xFF, str(name).encode("utf-8")[:31])
+        self._end_write(OFF_STATUS, gen)
+
+    def read_status(self) -> Optional[dict]:
+        for _ in range(READ_RETRIES):
+            g1 = self._gen(OFF_STATUS)
+            if g1 == 0:
+                return None
+            if g1 & 1:
+                continue
+            _g, frame, fps, frame_ms, applied_gen, applied_us, n = _STATUS.unpack_from(self.buf, OFF_STATUS)
+            ctrls = []
+            for i in range(min(n, MAX_CONTROLLERS)):
+                index, name = _CTRL.unpack_from(self.buf, OFF_STATUS_CTRLS + i * _CTRL.size)
+                ctrls.append({"index": index, "name": name.rstrip(b"\0").decode("utf-8", errors="ignore")})
+            if self._gen(OFF_STATUS) != g1:
+                continue
+            return {
+                "frame": frame,
+                "fps": fps,
+                "frame_ms": frame_ms,
+                "applied_gen": applied_gen,
+                "applied_us": applied_us,
+                "controllers": ctrls,
+            }
+        return None
+
+    def applied_latency_ms(self, applied_gen: int, applied_us: int = 0) -> Optional[float]:
+        """Write-to-apply latency of settings gen applied_gen (now, if applied_us is unknown)."""
+        t_written = self._settings_gen_written.pop(applied_gen, None)
+        if t_written is None:
+            return None
+        for g in [g for g in self._settings_gen_written if g < applied_gen]:
+            self._settings_gen_written.pop(g, None)
+        return ((applied_us or protocol.now_us()) - t_written) / 1000.0
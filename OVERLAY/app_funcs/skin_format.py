@@ -0,0 +1,382 @@
+# app_funcs/skin_format.py
+from __future__ import annotations
+
+import json
+import marshal
+import math
+import os
+import re
+from typing import Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from skins.shapes import nodes
+
+from .pad_mapping import AXES, BUTTONS, default_maps
+from .paths import base_path
+
+# Declarative skins: skins/<name>.json or skins/<name>.toml.
+#
+#   format          1
+#   design_width    design-space canvas, like a Python skin's attributes
+#   design_height
+#   btn_map         {"A": 0, ...}      axis_map {"LX": 0, ...}
+#   bindings        or {"A": "a", "LX": "leftx", ...}: SDL semantic names
+#                   resolved per pad (app_funcs/pad_mapping.py)
+#   axis_px         optional, frame cache resolution (derived from nodes)
+#   nodes           paint-ordered list of {"type": ..., fields}
+#
+# Node types map onto skins/shapes/nodes.py (see NODE_TYPES for fields).
+# Nothing in the file is executed: it is parsed, every field is checked and
+# normalized, and the compiled form (plain tuples, every default filled in)
+# is cached with marshal in skins/__pycache__/ keyed by the source's mtime and
+# size. The result is a DataSkin with the same surface as a Python skin
+# (btn_map, axis_map, design size, scene, draw), so the engine renders it
+# through the retained scene path.
+
+FORMAT_VERSION = 1
+CACHE_VERSION = 3
+SKIN_EXTENSIONS = (".json", ".toml")
+MAX_NODES = 256
+MAX_COORD = 10_000
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_\-]+$")
+_TOP_KEYS = {
+    "format", "name", "author", "description",
+    "design_width", "design_height", "btn_map", "axis_map", "bindings", "axis_px", "nodes",
+}
+
+
+class SkinFormatError(ValueError):
+    pass
+
+
+# -----------------------
+# Field validators
+# -----------------------
+def _number(v, where):
+    if isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v) or abs(v) > MAX_COORD:
+        raise SkinFormatError(f"{where}: expected a number, got {v!r}")
+    return v
+
+
+def _int(v, where):
+    if isinstance(v, bool) or not isinstance(v, int) or not 0 <= v <= MAX_COORD:
+        raise SkinFormatError(f"{where}: expected a non-negative integer, got {v!r}")
+    return v
+
+
+def _bool(v, where):
+    if not isinstance(v, bool):
+        raise SkinFormatError(f"{where}: expected true/false, got {v!r}")
+    return v
+
+
+def _numbers(n):
+    def check(v, where):
+        if not isinstance(v, (list, tuple)) or len(v) != n:
+            raise SkinFormatError(f"{where}: expected {n} numbers, got {v!r}")
+        return tuple(_number(x, f"{where}[{i}]") for i, x in enumerate(v))
+
+    return check
+
+
+def _color(v, where):
+    if not isinstance(v, (list, tuple)) or len(v) != 3:
+        raise SkinFormatError(f"{where}: expected [r, g, b], got {v!r}")
+    out = []
+    for i, c in enumerate(v):
+        if isinstance(c, bool) or not isinstance(c, int) or not 0 <= c <= 255:
+            raise SkinFormatError(f"{where}[{i}]: expected 0..255, got {c!r}")
+        out.append(c)
+    return tuple(out)
+
+
+_point = _numbers(2)
+_rect = _numbers(4)
+
+
+def _button(v, where, skin):
+    if not isinstance(v, str) or v not in skin["btn_map"]:
+        raise SkinFormatError(f"{where}: {v!r} is not in btn_map")
+    return v
+
+
+def _axis(v, where, skin):
+    if not isinstance(v, str) or v not in skin["axis_map"]:
+        raise SkinFormatError(f"{where}: {v!r} is not in axis_map")
+    return v
+
+
+REQUIRED = object()
+
+# type -> (node class, {field: (kwarg, validator, default)})
+# Validators taking a third argument also get the skin (for name lookups).
+NODE_TYPES = {
+    "trigger": (nodes.Trigger, {
+        "rect": ("rect", _rect, REQUIRED),
+        "axis": ("axis", _axis, REQUIRED),
+    }),
+    "pill": (nodes.Pill, {
+        "rect": ("rect", _rect, REQUIRED),
+        "button": ("button", _button, REQUIRED),
+        "fill": ("fill", _color, (140, 140, 140)),
+    }),
+    "stick": (nodes.Stick, {
+        "center": ("center", _point, REQUIRED),
+        "x_axis": ("x_axis", _axis, REQUIRED),
+        "y_axis": ("y_axis", _axis, REQUIRED),
+        "travel": ("travel", _number, 10),
+        "travel_factor": ("travel_factor", _number, 1.0),
+        "base": ("base_col", _color, (80, 80, 80)),
+        "nub": ("nub_col", _color, (255, 255, 255)),
+    }),
+    "button": (nodes.GlowButton, {
+        "center": ("center", _point, REQUIRED),
+        "radius": ("radius", _number, REQUIRED),
+        "button": ("button", _button, REQUIRED),
+        "fill": ("fill", _color, (220, 220, 220)),
+        "scaled": ("scaled", _bool, True),
+    }),
+    "dpad": (nodes.Dpad, {
+        "center": ("center", _point, REQUIRED),
+        "hat": ("hat", _int, 0),
+    }),
+    "bean": (nodes.Bean, {
+        "center": ("center", _point, REQUIRED),
+        "button": ("button", _button, REQUIRED),
+        "rx": ("rx", _number, REQUIRED),
+        "ry": ("ry", _number, REQUIRED),
+        "thickness": ("thickness", _number, REQUIRED),
+        "rotation": ("rotation_deg", _number, 0),
+        "fill": ("fill", _color, (170, 170, 170)),
+        "glow": ("glow", _color, (255, 255, 255)),
+    }),
+    "block": (nodes.Block, {
+        "rect": ("rect", _rect, REQUIRED),
+        "button": ("button", _button, REQUIRED),
+        "fill": ("fill", _color, REQUIRED),
+        "on_fill": ("on_fill", _color, (255, 255, 255)),
+        "radius": ("radius", _number, 999),
+        "anchor": ("anchor", _point, (0, 0)),
+    }),
+}
+
+
+def _index_map(v, where) -> dict:
+    if not isinstance(v, dict):
+        raise SkinFormatError(f"{where}: expected a table of name -> index")
+    out = {}
+    for name, idx in v.items():
+        if not isinstance(name, str) or not name:
+            raise SkinFormatError(f"{where}: bad name {name!r}")
+        out[name] = _int(idx, f"{where}.{name}")
+    return out
+
+
+def _bindings(v, where) -> dict:
+    if not isinstance(v, dict):
+        raise SkinFormatError(f"{where}: expected a table of name -> semantic input")
+    out = {}
+    for name, semantic in v.items():
+        if not isinstance(name, str) or not name:
+            raise SkinFormatError(f"{where}: bad name {name!r}")
+        if semantic not in BUTTONS and semantic not in AXES:
+            raise SkinFormatError(f"{where}.{name}: {semantic!r} is not an SDL button or axis name")
+        out[name] = semantic
+    return out
+
+
+def _axis_px(v, where, skin) -> dict:
+    if not isinstance(v, dict):
+        raise SkinFormatError(f"{where}: expected a table of axis name -> pixels")
+    out = {}
+    for name, px in v.items():
+        _axis(name, f"{where}.{name}", skin)
+        if _number(px, f"{where}.{name}") < 0:
+            raise SkinFormatError(f"{where}.{name}: expected a non-negative number, got {px!r}")
+        out[name] = px
+    return out
+
+
+# -----------------------
+# Compile
+# -----------------------
+def compile_skin(data, source: str = "<skin>") -> dict:
+    """Validates parsed skin data; returns the normalized compiled form."""
+    if not isinstance(data, dict):
+        raise SkinFormatError(f"{source}: top level must be a table")
+    unknown = set(data) - _TOP_KEYS
+    if unknown:
+        raise SkinFormatError(f"{source}: unknown keys {sorted(unknown)}")
+    fmt = data.get("format", FORMAT_VERSION)
+    # true == 1 in Python, so check the type too.
+    if isinstance(fmt, bool) or fmt != FORMAT_VERSION:
+        raise SkinFormatError(f"{source}: unsupported format {fmt!r}")
+
+    skin = {
+        "design_width": _int(data.get("design_width", 400), "design_width"),
+        "design_height": _int(data.get("design_height", 300), "design_height"),
+        "btn_map": _index_map(data.get("btn_map", {}), "btn_map"),
+        "axis_map": _index_map(data.get("axis_map", {}), "axis_map"),
+        "bindings": _bindings(data.get("bindings", {}), "bindings"),
+    }
+    if skin["bindings"]:
+        if skin["btn_map"] or skin["axis_map"]:
+            raise SkinFormatError(f"{source}: use either bindings or btn_map/axis_map")
+        skin["btn_map"], skin["axis_map"] = default_maps(skin["bindings"])
+    if not skin["design_width"] or not skin["design_height"]:
+        raise SkinFormatError(f"{source}: design size must be positive")
+
+    raw_nodes = data.get("nodes")
+    if not isinstance(raw_nodes, list) or not raw_nodes:
+        raise SkinFormatError(f"{source}: nodes must be a non-empty list")
+    if len(raw_nodes) > MAX_NODES:
+        raise SkinFormatError(f"{source}: more than {MAX_NODES} nodes")
+
+    compiled = []
+    axis_px = {}
+    for i, raw in enumerate(raw_nodes):
+        where = f"nodes[{i}]"
+        if not isinstance(raw, dict):
+            raise SkinFormatError(f"{where}: expected a table")
+        kind = raw.get("type")
+        if kind not in NODE_TYPES:
+            raise SkinFormatError(f"{where}.type: expected one of {sorted(NODE_TYPES)}, got {kind!r}")
+        _cls, fields = NODE_TYPES[kind]
+        unknown = set(raw) - set(fields) - {"type"}
+        if unknown:
+            raise SkinFormatError(f"{where}: unknown fields {sorted(unknown)} for {kind}")
+
+        kwargs = {}
+        for field, (kwarg, check, default) in fields.items():
+            if field not in raw:
+                if default is REQUIRED:
+                    raise SkinFormatError(f"{where}.{field}: required for {kind}")
+                kwargs[kwarg] = default
+                continue
+            if check in (_button, _axis):
+                kwargs[kwarg] = check(raw[field], f"{where}.{field}", skin)
+            else:
+                kwargs[kwarg] = check(raw[field], f"{where}.{field}")
+        compiled.append((kind, tuple(sorted(kwargs.items()))))
+
+        if kind == "stick":
+            px = kwargs["travel"] * kwargs["travel_factor"]
+            for name in (kwargs["x_axis"], kwargs["y_axis"]):
+                axis_px[name] = max(axis_px.get(name, 0), px)
+        elif kind == "trigger":
+            axis_px[kwargs["axis"]] = max(axis_px.get(kwargs["axis"], 0), kwargs["rect"][3])
+
+    axis_px.update(_axis_px(data.get("axis_px", {}), "axis_px", skin))
+
+    skin["axis_px"] = axis_px
+    skin["nodes"] = tuple(compiled)
+    return skin
+
+
+class DataSkin:
+    """A compiled declarative skin; quacks like a Python skin module's build()."""
+
+    def __init__(self, name: str, compiled: dict):
+        self.name = name
+        self.design_width = compiled["design_width"]
+        self.design_height = compiled["design_height"]
+        self.btn_map = dict(compiled["btn_map"])
+        self.axis_map = dict(compiled["axis_map"])
+        self.bindings = dict(compiled["bindings"])
+        self.axis_px = dict(compiled["axis_px"])
+        self.scene = [NODE_TYPES[kind][0](**dict(kwargs)) for kind, kwargs in compiled["nodes"]]
+
+    def draw(self, screen, inp, dz, norm_trigger, scale):
+        nodes.draw_nodes(self.scene, screen, inp, dz, norm_trigger, scale)
+
+
+# -----------------------
+# Files and cache
+# -----------------------
+def skins_dir() -> str:
+    return os.path.join(base_path(), "skins")
+
+
+def find_data_skin(skin_name: str, directory: Optional[str] = None) -> Optional[str]:
+    if not _NAME_RE.match(skin_name or ""):
+        return None
+    directory = directory or skins_dir()
+    for ext in SKIN_EXTENSIONS:
+        path = os.path.join(directory, skin_name + ext)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def list_data_skins(directory: Optional[str] = None) -> list[str]:
+    directory = directory or skins_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    out = []
+    for fn in names:
+        stem, ext = os.path.splitext(fn)
+        if ext in SKIN_EXTENSIONS and not fn.startswith("_") and _NAME_RE.match(stem):
+            out.append(stem)
+    return out
+
+
+def _parse(path: str):
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise SkinFormatError(f"{path}: TOML skins need Python 3.11+ (tomllib)")
+        with open(path, "rb") as f:
+            try:
+                return tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise SkinFormatError(f"{path}: {e}") from None
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            raise SkinFormatError(f"{path}: {e}") from None
+
+
+def _cache_path(path: str) -> str:
+    directory, fn = os.path.split(path)
+    return os.path.join(directory, "__pycache__", fn + ".skinc")
+
+
+def load_compiled(path: str, use_cache: bool = True) -> dict:
+    st = os.stat(path)
+    stamp = (CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    cache_path = _cache_path(path)
+
+    if use_cache:
+        try:
+            with open(cache_path, "rb") as f:
+                cached = marshal.load(f)
+            if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == stamp:
+                return cached[1]
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    compiled = compile_skin(_parse(path), source=os.path.basename(path))
+
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp = cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump((stamp, compiled), f)
+            os.replace(tmp, cache_path)
+        except OSError:
+            # Read-only install (e.g. a frozen build); compile every time.
+            pass
+    return compiled
+
+
+def load_data_skin(path: str, use_cache: bool = True) -> DataSkin:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return DataSkin(name, load_compiled(path, use_cache))
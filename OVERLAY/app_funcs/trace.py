@@ -0,0 +1,107 @@
+# app_funcs/trace.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Chrome / Perfetto trace-event recording (chrome://tracing, ui.perfetto.dev).
+#
+# TRACER is one process-wide ring buffer of compact tuples. When it isn't
+# armed, complete()/instant() return after one attribute check, so the engine,
+# the sampler and the control server call them unconditionally. Once armed, the
+# buffer keeps the last `capacity` events and can stay armed for a whole stream;
+# dump() turns them into trace-event JSON with one named track per thread.
+
+DEFAULT_CAPACITY = 200_000
+
+
+def now() -> int:
+    return time.perf_counter_ns()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self._events: deque = deque(maxlen=DEFAULT_CAPACITY)
+        self._lock = threading.Lock()
+        self._threads: dict = {}
+        self.dropped = 0
+
+    def start(self, capacity: int = DEFAULT_CAPACITY):
+        with self._lock:
+            if self._events.maxlen != capacity:
+                self._events = deque(self._events, maxlen=max(1000, int(capacity)))
+            self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self.dropped = 0
+
+    def _append(self, ev: tuple):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append((tid,) + ev)
+
+    def complete(self, name: str, t0_ns: int, cat: str = "frame", args: Optional[dict] = None):
+        """Records a duration event from t0_ns (from now()) until now."""
+        if not self.enabled:
+            return
+        self._append(("X", name, cat, t0_ns, time.perf_counter_ns() - t0_ns, args))
+
+    def instant(self, name: str, cat: str = "frame", args: Optional[dict] = None):
+        if not self.enabled:
+            return
+        self._append(("i", name, cat, time.perf_counter_ns(), 0, args))
+
+    def counter(self, name: str, values: dict):
+        if not self.enabled:
+            return
+        self._append(("C", name, "counter", time.perf_counter_ns(), 0, values))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "events": len(self._events),
+            "capacity": self._events.maxlen,
+            "dropped": self.dropped,
+        }
+
+    def dump(self, path: str) -> int:
+        with self._lock:
+            events = list(self._events)
+
+        pid = os.getpid()
+        out = [
+            {"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "Retro Overlay"}}
+        ]
+        for tid, name in self._threads.items():
+            out.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}})
+
+        for tid, ph, name, cat, ts_ns, dur_ns, args in events:
+            ev = {"ph": ph, "name": name, "cat": cat, "pid": pid, "tid": tid, "ts": ts_ns / 1000.0}
+            if ph == "X":
+                ev["dur"] = dur_ns / 1000.0
+            elif ph == "i":
+                ev["s"] = "t"
+            if args:
+                ev["args"] = args
+            out.append(ev)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f, separators=(",", ":"))
+        return len(events)
+
+
+TRACER = Tracer()
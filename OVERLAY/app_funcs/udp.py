@@ -1,14 +1,131 @@
 # app_funcs/udp.py
+from __future__ import annotations
+
 import json
+import random
+import select
 import socket
+import struct
+import time
+from typing import Optional
 
+from . import protocol
 
-def send_update(settings_full: dict, udp_port: int) -> None:
-    msg = {"type": "update", "settings": settings_full}
+
+def _send(msg: dict, udp_port: int) -> None:
     data = json.dumps(msg).encode("utf-8")
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
         sock.sendto(data, ("127.0.0.1", udp_port))
     finally:
-        sock.close()
\ No newline at end of file
+        sock.close()
+
+
+def send_update(settings_full: dict, udp_port: int) -> None:
+    _send({"type": "update", "settings": settings_full}, udp_port)
+
+
+def send_show(settings_full: dict, udp_port: int) -> None:
+    _send({"type": "show", "settings": settings_full}, udp_port)
+
+
+def send_hide(udp_port: int) -> None:
+    _send({"type": "hide"}, udp_port)
+
+
+# -----------------------
+# Binary delta channel
+# -----------------------
+def open_control_socket() -> socket.socket:
+    # Long-lived, non-blocking socket so acks from the overlay can be drained.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.setblocking(False)
+    return sock
+
+
+def send_delta(
+    session: protocol.DeltaSession,
+    sock: socket.socket,
+    settings_full: Optional[dict],
+    udp_port: int,
+    msg_type: int = protocol.MSG_UPDATE,
+) -> bool:
+    if settings_full is None:
+        data = session.encode_command(msg_type)
+    else:
+        data = session.encode_update(settings_full, msg_type)
+    if data is None:
+        return False
+    try:
+        sock.sendto(data, ("127.0.0.1", udp_port))
+    except OSError:
+        return False
+    return True
+
+
+def recv_acks(session: protocol.DeltaSession, sock: socket.socket) -> int:
+    n = 0
+    while True:
+        try:
+            data, _addr = sock.recvfrom(2048)
+        except BlockingIOError:
+            return n
+        except OSError:
+            # ICMP port-unreachable (overlay gone) surfaces here on Windows.
+            return n
+        try:
+            msg_type, session_id, seq, payload = protocol.decode_message(data)
+        except ValueError:
+            continue
+        if msg_type == protocol.MSG_ACK and session_id == session.session_id:
+            try:
+                frame, applied_us = protocol.decode_ack(payload)
+            except struct.error:
+                continue
+            if session.handle_ack(seq, frame, applied_us) is not None:
+                n += 1
+
+
+# -----------------------
+# JSON request / reply
+# -----------------------
+def request(msg: dict, udp_port: int, timeout: float = 1.0) -> Optional[dict]:
+    """Sends one JSON command and waits for the matching reply (None on timeout)."""
+    msg = dict(msg)
+    msg.setdefault("id", random.getrandbits(31))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(timeout)
+    try:
+        sock.sendto(json.dumps(msg).encode("utf-8"), ("127.0.0.1", udp_port))
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            sock.settimeout(remaining)
+            try:
+                data, _addr = sock.recvfrom(65535)
+            except (socket.timeout, OSError):
+                return None
+            try:
+                reply = json.loads(data.decode("utf-8", errors="ignore"))
+            except Exception:
+                continue
+            if isinstance(reply, dict) and reply.get("id") == msg["id"]:
+                return reply
+    finally:
+        sock.close()
+
+
+def wait_for_ack(session: protocol.DeltaSession, sock: socket.socket, seq: int, timeout: float = 1.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while seq in session.pending:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        select.select([sock], [], [], remaining)
+        recv_acks(session, sock)
+    return True
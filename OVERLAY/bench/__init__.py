@@ -0,0 +1,2 @@
+# bench/__init__.py
+# Headless benchmark and regression harness: python -m bench <command>
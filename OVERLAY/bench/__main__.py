@@ -0,0 +1,43 @@
+"""
+Headless benchmarks and regression checks.
+
+Examples:
+    python -m bench skins
+    python -m bench skins gamecube --update-golden
+    python -m bench skins --update-timings
+    python -m bench soak --sim-hours 12 --frames 60000
+    python -m bench allocs --frames 240
+    python -m bench latency --strategies 60,120,0
+    python -m bench axes --rows 1,4,64
+    python -m bench inputlog
+    python -m bench remote
+    python -m bench cache
+"""
+
+import argparse
+import sys
+
+from . import allocs, axes, cache, inputlog, latency, remote, skins, soak
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="bench", description="Retro Overlay benchmarks.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    skins.add_parser(sub)
+    soak.add_parser(sub)
+    allocs.add_parser(sub)
+    latency.add_parser(sub)
+    axes.add_parser(sub)
+    inputlog.add_parser(sub)
+    remote.add_parser(sub)
+    cache.add_parser(sub)
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# bench/allocs.py
+from __future__ import annotations
+
+import json
+
+from .common import init_headless
+
+import overlay
+from app_funcs.fake_joystick import driver_from_spec
+from app_funcs.udp import request
+
+# Runs the engine headless on scripted pads and requests an allocation
+# report over the control channel, the same way overlay_ctl.py allocs does.
+
+DEFAULT_PORT = 29351
+WARMUP_FRAMES = 60
+POLL_EVERY = 30
+
+
+def run(args) -> int:
+    init_headless()
+    driver = driver_from_spec(args.pads, manual_clock=True)
+    settings = {
+        "scale": args.scale,
+        "overlays": [
+            {"controller_index": i, "skin_name": skin, "corner": corner}
+            for i, (skin, corner) in enumerate(zip(args.skins.split(","), ("ul", "ur", "ll", "lr")))
+        ],
+    }
+    result = {}
+
+    def hook(frame: int, frame_ms: float):
+        driver.set_time(frame / overlay.FPS)
+        if frame == WARMUP_FRAMES:
+            request({"type": "alloc_start", "frames": args.frames, "top": args.top}, args.port)
+        elif frame > WARMUP_FRAMES and frame % POLL_EVERY == 0:
+            reply = request({"type": "query_alloc"}, args.port)
+            if reply is not None and reply.get("report"):
+                result["report"] = reply["report"]
+                return False
+        return frame < WARMUP_FRAMES + args.frames * 20
+
+    overlay.run_overlay_live(settings, udp_port=args.port, joystick_driver=driver, fps=0, frame_hook=hook)
+
+    if "report" not in result:
+        print(json.dumps({"error": "no allocation report"}))
+        return 1
+    print(json.dumps(result["report"], indent=2))
+    return 0
+
+
+def add_parser(sub):
+    sp = sub.add_parser("allocs", help="per-frame allocation / GC report from the engine")
+    sp.add_argument("--frames", type=int, default=240)
+    sp.add_argument("--top", type=int, default=15)
+    sp.add_argument("--skins", default="default,gamecube", help="one overlay per listed skin")
+    sp.add_argument("--scale", type=float, default=1.0)
+    sp.add_argument("--pads", default="random:3:2", help="fake joystick spec")
+    sp.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sp.set_defaults(fn=run)
@@ -0,0 +1,200 @@
+# bench/axes.py
+from __future__ import annotations
+
+import json
+import random
+import time
+
+from .common import init_headless, percentiles_us
+
+import numpy as np
+
+import controller_to_mouse as c2m
+import overlay
+from app_funcs import calibration
+from app_funcs.axis_conditioning import AxisConditioner, pair_index
+from app_funcs.calibration import PROFILE_VERSION, fit_axis
+from app_funcs.fake_joystick import FakeJoystick, Timeline
+from app_funcs.input_frames import AXIS_SCALE, quantize_axis
+
+# Table-driven, batched axis conditioning against the scalar functions it
+# replaces (overlay.dz/norm_trigger, controller_to_mouse's deadzone + curve).
+#
+# "equivalence" runs every quantized raw value through both and reports the
+# largest difference; "timing" conditions batches of pads x axes both ways
+# (stick and trigger view of every axis, like process() returns) and reports
+# the cost per call and per axis value.
+#
+# "radial" runs a grid over the whole square, corners included, through the
+# radial path and controller_to_mouse's scalar radial deadzone: the results
+# must agree to the table's quantization and no stick may leave the unit
+# circle. "mouse_tick" is the one-pad tick both ways; a single row costs the
+# batch's fixed numpy overhead, which is why controller_to_mouse stays scalar.
+#
+# "calibrated" reads pads with a calibration profile through the engine's
+# batch (AxisLayout) and scalar (CalibratedInput, "axes": false) stacks: axis()
+# must be the profile's normalized value on both, and the batch's stick and
+# trigger values the scalar dz()/norm_trigger() of it, to one table step.
+
+ROWS = "1,4,64,1024"
+REPEATS = 200
+
+
+def _equivalence() -> dict:
+    raw = np.arange(-AXIS_SCALE, AXIS_SCALE + 1, dtype=np.float64) / AXIS_SCALE
+    cases = {
+        "overlay": (
+            AxisConditioner(),
+            overlay.dz,
+            overlay.norm_trigger,
+        ),
+        "mouse": (
+            AxisConditioner(c2m.DEADZONE, rescale=True, curve=c2m.CURVE, trigger_split=0.0),
+            lambda v: c2m.apply_curve(c2m.apply_deadzone(v, c2m.DEADZONE), c2m.CURVE),
+            c2m.norm_trigger,
+        ),
+    }
+    out = {}
+    for name, (cond, stick_fn, trigger_fn) in cases.items():
+        stick, trigger = cond.process(raw[None, :])
+        want_stick = np.array([stick_fn(v) for v in raw.tolist()])
+        want_trigger = np.array([trigger_fn(v) for v in raw.tolist()])
+        out[name] = {
+            "values": int(raw.size),
+            "stick_max_err": float(np.max(np.abs(stick[0] - want_stick))),
+            "trigger_max_err": float(np.max(np.abs(trigger[0] - want_trigger))),
+        }
+    return out
+
+
+def _radial(steps: int = 201) -> dict:
+    cond = AxisConditioner(c2m.DEADZONE, radial=True, rescale=True, curve=c2m.CURVE, trigger_split=0.0)
+    grid = np.linspace(-1.0, 1.0, steps)
+    raw = np.array([[x, y] for x in grid for y in grid])
+    stick, _trigger = cond.process(raw, pair_index([[(0, 1)]] * len(raw), 2))
+    want = np.array([c2m.apply_radial_deadzone(x, y, c2m.DEADZONE, c2m.CURVE) for x, y in raw.tolist()])
+    return {
+        "values": int(len(raw)),
+        "max_err": float(np.max(np.abs(stick - want))),
+        "max_magnitude": float(np.max(np.hypot(stick[:, 0], stick[:, 1]))),
+    }
+
+
+def _calibrated(pads: int = 200) -> dict:
+    profile = {
+        "version": PROFILE_VERSION,
+        "guid": "bench",
+        "axes": [
+            fit_axis(0.2, -0.8, 0.9), fit_axis(-0.1, -0.95, 0.85), fit_axis(0.0, -1.0, 1.0),
+            fit_axis(0.05, -0.9, 1.0), fit_axis(-1.0, -1.0, 0.9), fit_axis(-1.0, -1.0, 1.0),
+        ],
+    }
+    skin = overlay.load_skin("default")
+    cond = AxisConditioner()
+    rng = random.Random(4)
+    axis_err = value_err = 0.0
+    for _ in range(pads):
+        tl = Timeline()
+        for ax in range(6):
+            # Quantized like SDL, a little past the captured reach now and then.
+            tl.axis(ax, round(rng.uniform(-1.0, 1.0) * AXIS_SCALE) / AXIS_SCALE, 0.0)
+        item = {"skin": skin, "joystick": FakeJoystick(0, tl, clock=lambda: 0.0), "pad": None, "calibration": profile}
+        (batch,), _dz, _nt = overlay.sample_inputs([item], overlay.axis_layout_for(cond, [item]), cond)
+        (scalar,), dz, nt = overlay.sample_inputs([item], None, None)
+        for name, idx in skin.axis_map.items():
+            want = max(-1.0, min(1.0, calibration.apply(profile, idx, item["joystick"].get_axis(idx))))
+            axis_err = max(axis_err, abs(batch.axis(name) - want), abs(scalar.axis(name) - want))
+            q = quantize_axis(want) / AXIS_SCALE
+            value_err = max(value_err, abs(batch.stick(name) - dz(q)), abs(batch.trigger(name) - nt(q)))
+    return {"pads": pads, "axis_max_err": axis_err, "value_max_err": value_err}
+
+
+def _time(fn, repeats: int) -> list:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def _timing(rows_list: list, repeats: int, radial: bool) -> list:
+    rng = random.Random(1)
+    cond = AxisConditioner(radial=radial)
+    out = []
+    for rows in rows_list:
+        raw = np.array([[rng.uniform(-1.0, 1.0) for _ in range(6)] for _ in range(rows)])
+        values = raw.tolist()
+        pairs = pair_index([[(0, 1), (2, 3)]] * rows, 6)
+
+        def scalar():
+            dz, nt = overlay.dz, overlay.norm_trigger
+            return [([dz(v) for v in row], [nt(v) for v in row]) for row in values]
+
+        def vectorized():
+            return cond.process(raw, pairs)
+
+        n = rows * 6
+        s = percentiles_us(_time(scalar, repeats))
+        v = percentiles_us(_time(vectorized, repeats))
+        out.append({
+            "rows": rows,
+            "axes": n,
+            "scalar": s,
+            "vectorized": v,
+            "scalar_ns_per_axis": round(s["p50_us"] * 1000 / n, 1),
+            "vectorized_ns_per_axis": round(v["p50_us"] * 1000 / n, 1),
+            "speedup_p50": round(s["p50_us"] / v["p50_us"], 2) if v["p50_us"] else None,
+        })
+    return out
+
+
+def _mouse_tick(repeats: int) -> dict:
+    """One controller_to_mouse tick: LX, LY, LT, RT."""
+    cond = AxisConditioner(c2m.DEADZONE, rescale=True, curve=c2m.CURVE, trigger_split=0.0)
+    raw = np.array([[0.43, -0.61, -0.2, 0.75]])
+    pairs = pair_index([[(0, 1)]], 4)
+    lx, ly, lt, rt = raw[0].tolist()
+
+    def scalar():
+        return (
+            c2m.apply_curve(c2m.apply_deadzone(lx, c2m.DEADZONE), c2m.CURVE),
+            c2m.apply_curve(c2m.apply_deadzone(ly, c2m.DEADZONE), c2m.CURVE),
+            c2m.norm_trigger(lt),
+            c2m.norm_trigger(rt),
+        )
+
+    def vectorized():
+        stick, trig = cond.process(raw, pairs)
+        return float(stick[0, 0]), float(stick[0, 1]), float(trig[0, 2]), float(trig[0, 3])
+
+    return {"scalar": percentiles_us(_time(scalar, repeats)), "vectorized": percentiles_us(_time(vectorized, repeats))}
+
+
+def run(args) -> int:
+    init_headless()
+    rows_list = [int(v) for v in args.rows.split(",") if v.strip()]
+    result = {
+        "equivalence": _equivalence(),
+        "radial": _radial(),
+        "calibrated": _calibrated(),
+        "timing": _timing(rows_list, args.repeats, radial=False),
+        "timing_radial": _timing(rows_list, args.repeats, radial=True),
+        "mouse_tick": _mouse_tick(args.repeats),
+    }
+    print(json.dumps(result, indent=2))
+    worst = max(max(e["stick_max_err"], e["trigger_max_err"]) for e in result["equivalence"].values())
+    radial = result["radial"]
+    # Radial magnitudes go through the table, so they match to its resolution.
+    radial_ok = radial["max_err"] < 1e-3 and radial["max_magnitude"] <= 1.0 + 1e-9
+    cal = result["calibrated"]
+    # One table step: process() rounds ties up, quantize_axis() to even.
+    cal_ok = cal["axis_max_err"] < 1e-9 and cal["value_max_err"] <= 1.0 / AXIS_SCALE + 1e-12
+    return 0 if worst < 1e-9 and radial_ok and cal_ok else 1
+
+
+def add_parser(sub):
+    sp = sub.add_parser("axes", help="table-driven axis conditioning vs the scalar functions")
+    sp.add_argument("--rows", default=ROWS, help="comma-separated pad counts per batch")
+    sp.add_argument("--repeats", type=int, default=REPEATS)
+    sp.set_defaults(fn=run)
@@ -0,0 +1,151 @@
+# bench/cache.py
+from __future__ import annotations
+
+import json
+import time
+
+import pygame
+
+from .common import init_headless, percentiles_us
+
+import overlay
+from app_funcs.discovery import list_skins
+from app_funcs.fake_joystick import FakeJoystick, Timeline
+from app_funcs.frame_cache import FrameCache
+from app_funcs.scene import Scene
+
+# FrameCache on the skins it is for, against drawing every frame.
+#
+# The cache covers skins drawn by hand (skin.draw, no scene); scene skins
+# skip it and repaint only the nodes whose state changed (app_funcs/scene.py).
+# Every shipped skin declares a scene, so each one is also run as a hand-drawn
+# skin - the same draw() with the scene hidden - through the engine's cache
+# path: a key equal to the last frame's draws nothing, a hit is the cached
+# frame, a miss is drawn from the key. The retained scene path runs on the
+# same input for comparison.
+#
+# Two scripted pads, both looping every LOOP_S: "buttons" presses buttons
+# and the d-pad with the sticks at rest (the retro case the cache is for),
+# "sticks" also circles the left stick, more keys than the cache holds. Every
+# CHECK_EVERY frames the frame the cache path shows is compared with a fresh
+# draw of its key; any difference fails the run, as does a skin the cache
+# never hits on "buttons".
+
+FPS = 60.0
+FRAMES = 1200
+LOOP_S = 4.0
+CHECK_EVERY = 10
+
+
+class HandDrawn:
+    """A skin's draw() and maps without its scene: what a legacy .py skin looks like to the engine."""
+
+    def __init__(self, skin):
+        self.skin = skin
+        self.btn_map = skin.btn_map
+        self.axis_map = skin.axis_map
+        self.axis_px = getattr(skin, "axis_px", {})
+        self.design_width = getattr(skin, "design_width", 400)
+        self.design_height = getattr(skin, "design_height", 300)
+
+    def draw(self, screen, inp, dz, norm_trigger, scale):
+        self.skin.draw(screen, inp, dz, norm_trigger, scale)
+
+
+def _buttons(tl: Timeline):
+    tl.sequence([0, 1, 2, 3, 4, 5], start=0.5, hold=0.2, gap=0.3)
+    for i, (x, y) in enumerate(((0, 1), (1, 0), (0, -1), (-1, 0))):
+        tl.hat(x, y, 0.25 + i * 0.9, hold=0.4)
+    tl.axis(5, 1.0, 2.0, hold=0.5)
+
+
+def _sticks(tl: Timeline):
+    _buttons(tl)
+    tl.sweep((0, 1), 0.0, LOOP_S, cycles=2)
+
+
+SCRIPTS = {"buttons": _buttons, "sticks": _sticks}
+
+
+def _run_skin(skin, script, frames: int, scale: float) -> dict:
+    w = max(1, int(int(getattr(skin, "design_width", 400)) * scale))
+    h = max(1, int(int(getattr(skin, "design_height", 300)) * scale))
+    plain = overlay.make_overlay_surface(w, h)
+    surf = overlay.make_overlay_surface(w, h)
+    check = overlay.make_overlay_surface(w, h)
+    scene_surf = overlay.make_overlay_surface(w, h)
+
+    t = [0.0]
+    tl = Timeline(loop=LOOP_S)
+    script(tl)
+    js = FakeJoystick(0, tl, clock=lambda: t[0])
+    hand = HandDrawn(skin)
+    cache = FrameCache(hand, scale)
+    scene = Scene(skin.scene) if getattr(skin, "scene", None) else None
+    inp = overlay.InputState(js, skin.btn_map, skin.axis_map)
+
+    uncached, cached, retained = [], [], []
+    last_key = None
+    frame_surf = surf
+    mismatches = 0
+    for f in range(frames):
+        t[0] = f / FPS
+
+        t0 = time.perf_counter_ns()
+        plain.fill(overlay.COLORKEY)
+        hand.draw(plain, inp, overlay.dz, overlay.norm_trigger, scale)
+        uncached.append(time.perf_counter_ns() - t0)
+
+        t0 = time.perf_counter_ns()
+        key = cache.key(inp)
+        if key != last_key:
+            last_key = key
+            frame_surf = cache.get(key)
+            if frame_surf is None:
+                surf.fill(overlay.COLORKEY)
+                hand.draw(surf, cache.input_for(key), overlay.dz, overlay.norm_trigger, scale)
+                frame_surf = cache.put(key, surf)
+        cached.append(time.perf_counter_ns() - t0)
+
+        if f % CHECK_EVERY == 0:
+            check.fill(overlay.COLORKEY)
+            hand.draw(check, cache.input_for(key), overlay.dz, overlay.norm_trigger, scale)
+            if pygame.image.tobytes(check, "RGB") != pygame.image.tobytes(frame_surf, "RGB"):
+                mismatches += 1
+
+        if scene is not None:
+            t0 = time.perf_counter_ns()
+            scene.update(scene_surf, inp, overlay.dz, overlay.norm_trigger, scale, overlay.COLORKEY)
+            retained.append(time.perf_counter_ns() - t0)
+
+    out = {
+        "uncached": percentiles_us(uncached),
+        "cached": percentiles_us(cached),
+        "cache": cache.stats(),
+        "mismatches": mismatches,
+    }
+    if scene is not None:
+        out["scene"] = percentiles_us(retained)
+    return out
+
+
+def run(args) -> int:
+    init_headless()
+    report = {}
+    for skin_name in args.skins or list_skins():
+        skin = overlay.load_skin(skin_name)
+        report[skin_name] = {name: _run_skin(skin, script, args.frames, args.scale) for name, script in SCRIPTS.items()}
+    print(json.dumps(report, indent=2))
+    ok = all(
+        all(r["mismatches"] == 0 for r in runs.values()) and runs["buttons"]["cache"]["hits"] > 0
+        for runs in report.values()
+    )
+    return 0 if ok else 1
+
+
+def add_parser(sub):
+    sp = sub.add_parser("cache", help="frame cache on hand-drawn skins vs drawing every frame")
+    sp.add_argument("skins", nargs="*", help="skin names (default: everything in skins/)")
+    sp.add_argument("--frames", type=int, default=FRAMES)
+    sp.add_argument("--scale", type=float, default=1.0)
+    sp.set_defaults(fn=run)
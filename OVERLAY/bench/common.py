@@ -0,0 +1,69 @@
+# bench/common.py
+from __future__ import annotations
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Run from OVERLAY/ (python -m bench) or from anywhere with the path set up.
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+import pygame
+
+from app_funcs.fake_joystick import FakeJoystick, Timeline
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+
+HOLD = 1e9
+
+
+def init_headless():
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+
+def percentiles_us(samples_ns: list) -> dict:
+    if not samples_ns:
+        return {"count": 0}
+    vals = sorted(samples_ns)
+    n = len(vals)
+    return {
+        "count": n,
+        "p50_us": round(vals[n // 2] / 1000, 2),
+        "p95_us": round(vals[min(n - 1, int(n * 0.95))] / 1000, 2),
+        "p99_us": round(vals[min(n - 1, int(n * 0.99))] / 1000, 2),
+        "max_us": round(vals[-1] / 1000, 2),
+    }
+
+
+# Fixed input states every skin is rendered with (XInput-style indices).
+def _mixed(tl: Timeline):
+    for b in (0, 3, 4):
+        tl.press(b, 0.0, HOLD)
+    for ax, v in ((0, 0.5), (1, -0.7), (2, -0.3), (3, 0.9), (4, 0.4), (5, -1.0)):
+        tl.axis(ax, v, 0.0)
+    tl.hat(-1, 0, 0.0, HOLD)
+
+
+STATES = {
+    "idle": lambda tl: None,
+    "buttons": lambda tl: [tl.press(b, 0.0, HOLD) for b in range(12)],
+    "sticks_min": lambda tl: [tl.axis(ax, -1.0, 0.0) for ax in range(4)],
+    "sticks_max": lambda tl: [tl.axis(ax, 1.0, 0.0) for ax in range(4)],
+    "triggers": lambda tl: [tl.axis(ax, 1.0, 0.0) for ax in (4, 5)],
+    "dpad_up": lambda tl: tl.hat(0, 1, 0.0, HOLD),
+    "dpad_diag": lambda tl: tl.hat(1, -1, 0.0, HOLD),
+    "mixed": _mixed,
+}
+
+
+def state_joystick(name: str) -> FakeJoystick:
+    tl = Timeline()
+    STATES[name](tl)
+    return FakeJoystick(0, tl, clock=lambda: 0.0)
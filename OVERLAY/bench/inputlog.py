@@ -0,0 +1,191 @@
+# bench/inputlog.py
+from __future__ import annotations
+
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from .common import percentiles_us
+
+import export_frames
+from app_funcs.input_frames import AXIS_SCALE
+from app_funcs.input_log import (
+    FLAG_DISCONNECT,
+    FLAG_KEYFRAME,
+    HEADER,
+    HEADER_SIZE,
+    InputLogReader,
+    InputRecorder,
+    record_dtype,
+)
+from app_funcs.remote_input import RemoteJoystick
+
+# Keyframe-indexed seeks of InputLogReader against a full scan of the log.
+#
+# A log is recorded from a few pads that join at different times (so their
+# keyframes fall in the same frames as other pads' plain records), change
+# state at random and drop out once. Every distinct record time, one
+# microsecond either side of it, and the gaps are then looked up with
+# seek()/range()/state_at() and compared with np.searchsorted over all
+# records, and export_frames' per-chunk lookup is checked the same way for
+# every pad; any mismatch fails the run. "same_time_keyframes" counts the
+# frames where a keyframe is not the first record of its timestamp, the
+# case a bisect on the wrong side gets wrong.
+#
+# "index_cache" opens the log with the .idx cache, then overwrites it with a
+# log of the same record count that starts later, and checks the reopened
+# reader's keyframe index against the new records instead of the cached one.
+
+PADS = 3
+FRAMES = 3000
+FRAME_US = 16_667
+KEYFRAME_S = 0.25
+REPEATS = 2000
+
+
+def _record(path: str, pads: int, frames: int, seed: int = 1):
+    rng = random.Random(seed)
+    rec = InputRecorder(path, keyframe_s=KEYFRAME_S)
+    t0 = rec.start_us
+    joysticks = [RemoteJoystick(ci) for ci in range(pads)]
+    join = [ci * frames // (pads * 4) + ci * 7 for ci in range(pads)]
+    drop = {pads - 1: (frames // 2, frames // 2 + 90)}
+    for f in range(frames):
+        live = []
+        for ci, js in enumerate(joysticks):
+            gone = drop.get(ci)
+            if f < join[ci] or (gone and gone[0] <= f < gone[1]):
+                continue
+            if rng.random() < 0.2:
+                js.buttons = rng.getrandbits(12)
+                js.hat = (rng.randint(-1, 1), rng.randint(-1, 1))
+                js.axes = [rng.randint(-AXIS_SCALE, AXIS_SCALE) for _ in range(6)]
+            live.append((ci, js))
+        rec.record(live, t0 + f * FRAME_US)
+    rec.close()
+
+
+def _probe_times(t: np.ndarray) -> np.ndarray:
+    uniq = np.unique(t).astype(np.int64)
+    return np.unique(np.concatenate([uniq - 1, uniq, uniq + 1, uniq + FRAME_US // 2]))
+
+
+def _state_scan(records, t_us: int) -> dict:
+    upto = records[:int(np.searchsorted(records["t_us"], t_us, side="right"))]
+    out = {}
+    for ci in np.unique(upto["controller"]):
+        rec = upto[np.flatnonzero(upto["controller"] == ci)[-1]]
+        if not rec["flags"] & FLAG_DISCONNECT:
+            out[int(ci)] = rec.tobytes()
+    return out
+
+
+def _equivalence(reader: InputLogReader) -> dict:
+    records = reader.records
+    t = records["t_us"]
+    probes = _probe_times(t)
+
+    seek_bad = range_bad = state_bad = 0
+    for p in probes.tolist():
+        want = int(np.searchsorted(t, p, side="left"))
+        if reader.seek(p) != want:
+            seek_bad += 1
+        r = reader.range(p, p + FRAME_US)
+        if len(r) != int(np.searchsorted(t, p + FRAME_US, side="left")) - want:
+            range_bad += 1
+
+    # state_at compares whole rows, so probe a sample of times.
+    for p in probes[::7].tolist():
+        got = {ci: rec.tobytes() for ci, rec in reader.state_at(p).items()}
+        if got != _state_scan(records, p):
+            state_bad += 1
+
+    # A short export chunk starting at each sampled time, for every pad.
+    frame_bad = 0
+    step = np.arange(4, dtype=np.int64) * FRAME_US
+    for ci in np.unique(records["controller"]).tolist():
+        for p0 in probes[::7].tolist():
+            times = (p0 + step).astype(np.uint64)
+            got = export_frames._frame_records(reader, ci, times)
+            for p, rec in zip(times.tolist(), got):
+                want = _state_scan(records, p).get(ci)
+                if (rec.tobytes() if rec is not None else None) != want:
+                    frame_bad += 1
+
+    keys = np.flatnonzero(records["flags"] & FLAG_KEYFRAME)
+    same_time = int(np.count_nonzero((keys > 0) & (t[keys] == t[np.maximum(keys - 1, 0)])))
+    return {
+        "records": len(records),
+        "keyframes": int(keys.size),
+        "same_time_keyframes": same_time,
+        "probes": int(probes.size),
+        "seek_mismatches": seek_bad,
+        "range_mismatches": range_bad,
+        "state_mismatches": state_bad,
+        "frame_mismatches": frame_bad,
+    }
+
+
+def _timing(reader: InputLogReader, repeats: int) -> dict:
+    rng = random.Random(2)
+    t = reader.records["t_us"]
+    lo, hi = int(t[0]), int(t[-1])
+    probes = [rng.randint(lo, hi) for _ in range(repeats)]
+    samples = []
+    for p in probes:
+        t0 = time.perf_counter_ns()
+        reader.seek(p)
+        samples.append(time.perf_counter_ns() - t0)
+    return percentiles_us(samples)
+
+
+def _index_cache(path: str) -> dict:
+    with InputLogReader(path) as reader:
+        n = len(reader)
+
+    # Same record count and size, everything shifted 10 s later.
+    shift = 10_000_000
+    with open(path, "rb") as f:
+        raw = bytearray(f.read())
+    magic, version, rec_size, start_us, start_wall, keyframe_us = HEADER.unpack_from(raw, 0)
+    HEADER.pack_into(raw, 0, magic, version, rec_size, start_us + shift, start_wall, keyframe_us)
+    records = np.frombuffer(raw, dtype=record_dtype(), count=n, offset=HEADER_SIZE)
+    records["t_us"] += shift
+    with open(path, "wb") as f:
+        f.write(raw)
+
+    with InputLogReader(path) as reader:
+        rows = np.flatnonzero(reader.records["flags"] & FLAG_KEYFRAME)
+        fresh = bool(
+            np.array_equal(reader._key_rows, rows)
+            and np.array_equal(reader._key_t, reader.records["t_us"][rows])
+        )
+    return {"records": n, "rebuilt": fresh}
+
+
+def run(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.ril")
+        _record(path, args.pads, args.frames)
+        with InputLogReader(path, use_index_cache=False) as reader:
+            result = {
+                "equivalence": _equivalence(reader),
+                "seek": _timing(reader, args.repeats),
+            }
+        result["index_cache"] = _index_cache(path)
+    print(json.dumps(result, indent=2))
+    eq = result["equivalence"]
+    bad = eq["seek_mismatches"] + eq["range_mismatches"] + eq["state_mismatches"] + eq["frame_mismatches"]
+    return 0 if bad == 0 and eq["same_time_keyframes"] and result["index_cache"]["rebuilt"] else 1
+
+
+def add_parser(sub):
+    sp = sub.add_parser("inputlog", help="input log seeks vs a full scan")
+    sp.add_argument("--pads", type=int, default=PADS)
+    sp.add_argument("--frames", type=int, default=FRAMES)
+    sp.add_argument("--repeats", type=int, default=REPEATS)
+    sp.set_defaults(fn=run)
@@ -0,0 +1,95 @@
+# bench/latency.py
+from __future__ import annotations
+
+import json
+import math
+import time
+
+from .common import init_headless
+
+import overlay
+from app_funcs.fake_joystick import FakeJoystick, FakeJoystickDriver, Timeline
+from app_funcs.udp import request
+
+# Input-to-display latency per scheduling strategy (frame cap), measured by
+# the engine's own latency probe on real time. Each pad toggles button 0 at a
+# period that doesn't line up with any frame rate and reports the exact
+# scripted toggle time as state_ns, so besides sample -> present the probe
+# also sees origin -> present (the wait for the next sample included).
+
+DEFAULT_PORT = 29352
+STRATEGIES = "60,120,240,0"
+SECONDS = 5.0
+TOGGLE_S = 0.0373
+
+
+class TogglePad(FakeJoystick):
+    """Button 0 flips every `half` seconds, starting at t0_ns."""
+
+    def __init__(self, index: int, half: float, t0_ns: int):
+        self.half = half
+        self.t0_ns = t0_ns
+        super().__init__(
+            index,
+            Timeline(loop=2 * half).press(0, 0.0, half),
+            # Whole milliseconds, rounded down so a state never predates its toggle.
+            clock=lambda: ((time.perf_counter_ns() - t0_ns) // 1_000_000) / 1000.0,
+        )
+
+    @property
+    def state_ns(self):
+        if self._t is None:
+            return None
+        return self.t0_ns + int(math.floor(self._t / self.half) * self.half * 1e9)
+
+
+def _run_one(fps: int, args) -> dict:
+    t0_ns = time.perf_counter_ns()
+    driver = FakeJoystickDriver(
+        [TogglePad(i, args.toggle_s * (1.0 + 0.17 * i), t0_ns) for i in range(args.pads)]
+    )
+    settings = {
+        "latency_probe": True,
+        "overlays": [
+            {"controller_index": i, "skin_name": args.skin, "corner": corner}
+            for i, corner in zip(range(args.pads), ("ul", "ur", "ll", "lr"))
+        ],
+    }
+    result = {}
+    deadline = time.perf_counter() + args.seconds
+
+    def hook(frame: int, frame_ms: float):
+        if time.perf_counter() < deadline:
+            return True
+        reply = request({"type": "query_stats"}, args.port)
+        result["stats"] = (reply or {}).get("stats", {})
+        result["frames"] = frame
+        return False
+
+    overlay.run_overlay_live(settings, udp_port=args.port, joystick_driver=driver, fps=fps, frame_hook=hook)
+
+    stats = result.get("stats", {})
+    return {
+        "fps_cap": fps or "uncapped",
+        "fps": stats.get("fps"),
+        "frames": result.get("frames", 0),
+        "latency": stats.get("latency", {}).get("controllers", {}),
+    }
+
+
+def run(args) -> int:
+    init_headless()
+    runs = [_run_one(int(v), args) for v in args.strategies.split(",") if v.strip()]
+    print(json.dumps(runs, indent=2))
+    return 0 if all(r["latency"] for r in runs) else 1
+
+
+def add_parser(sub):
+    sp = sub.add_parser("latency", help="input-to-display latency per frame cap (fake pads, real time)")
+    sp.add_argument("--strategies", default=STRATEGIES, help="comma-separated fps caps, 0 = uncapped")
+    sp.add_argument("--seconds", type=float, default=SECONDS, help="per strategy")
+    sp.add_argument("--pads", type=int, default=2)
+    sp.add_argument("--skin", default="default")
+    sp.add_argument("--toggle-s", type=float, default=TOGGLE_S, help="button toggle period of pad 0")
+    sp.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sp.set_defaults(fn=run)
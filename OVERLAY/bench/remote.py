@@ -0,0 +1,145 @@
+# bench/remote.py
+from __future__ import annotations
+
+import json
+import time
+
+from app_funcs.input_frames import AXIS_SCALE, now_us
+from app_funcs.remote_input import DISCONNECT_AFTER_S, SYNC_INTERVAL_S, RemoteJoystick, RemoteInputReceiver, RemoteSender
+
+# Dual-PC input path on localhost: a RemoteSender streaming a pad to a live
+# RemoteInputReceiver.
+#
+# "restart" stops the sender after it has counted its seq up, then starts a
+# new one (seq from 1 again) holding a different state, and measures how long
+# the receiver takes to show it. With its own epoch the new sender must be
+# picked up at once; an epoch-0 sender (one that predates epochs) only after
+# the pad timed out. Either way the receiver must not sit on the old state.
+#
+# "sync" streams state changes and, for each one the receiver applies, takes
+# the receiver's end-to-end estimate (apply time minus state_ns, the sender's
+# sample time through the ping/pong clock offset) against the true figure.
+# Sender and receiver share one clock here, so the truth is known: apply time
+# minus the t_us the change was sent with, and a clock offset of zero.
+
+DEFAULT_PORT = 29353
+JITTER_MS = 5.0
+SEND_HZ = 250
+WARM_FRAMES = 500
+MAX_RECOVER_MS = 100.0
+SYNC_S = 2.0
+CHANGE_EVERY = 10
+MAX_SYNC_ERROR_MS = 1.0
+
+
+def _pad(buttons: int, x: float) -> RemoteJoystick:
+    js = RemoteJoystick(0)
+    js.buttons = buttons
+    js.axes = [int(x * AXIS_SCALE)] + [0] * 5
+    return js
+
+
+def _stream(sender: RemoteSender, pad, frames: int):
+    period = 1.0 / SEND_HZ
+    for _ in range(frames):
+        sender.send([(0, pad)])
+        sender.sleep(period)
+
+
+def _restart(port: int, epochs: tuple[int, int], gap_s: float) -> dict:
+    rx = RemoteInputReceiver(port, jitter_ms=JITTER_MS, host="127.0.0.1")
+    try:
+        first = RemoteSender(("127.0.0.1", port), rate_hz=SEND_HZ)
+        first.epoch = epochs[0]
+        # The first sender's seq runs well ahead of where the second one starts.
+        _stream(first, _pad(0b01, 0.5), WARM_FRAMES)
+        first.close()
+        rx.advance()
+        time.sleep(gap_s)
+
+        second = RemoteSender(("127.0.0.1", port), rate_hz=SEND_HZ)
+        second.epoch = epochs[1]
+        pad = _pad(0b10, -0.5)
+        t0 = time.perf_counter()
+        recovered_ms = None
+        while time.perf_counter() - t0 < 2 * DISCONNECT_AFTER_S + 1.0:
+            second.send([(0, pad)])
+            rx.advance()
+            js = rx.joystick(0)
+            if js.connected and js.buttons == 0b10:
+                recovered_ms = (time.perf_counter() - t0) * 1000
+                break
+            second.sleep(1.0 / SEND_HZ)
+        second.close()
+        return {"epochs": list(epochs), "gap_s": gap_s, "recovered_ms": recovered_ms, "receiver": rx.stats()}
+    finally:
+        rx.close()
+
+
+def _ms(vals: list) -> dict:
+    v = sorted(vals)
+    if not v:
+        return {"count": 0}
+    return {
+        "count": len(v),
+        "p50": round(v[len(v) // 2], 3),
+        "p95": round(v[min(len(v) - 1, int(len(v) * 0.95))], 3),
+        "max": round(v[-1], 3),
+    }
+
+
+def _sync(port: int) -> dict:
+    rx = RemoteInputReceiver(port, jitter_ms=JITTER_MS, host="127.0.0.1")
+    sender = RemoteSender(("127.0.0.1", port), rate_hz=SEND_HZ)
+    try:
+        pad = _pad(0, 0.0)
+        sent_us: dict[int, int] = {}
+        seen = 0
+        true_ms, est_ms = [], []
+        t_end = time.perf_counter() + SYNC_S
+        i = 0
+        while time.perf_counter() < t_end:
+            if i % CHANGE_EVERY == 0:
+                pad.buttons = i // CHANGE_EVERY + 1
+            t = now_us()
+            sender.send([(0, pad)], t)
+            sent_us.setdefault(pad.buttons, t)
+            rx.advance()
+            js = rx.joystick(0)
+            # Changes applied before the first pong carry the unsynced estimate.
+            if js.connected and js.buttons != seen and rx.clock_offset_us is not None:
+                seen = js.buttons
+                true_ms.append((js.last_us - sent_us[seen]) / 1000.0)
+                est_ms.append((js.last_us - js.state_ns // 1000) / 1000.0)
+            i += 1
+            sender.sleep(1.0 / SEND_HZ)
+        err = [abs(e - t) for e, t in zip(est_ms, true_ms)]
+        return {
+            "pongs": sender.pongs,
+            "true_end_to_end_ms": _ms(true_ms),
+            "estimated_end_to_end_ms": _ms(est_ms),
+            "abs_error_ms": _ms(err),
+            "receiver": rx.stats(),
+        }
+    finally:
+        sender.close()
+        rx.close()
+
+
+def run(args) -> int:
+    result = {
+        "restart_new_epoch": _restart(args.port, (7, 8), 0.05),
+        "restart_epoch0_after_timeout": _restart(args.port + 1, (0, 0), DISCONNECT_AFTER_S + 0.2),
+    }
+    ok = all(r["recovered_ms"] is not None and r["recovered_ms"] < MAX_RECOVER_MS for r in result.values())
+    result["sync"] = sync = _sync(args.port + 2)
+    print(json.dumps(result, indent=2))
+    err = sync["abs_error_ms"]
+    ok = ok and sync["pongs"] >= SYNC_S / SYNC_INTERVAL_S / 2 and err["count"] and err["max"] < MAX_SYNC_ERROR_MS
+    return 0 if ok else 1
+
+
+def add_parser(sub):
+    sp = sub.add_parser("remote", help="remote input sender restart and clock sync against a live receiver")
+    sp.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sp.set_defaults(fn=run)
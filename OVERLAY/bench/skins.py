@@ -0,0 +1,165 @@
+# bench/skins.py
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import numpy as np
+import pygame
+
+from .common import GOLDEN_DIR, STATES, init_headless, percentiles_us, state_joystick
+
+import overlay
+from app_funcs.discovery import list_skins
+
+# Renders every skin in skins/ for each fixed input state at several scales:
+#   - compares the RGBA result with bench/golden/<skin>/<state>@<scale>.png
+#   - times draw() over many frames and compares p50 with the local
+#     baseline in bench/golden/timings.json (machine-specific, not shared)
+
+SCALES = (0.5, 1.0, 1.5, 2.0)
+CHANNEL_TOL = 8
+PIXEL_TOL = 0.002
+TIME_TOL = 0.25
+ITERATIONS = 300
+
+TIMINGS_PATH = os.path.join(GOLDEN_DIR, "timings.json")
+
+
+def render_rgba(skin, joystick, scale: float) -> pygame.Surface:
+    w = max(1, int(int(getattr(skin, "design_width", 400)) * scale))
+    h = max(1, int(int(getattr(skin, "design_height", 300)) * scale))
+    surf = overlay.make_overlay_surface(w, h)
+    surf.fill(overlay.COLORKEY)
+    skin.draw(surf, overlay.InputState(joystick, skin.btn_map, skin.axis_map), overlay.dz, overlay.norm_trigger, scale)
+
+    out = pygame.Surface((w, h), pygame.SRCALPHA)
+    out.fill((0, 0, 0, 0))
+    out.blit(surf, (0, 0))
+    return out
+
+
+def _pixels(surf: pygame.Surface) -> np.ndarray:
+    w, h = surf.get_size()
+    return np.frombuffer(pygame.image.tobytes(surf, "RGBA"), dtype=np.uint8).reshape(h, w, 4)
+
+
+def golden_path(skin_name: str, state: str, scale: float) -> str:
+    return os.path.join(GOLDEN_DIR, skin_name, f"{state}@{scale:g}.png")
+
+
+def compare(skin_name: str, state: str, scale: float, surf: pygame.Surface, channel_tol: int) -> dict:
+    path = golden_path(skin_name, state, scale)
+    if not os.path.isfile(path):
+        return {"status": "missing"}
+
+    want = _pixels(pygame.image.load(path))
+    got = _pixels(surf)
+    if want.shape != got.shape:
+        return {"status": "size", "want": list(want.shape[:2]), "got": list(got.shape[:2])}
+
+    bad = (np.abs(want.astype(np.int16) - got.astype(np.int16)) > channel_tol).any(axis=2)
+    return {"status": "ok", "diff_fraction": float(bad.mean())}
+
+
+def time_draw(skin, scale: float, iterations: int) -> list:
+    joysticks = [state_joystick(name) for name in STATES]
+    w = max(1, int(int(getattr(skin, "design_width", 400)) * scale))
+    h = max(1, int(int(getattr(skin, "design_height", 300)) * scale))
+    surf = overlay.make_overlay_surface(w, h)
+    inputs = [overlay.InputState(js, skin.btn_map, skin.axis_map) for js in joysticks]
+
+    for inp in inputs:
+        skin.draw(surf, inp, overlay.dz, overlay.norm_trigger, scale)
+
+    samples = []
+    for i in range(iterations):
+        inp = inputs[i % len(inputs)]
+        t0 = time.perf_counter_ns()
+        surf.fill(overlay.COLORKEY)
+        skin.draw(surf, inp, overlay.dz, overlay.norm_trigger, scale)
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def _load_timings() -> dict:
+    try:
+        with open(TIMINGS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def run(args) -> int:
+    init_headless()
+    skins = args.skins or list_skins()
+    scales = [float(s) for s in args.scales.split(",")] if args.scales else list(SCALES)
+    baseline = _load_timings()
+    new_timings = {}
+
+    report = {"skins": {}, "pixel_failures": [], "time_regressions": []}
+    for skin_name in skins:
+        try:
+            skin = overlay.load_skin(skin_name)
+        except Exception as e:
+            report["skins"][skin_name] = {"error": repr(e)}
+            report["pixel_failures"].append(skin_name)
+            continue
+
+        entry = {"pixels": {}, "draw": {}}
+        for scale in scales:
+            for state in STATES:
+                surf = render_rgba(skin, state_joystick(state), scale)
+                key = f"{state}@{scale:g}"
+
+                if args.update_golden:
+                    path = golden_path(skin_name, state, scale)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    pygame.image.save(surf, path)
+                    continue
+
+                res = compare(skin_name, state, scale, surf, args.channel_tol)
+                entry["pixels"][key] = res
+                if res["status"] != "ok" or res["diff_fraction"] > args.pixel_tol:
+                    report["pixel_failures"].append(f"{skin_name}/{key}")
+
+            stats = percentiles_us(time_draw(skin, scale, args.iterations))
+            entry["draw"][f"{scale:g}"] = stats
+            new_timings.setdefault(skin_name, {})[f"{scale:g}"] = stats["p50_us"]
+
+            base = baseline.get(skin_name, {}).get(f"{scale:g}")
+            if base and stats["p50_us"] > base * (1.0 + args.time_tol):
+                report["time_regressions"].append(
+                    {"skin": skin_name, "scale": scale, "baseline_p50_us": base, "p50_us": stats["p50_us"]}
+                )
+
+        report["skins"][skin_name] = entry
+
+    if args.update_timings:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(TIMINGS_PATH, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **new_timings}, f, indent=2, sort_keys=True)
+
+    if not args.verbose:
+        for entry in report["skins"].values():
+            entry.pop("pixels", None)
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.update_golden:
+        return 0
+    return 1 if report["pixel_failures"] or report["time_regressions"] else 0
+
+
+def add_parser(sub):
+    sp = sub.add_parser("skins", help="per-skin draw timings and golden image comparison")
+    sp.add_argument("skins", nargs="*", help="skin names (default: everything in skins/)")
+    sp.add_argument("--scales", default="", help="comma separated, default 0.5,1,1.5,2")
+    sp.add_argument("--iterations", type=int, default=ITERATIONS)
+    sp.add_argument("--channel-tol", type=int, default=CHANNEL_TOL, help="per-channel difference ignored")
+    sp.add_argument("--pixel-tol", type=float, default=PIXEL_TOL, help="allowed fraction of differing pixels")
+    sp.add_argument("--time-tol", type=float, default=TIME_TOL, help="allowed p50 slowdown vs baseline")
+    sp.add_argument("--update-golden", action="store_true", help="rewrite golden images")
+    sp.add_argument("--update-timings", action="store_true", help="store this run as the local time baseline")
+    sp.add_argument("-v", "--verbose", action="store_true", help="include per-image diff results")
+    sp.set_defaults(fn=run)
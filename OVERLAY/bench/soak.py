@@ -0,0 +1,211 @@
+# bench/soak.py
+from __future__ import annotations
+
+import gc
+import json
+import os
+import random
+import sys
+
+import numpy as np
+import pygame
+
+from .common import init_headless, percentiles_us
+
+import overlay
+from app_funcs.control_client import ControlClient
+from app_funcs.discovery import list_skins
+from app_funcs.fake_joystick import FakeJoystick, FakeJoystickDriver, Timeline
+
+# Compressed-time soak of the real engine loop (headless, uncapped fps).
+#
+# Every rendered frame advances simulated time by sim_hours / frames, so a
+# 12 hour stream becomes a few minutes of frames. On the simulated clock the
+# run pushes random config updates through the control channel, unplugs and
+# replugs pads, and samples RSS, live pygame Surfaces and frame-time
+# percentiles. A least-squares trend over the samples (after warm-up) must
+# stay under the RSS and p99 thresholds, otherwise the run fails.
+
+DEFAULT_PORT = 29350
+SIM_HOURS = 12.0
+FRAMES = 60_000
+UPDATE_EVERY_S = 60.0
+HOTPLUG_EVERY_S = 15 * 60.0
+SAMPLE_EVERY_S = 15 * 60.0
+WARMUP_FRACTION = 0.1
+MAX_RSS_GROWTH_MB = 16.0
+MAX_P99_GROWTH = 0.25
+PADS = 3
+
+SCALES = (0.75, 1.0, 1.25, 1.5)
+CORNERS = ("ul", "ur", "ll", "lr")
+
+
+def rss_bytes() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    import resource
+
+    # Peak, not current, but still shows a steady climb.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def surface_count() -> int:
+    # Surfaces aren't GC-tracked themselves; count the ones held by tracked
+    # containers/objects, which is where a leak would keep them.
+    seen = set()
+    for o in gc.get_objects():
+        for r in gc.get_referents(o):
+            if isinstance(r, pygame.Surface):
+                seen.add(id(r))
+    return len(seen)
+
+
+def _trend(xs: list, ys: list) -> float:
+    """Least-squares slope of ys over xs (per unit of x)."""
+    if len(xs) < 3:
+        return 0.0
+    slope, _intercept = np.polyfit(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float), 1)
+    return float(slope)
+
+
+def _random_settings(rng: random.Random, skins: list, pads: int) -> dict:
+    n = rng.randint(1, pads)
+    corners = rng.sample(CORNERS, n)
+    return {
+        "scale": rng.choice(SCALES),
+        "margin": rng.randint(0, 60),
+        "transparency": rng.randint(50, 100),
+        "overlays": [
+            {"controller_index": ci, "skin_name": rng.choice(skins), "corner": corners[ci]}
+            for ci in range(n)
+        ],
+    }
+
+
+def run(args) -> int:
+    init_headless()
+    rng = random.Random(args.seed)
+    skins = list_skins() or ["default"]
+
+    driver = FakeJoystickDriver(
+        [FakeJoystick(i, Timeline().random(seed=args.seed + i, rate_hz=8.0)) for i in range(PADS)],
+        manual_clock=True,
+    )
+    initial = _random_settings(rng, skins, PADS)
+
+    dt = args.sim_hours * 3600.0 / args.frames
+    total_s = args.sim_hours * 3600.0
+    client = ControlClient(args.port, window_ms=0)
+    client.reset(initial)
+
+    state = {
+        "next_update": UPDATE_EVERY_S,
+        "next_plug": HOTPLUG_EVERY_S,
+        "next_sample": 0.0,
+        "unplugged": None,
+        "frame_ms": [],
+        "updates": 0,
+        "hotplugs": 0,
+    }
+    samples = []
+
+    def sample(t: float):
+        gc.collect()
+        ft = percentiles_us([int(ms * 1_000_000) for ms in state["frame_ms"]])
+        samples.append({
+            "sim_h": round(t / 3600.0, 3),
+            "rss_mb": round(rss_bytes() / (1024 * 1024), 2),
+            "surfaces": surface_count(),
+            "frame_p50_ms": round(ft.get("p50_us", 0.0) / 1000, 3),
+            "frame_p99_ms": round(ft.get("p99_us", 0.0) / 1000, 3),
+        })
+        state["frame_ms"] = []
+        if args.verbose:
+            print(json.dumps(samples[-1]), file=sys.stderr, flush=True)
+
+    def hook(frame: int, frame_ms: float):
+        t = frame * dt
+        driver.set_time(t)
+        state["frame_ms"].append(frame_ms)
+
+        if t >= state["next_update"]:
+            state["next_update"] += UPDATE_EVERY_S
+            client.submit(_random_settings(rng, skins, PADS))
+            client.flush()
+            state["updates"] += 1
+        client.pump()
+
+        if t >= state["next_plug"]:
+            state["next_plug"] += HOTPLUG_EVERY_S
+            if state["unplugged"] is None:
+                state["unplugged"] = driver.unplug(driver.get_count() - 1)
+            else:
+                driver.plug(timeline=Timeline().random(seed=rng.randrange(1 << 30), rate_hz=8.0))
+                state["unplugged"] = None
+            state["hotplugs"] += 1
+
+        done = t >= total_s
+        if t >= state["next_sample"] or done:
+            state["next_sample"] += SAMPLE_EVERY_S
+            sample(t)
+
+        return not done
+
+    try:
+        overlay.run_overlay_live(initial, udp_port=args.port, joystick_driver=driver, fps=0, frame_hook=hook)
+    finally:
+        client.close()
+
+    # Trends ignore the warm-up (imports, first-draw caches, allocator growth).
+    steady = [s for s in samples if s["sim_h"] >= args.sim_hours * WARMUP_FRACTION]
+    hours = [s["sim_h"] for s in steady]
+    span_h = (hours[-1] - hours[0]) if len(hours) > 1 else 0.0
+
+    rss_growth_mb = _trend(hours, [s["rss_mb"] for s in steady]) * span_h
+    p99s = [s["frame_p99_ms"] for s in steady]
+    p99_base = float(np.median(p99s)) if p99s else 0.0
+    p99_growth = (_trend(hours, p99s) * span_h / p99_base) if p99_base > 0 else 0.0
+    surface_growth = _trend(hours, [s["surfaces"] for s in steady]) * span_h
+
+    failures = []
+    if rss_growth_mb > args.max_rss_growth_mb:
+        failures.append(f"RSS trend +{rss_growth_mb:.1f} MB over {span_h:.1f} h")
+    if p99_growth > args.max_p99_growth:
+        failures.append(f"p99 frame time trend +{p99_growth * 100:.0f}% over {span_h:.1f} h")
+
+    print(json.dumps({
+        "sim_hours": args.sim_hours,
+        "frames": args.frames,
+        "config_updates": state["updates"],
+        "hotplugs": state["hotplugs"],
+        "control": client.stats(),
+        "rss_growth_mb": round(rss_growth_mb, 2),
+        "surface_growth": round(surface_growth, 1),
+        "p99_growth": round(p99_growth, 3),
+        "samples": samples,
+        "failures": failures,
+    }, indent=2))
+    return 1 if failures else 0
+
+
+def add_parser(sub):
+    sp = sub.add_parser("soak", help="compressed-time soak of the engine with leak/drift checks")
+    sp.add_argument("--sim-hours", type=float, default=SIM_HOURS, help="simulated stream length")
+    sp.add_argument("--frames", type=int, default=FRAMES, help="frames to render for it")
+    sp.add_argument("--port", type=int, default=DEFAULT_PORT, help="control UDP port for the soak engine")
+    sp.add_argument("--seed", type=int, default=1)
+    sp.add_argument("--max-rss-growth-mb", type=float, default=MAX_RSS_GROWTH_MB)
+    sp.add_argument("--max-p99-growth", type=float, default=MAX_P99_GROWTH, help="fraction of median p99")
+    sp.add_argument("-v", "--verbose", action="store_true", help="print samples as they are taken")
+    sp.set_defaults(fn=run)
@@ -0,0 +1,151 @@
+"""
+Guided controller calibration.
+
+Examples:
+    python calibrate.py                 # calibrate pad 0
+    python calibrate.py --pad 1 --sweep 8
+    python calibrate.py --list
+    python calibrate.py --forget 030000005e0400008e02000010010000
+    python calibrate.py --learn                 # prompt for every button/axis
+    python calibrate.py --learn --inputs lefttrigger,righttrigger
+
+Profiles are stored per controller GUID (calibration.json in the user data
+directory) and picked up by the overlay on its next layout. --learn writes
+the pad's button/axis mapping to gamecontrollerdb.txt next to it instead,
+used by skins with semantic bindings and by controller_to_mouse.py.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import pygame
+
+from app_funcs.calibration import (
+    REST_S,
+    SWEEP_S,
+    CalibrationStore,
+    capture,
+    default_path,
+    joystick_guid,
+)
+from app_funcs.pad_mapping import AXES, BUTTONS, MappingDB, mapping_line
+
+
+def _summary(profile: dict) -> str:
+    lines = [f"{profile.get('name')}  [{profile.get('guid')}]  {profile.get('captured', '')}"]
+    for i, axis in enumerate(profile.get("axes", [])):
+        lines.append(
+            f"  axis {i}: {axis['kind']:<7} rest {axis['rest']:+.3f}  "
+            f"range {axis['min']:+.3f}..{axis['max']:+.3f}  noise {axis['noise']:.3f}"
+        )
+    return "\n".join(lines)
+
+
+def learn(js, args) -> int:
+    try:
+        from app_funcs.binding_learn import LEARN_ORDER, STEP_S, BindingLearner
+    except ImportError as e:
+        print(f"--learn needs numpy ({e})")
+        return 1
+
+    names = [n.strip() for n in args.inputs.split(",") if n.strip()] if args.inputs else list(LEARN_ORDER)
+    unknown = [n for n in names if n not in BUTTONS and n not in AXES]
+    if unknown:
+        print(f"Not SDL button/axis names: {', '.join(unknown)}")
+        return 1
+
+    print(f"Learning {js.get_name()} ({js.get_numbuttons()} buttons, {js.get_numaxes()} axes, "
+          f"{js.get_numhats()} hats); leave an input alone to skip it")
+    learner = BindingLearner(js, step_s=args.step or STEP_S)
+    learner.baseline()
+    learned = learner.learn(names)
+    if learner.skipped:
+        print(f"Skipped: {', '.join(learner.skipped)}")
+    if not learned:
+        print("Nothing learned.")
+        return 1
+
+    guid = joystick_guid(js)
+    print(mapping_line(guid or "<no guid>", js.get_name(), learned))
+    if not guid:
+        print("Not saved: controller has no GUID")
+        return 1
+    db = MappingDB(args.db)
+    try:
+        db.save(guid, js.get_name(), learned)
+    except OSError as e:
+        print(f"Not saved: {e}")
+        return 1
+    print(f"Saved to {db.path}")
+    return 0
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Per-controller calibration profiles.")
+    p.add_argument("--pad", type=int, default=0, help="joystick index")
+    p.add_argument("--rest", type=float, default=REST_S, help="hands-off seconds")
+    p.add_argument("--sweep", type=float, default=SWEEP_S, help="stick/trigger sweep seconds")
+    p.add_argument("--path", default=None, help=f"profile file (default {default_path()})")
+    p.add_argument("--list", action="store_true", help="print stored profiles")
+    p.add_argument("--forget", metavar="GUID", help="delete a stored profile")
+    p.add_argument("--json", action="store_true", help="print the captured profile as JSON")
+    p.add_argument("--learn", action="store_true", help="learn the button/axis mapping instead")
+    p.add_argument("--inputs", default=None, help="comma-separated SDL names to learn (default: all)")
+    p.add_argument("--step", type=float, default=None, help="seconds to wait for each input")
+    p.add_argument("--db", default=None, help="mapping file for --learn (default gamecontrollerdb.txt)")
+    args = p.parse_args()
+
+    store = CalibrationStore(args.path)
+
+    if args.list:
+        profiles = store.load()
+        if not profiles:
+            print(f"No profiles in {store.path}")
+        for profile in profiles.values():
+            print(_summary(profile))
+        return 0
+
+    if args.forget:
+        if not store.forget(args.forget):
+            print(f"No profile for {args.forget}")
+            return 1
+        print(f"Removed {args.forget}")
+        return 0
+
+    if os.environ.get("RETRO_OVERLAY_FAKE_PADS"):
+        from app_funcs.fake_joystick import install_from_env
+
+        install_from_env()
+
+    pygame.init()
+    pygame.joystick.init()
+    if pygame.joystick.get_count() <= args.pad:
+        print(f"No controller at index {args.pad}.")
+        return 1
+
+    js = pygame.joystick.Joystick(args.pad)
+    js.init()
+
+    if args.learn:
+        return learn(js, args)
+
+    print(f"Calibrating {js.get_name()} ({js.get_numaxes()} axes)")
+
+    profile = capture(js, rest_s=args.rest, sweep_s=args.sweep)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    print(_summary(profile))
+
+    try:
+        store.save(profile)
+    except (OSError, ValueError) as e:
+        print(f"Not saved: {e}")
+        return 1
+    print(f"Saved to {store.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
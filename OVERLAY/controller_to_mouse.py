@@ -1,8 +1,19 @@
 import ctypes
 import math
+import os
 import time
 import pygame
 
+from app_funcs.pad_mapping import MappedInput, MappingDB, PadBindings, binding_text, parse_mapping
+
+try:
+    import numpy as np
+
+    from app_funcs.binding_learn import BindingLearner
+except ImportError:
+    # No numpy: unknown pads keep the XInput trigger axes.
+    np = None
+
 # =========================
 # CONFIG
 # =========================
@@ -10,6 +21,8 @@ import pygame
 DEADZONE = 0.10
 SMOOTHING = 0.22
 CURVE = 1.6
+# Deadzone on the stick's magnitude instead of per axis (no sticky diagonals).
+RADIAL_DEADZONE = False
 
 BASE_SPEED = 1800.0
 TARGET_HZ = 500
@@ -19,17 +32,24 @@ PRECISION_MULT = 0.35
 TRIGGER_THRESHOLD = 0.55
 CLICK_DEBOUNCE = 0.05
 
-# Trigger auto-detect tuning
-DETECT_IDLE_SEC = 0.35
-DETECT_STEP_TIMEOUT_SEC = 4.0
-DETECT_DELTA = 0.35
+# Inputs used, by SDL GameController name (resolved per pad, app_funcs/pad_mapping.py).
+BINDINGS = {
+    "LX": "leftx", "LY": "lefty",
+    "LT": "lefttrigger", "RT": "righttrigger",
+    "LB": "leftshoulder", "RB": "rightshoulder", "L3": "leftstick",
+}
+
+# Trigger learn step for pads without a known mapping
+LEARN_STEP_SEC = 4.0
 
 
 # =========================
 # Windows SendInput
 # =========================
 
-user32 = ctypes.windll.user32
+# None off Windows: clicks and moves become no-ops, so the loop can still
+# be driven by a scripted pad (RETRO_OVERLAY_FAKE_PADS) for testing.
+user32 = ctypes.windll.user32 if hasattr(ctypes, "windll") else None
 
 INPUT_MOUSE = 0
 MOUSEEVENTF_MOVE = 0x0001
@@ -58,7 +78,7 @@ class INPUT(ctypes.Structure):
 
 
 def send_mouse_move(dx: int, dy: int) -> None:
-    if dx == 0 and dy == 0:
+    if (dx == 0 and dy == 0) or user32 is None:
         return
     inp = INPUT(
         type=INPUT_MOUSE,
@@ -68,6 +88,8 @@ def send_mouse_move(dx: int, dy: int) -> None:
 
 
 def send_mouse_flag(flag: int) -> None:
+    if user32 is None:
+        return
     inp = INPUT(
         type=INPUT_MOUSE,
         mi=MOUSEINPUT(0, 0, 0, flag, 0, None),
@@ -102,6 +124,15 @@ def apply_curve(v: float, curve: float) -> float:
     return math.copysign(abs(v) ** curve, v)
 
 
+def apply_radial_deadzone(x: float, y: float, dz: float, curve: float) -> tuple[float, float]:
+    """Deadzone and curve on the stick's magnitude, capped at 1 (square gates reach sqrt(2))."""
+    m = math.hypot(x, y)
+    if m <= dz:
+        return 0.0, 0.0
+    k = apply_curve((min(m, 1.0) - dz) / (1.0 - dz), curve) / m
+    return x * k, y * k
+
+
 def ema(prev: float, new: float, alpha: float) -> float:
     return prev + (new - prev) * alpha
 
@@ -113,63 +144,16 @@ def norm_trigger(raw: float) -> float:
     return max(0.0, min(1.0, raw))
 
 
-def safe_axis(joy: pygame.joystick.Joystick, idx: int) -> float:
-    return joy.get_axis(idx) if joy.get_numaxes() > idx else 0.0
-
-
-def safe_button(joy: pygame.joystick.Joystick, idx: int) -> int:
-    return joy.get_button(idx) if joy.get_numbuttons() > idx else 0
-
-
-def sample_axis_baseline(joy: pygame.joystick.Joystick, seconds: float) -> list[float]:
-    n_axes = joy.get_numaxes()
-    sums = [0.0] * n_axes
-    n = 0
-    t0 = time.perf_counter()
-    while time.perf_counter() - t0 < seconds:
-        pygame.event.pump()
-        for i in range(n_axes):
-            sums[i] += joy.get_axis(i)
-        n += 1
-        time.sleep(0.005)
-    if n == 0:
-        return [0.0] * n_axes
-    return [s / n for s in sums]
-
-
-def detect_trigger_axis(joy: pygame.joystick.Joystick, baseline: list[float], banned: set[int], step_name: str) -> int | None:
-    print(f"\nTrigger detect: {step_name}")
-    print("  Keep sticks still. Pull/release the trigger once...")
-
-    n_axes = joy.get_numaxes()
-    t0 = time.perf_counter()
-
-    best_i = None
-    best_delta = 0.0
-
-    while time.perf_counter() - t0 < DETECT_STEP_TIMEOUT_SEC:
-        pygame.event.pump()
-        for i in range(n_axes):
-            if i in banned:
-                continue
-            d = abs(joy.get_axis(i) - baseline[i])
-            if d > best_delta:
-                best_delta = d
-                best_i = i
-        if best_delta >= DETECT_DELTA:
-            print(f"  Detected axis {best_i} (delta {best_delta:.2f})")
-            return best_i
-        time.sleep(0.01)
-
-    print("  Detect timed out (no strong axis movement).")
-    return None
-
-
 # =========================
 # Main
 # =========================
 
 def main() -> None:
+    if os.environ.get("RETRO_OVERLAY_FAKE_PADS"):
+        from app_funcs.fake_joystick import install_from_env
+
+        install_from_env()
+
     pygame.init()
     pygame.joystick.init()
 
@@ -179,37 +163,28 @@ def main() -> None:
     joy = pygame.joystick.Joystick(0)
     joy.init()
 
-    
-    AX_LX = 0
-    AX_LY = 1
-
-    BTN_LB = 4
-    BTN_RB = 5
-    BTN_L3 = 8
-
-    # --- Trigger axis auto-detect ---
-    # Ban left stick axes so triggers can never be mistaken for stick movement.
-    banned = {AX_LX, AX_LY}
-
-    print("Calibrating (hands off sticks/triggers)...")
-    baseline = sample_axis_baseline(joy, DETECT_IDLE_SEC)
-
-    ax_lt = detect_trigger_axis(joy, baseline, banned=banned, step_name="LT -> Right Click")
-    if ax_lt is not None:
-        banned.add(ax_lt)
-
-    ax_rt = detect_trigger_axis(joy, baseline, banned=banned, step_name="RT -> Left Click")
-    if ax_rt is not None:
-        banned.add(ax_rt)
-
-    # If detect fails, fall back to common Xbox mapping (still protected from using 0/1)
-    if ax_lt is None:
-        ax_lt = 2 if joy.get_numaxes() > 2 and 2 not in banned else None
-    if ax_rt is None:
-        ax_rt = 5 if joy.get_numaxes() > 5 and 5 not in banned else None
-
-    print(f"\nUsing trigger axes: LT={ax_lt} RT={ax_rt}")
-    print("Only reading: LS(0/1), LT axis, RT axis, LB(4), RB(5), L3(8).")
+    # --- Bindings ---
+    # A user or SDL mapping is used as is. Unknown pads only need their
+    # triggers learned; `python calibrate.py --learn` saves a full mapping.
+    source, mapping = MappingDB().resolve(joy)
+    if source == "xinput" and np is not None:
+        print("Unknown controller: learning the triggers.")
+        learner = BindingLearner(joy, step_s=LEARN_STEP_SEC)
+        # The stick and buttons in use can never be mistaken for a trigger.
+        for name in BINDINGS.values():
+            if name in mapping and not name.endswith("trigger"):
+                learner.reserve(name, binding_text(mapping[name]))
+        learner.baseline()
+        learned = learner.learn(("lefttrigger", "righttrigger"))
+        mapping = {**mapping, **parse_mapping(learned)}
+        source = "learned" if learned else source
+
+    pad = PadBindings(BINDINGS, mapping, source)
+    inp = MappedInput(joy, pad)
+    used = {**pad.btn_map, **pad.axis_map, **pad.buttons, **pad.axes}
+    print(f"\nUsing {source} mapping: " + ", ".join(
+        f"{name}={binding_text(mapping[BINDINGS[name]])}" for name in BINDINGS if name in used
+    ))
     print("All other inputs ignored.\n")
 
     # Smoothed cursor state
@@ -243,7 +218,7 @@ def main() -> None:
                 dt = 1.0 / TARGET_HZ
 
             # ----- L3 drag lock toggle -----
-            l3 = safe_button(joy, BTN_L3)
+            l3 = inp.button("L3")
             if l3 and not l3_prev:
                 drag_lock = not drag_lock
                 if drag_lock and not left_down:
@@ -254,34 +229,40 @@ def main() -> None:
                     left_down = False
             l3_prev = l3
 
-            # ----- Left stick -> cursor move (ONLY axes 0 and 1) -----
-            raw_x = safe_axis(joy, AX_LX)
-            raw_y = safe_axis(joy, AX_LY)
-
-            x = apply_curve(apply_deadzone(raw_x, DEADZONE), CURVE)
-            y = apply_curve(apply_deadzone(raw_y, DEADZONE), CURVE)
+            # ----- Left stick -> cursor move -----
+            raw_x = inp.axis("LX")
+            raw_y = inp.axis("LY")
+            raw_lt = inp.axis("LT")
+            raw_rt = inp.axis("RT")
+
+            # One pad a tick: the scalar helpers. AxisConditioner's batch
+            # only pays off across many pads (bench axes, "mouse_tick").
+            if RADIAL_DEADZONE:
+                x, y = apply_radial_deadzone(raw_x, raw_y, DEADZONE, CURVE)
+            else:
+                x = apply_curve(apply_deadzone(raw_x, DEADZONE), CURVE)
+                y = apply_curve(apply_deadzone(raw_y, DEADZONE), CURVE)
+            lt = norm_trigger(raw_lt)
+            rt = norm_trigger(raw_rt)
 
             sx = ema(sx, x, SMOOTHING)
             sy = ema(sy, y, SMOOTHING)
 
             speed = BASE_SPEED
-            if safe_button(joy, BTN_LB):
+            if inp.button("LB"):
                 speed *= PRECISION_MULT
 
             dx = int(round(sx * speed * dt))
             dy = int(round(sy * speed * dt))
             send_mouse_move(dx, dy)
 
-            # ----- RB -> middle click (ONLY button 5) -----
-            rb = bool(safe_button(joy, BTN_RB))
+            # ----- RB -> middle click -----
+            rb = inp.button("RB")
             if rb != middle_down:
                 set_middle(rb)
                 middle_down = rb
 
-            # ----- Triggers -> clicks (ONLY detected axes) -----
-            lt = norm_trigger(safe_axis(joy, ax_lt)) if ax_lt is not None else 0.0
-            rt = norm_trigger(safe_axis(joy, ax_rt)) if ax_rt is not None else 0.0
-
+            # ----- Triggers -> clicks (read above) -----
             want_left = rt >= TRIGGER_THRESHOLD   # RT -> Left Click
             want_right = lt >= TRIGGER_THRESHOLD  # LT -> Right Click
 
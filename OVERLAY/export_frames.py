@@ -0,0 +1,231 @@
+"""
+Render a recorded input log through a skin, offline and headless.
+
+Examples:
+    python export_frames.py session.ril --out frames/ --skin default --fps 60
+    python export_frames.py session.ril --raw pad0.rgba --scale 2 --start 725 --end 845
+    ffmpeg -f rawvideo -pix_fmt rgba -s 840x520 -r 60 -i pad0.rgba -c:v prores_ks -pix_fmt yuva444p10le pad0.mov
+
+The timeline is split into chunks of --chunk frames, rendered by --workers
+processes and written back in order. PNGs keep the transparent background;
+raw output is straight RGBA, one frame after another.
+
+Frames are drawn through the live overlay's input stack (overlay.open_pad,
+overlay.sample_inputs): the skin's bindings resolved for the pad, its calibration
+profile and the "axes" conditioning. --settings takes the overlay settings
+JSON the session ran with ("axes", "calibration"); --guid names the recorded
+pad, which the log doesn't store, for its mapping and calibration profile.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import multiprocessing as mp
+
+import numpy as np
+import pygame
+
+import overlay
+from app_funcs.axis_conditioning import AxisConditioner
+from app_funcs.input_log import InputLogReader, FLAG_DISCONNECT
+from app_funcs.remote_input import RemoteJoystick
+
+DEFAULT_FPS = 60
+DEFAULT_CHUNK = 120
+# Chunks queued or rendered but not yet written, per worker.
+CHUNKS_AHEAD = 2
+
+
+# =========================
+# Worker side
+# =========================
+
+_w = {}
+
+
+def _init_worker(log_path: str, skin_name: str, scale: float, controller: int, background, settings: dict, guid):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    skin = overlay.load_skin(skin_name)
+    w = max(1, int(int(getattr(skin, "design_width", 400)) * scale))
+    h = max(1, int(int(getattr(skin, "design_height", 300)) * scale))
+
+    js = RemoteJoystick(controller)
+    js.guid = guid
+    pad, profile = overlay.open_pad(skin, js, overlay.open_calibration(settings.get("calibration", True)))
+    conditioner = AxisConditioner.from_settings(settings.get("axes", True))
+    item = {"skin": skin, "joystick": js, "pad": pad, "calibration": profile}
+
+    _w.update(
+        reader=InputLogReader(log_path),
+        skin=skin,
+        scale=scale,
+        controller=controller,
+        background=background,
+        surf=overlay.make_overlay_surface(w, h),
+        out=pygame.Surface((w, h), pygame.SRCALPHA),
+        js=js,
+        item=item,
+        conditioner=conditioner,
+        axis_layout=overlay.axis_layout_for(conditioner, [item]),
+    )
+
+
+def _frame_records(reader: InputLogReader, controller: int, times: np.ndarray):
+    """Latest record for `controller` at each frame time (None = no pad)."""
+    # Two intervals back always reaches the pad's latest keyframe (see state_at).
+    window = reader.range(int(times[0]) - 2 * reader.keyframe_us, int(times[-1]) + 1)
+    recs = window[window["controller"] == controller]
+    idx = np.searchsorted(recs["t_us"], times, side="right") - 1
+    return [recs[i] if i >= 0 and not recs[i]["flags"] & FLAG_DISCONNECT else None for i in idx]
+
+
+def _render_chunk(task):
+    first, times, png_dir = task
+    skin = _w["skin"]
+    surf = _w["surf"]
+    out = _w["out"]
+    js = _w["js"]
+    item = _w["item"]
+
+    raw = []
+    for n, rec in enumerate(_frame_records(_w["reader"], _w["controller"], times)):
+        if rec is not None:
+            js.buttons = int(rec["buttons"])
+            js.hat = (int(rec["hat_x"]), int(rec["hat_y"]))
+            js.axes = [int(v) for v in rec["axes"]]
+        item["joystick"] = js if rec is not None else None
+
+        surf.fill(overlay.COLORKEY)
+        (inp,), skin_dz, skin_trigger = overlay.sample_inputs([item], _w["axis_layout"], _w["conditioner"])
+        skin.draw(surf, inp, skin_dz, skin_trigger, _w["scale"])
+
+        out.fill(_w["background"] or (0, 0, 0, 0))
+        out.blit(surf, (0, 0))
+
+        if png_dir:
+            pygame.image.save(out, os.path.join(png_dir, f"frame_{first + n:06d}.png"))
+        else:
+            raw.append(pygame.image.tobytes(out, "RGBA"))
+
+    return first, len(times), b"".join(raw)
+
+
+# =========================
+# Main
+# =========================
+
+def _parse_background(raw: str):
+    if not raw:
+        return None
+    parts = [int(p) for p in raw.split(",")]
+    return tuple(parts + [255] * (4 - len(parts)))
+
+
+def _ordered(pool, tasks: list, ahead: int):
+    """Chunk results in task order, with at most `ahead` chunks in flight.
+
+    Raw output is stitched as it arrives. imap would render the whole range
+    into memory whenever the sink is slower than the workers.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(_render_chunk, (task,)))
+        if len(pending) >= ahead:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="export_frames", description="Render a recorded input log to frames.")
+    p.add_argument("log", help="input log written by the overlay (input_record)")
+    p.add_argument("--controller", type=int, default=0)
+    p.add_argument("--skin", default="default")
+    p.add_argument("--scale", type=float, default=1.0)
+    p.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    p.add_argument("--start", type=float, default=0.0, help="seconds from the start of the log")
+    p.add_argument("--end", type=float, default=None, help="seconds from the start of the log")
+    p.add_argument("--background", default="", help="R,G,B[,A] instead of transparent")
+    p.add_argument("--settings", default="", help="overlay settings JSON (axes, calibration)")
+    p.add_argument("--guid", default=None, help="GUID of the recorded pad (mapping, calibration profile)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="frames per work item")
+
+    out = p.add_mutually_exclusive_group(required=True)
+    out.add_argument("--out", help="directory for a frame_NNNNNN.png sequence")
+    out.add_argument("--raw", help="file for raw RGBA frames, '-' for stdout")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    settings = {}
+    if args.settings:
+        try:
+            with open(args.settings, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"{args.settings}: {e}")
+        if not isinstance(settings, dict):
+            raise SystemExit(f"{args.settings}: expected a JSON object")
+
+    with InputLogReader(args.log) as reader:
+        end = reader.duration_s if args.end is None else min(args.end, reader.duration_s)
+        t0 = reader.t_from_seconds(args.start)
+    if end <= args.start:
+        raise SystemExit("nothing to export in that range")
+
+    period_us = 1_000_000 / args.fps
+    count = int((end - args.start) * args.fps)
+    times = (t0 + np.arange(count) * period_us).astype(np.uint64)
+    tasks = [
+        (k, times[k:k + args.chunk], args.out)
+        for k in range(0, count, args.chunk)
+    ]
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        sink = None
+    elif args.raw == "-":
+        sink = sys.stdout.buffer
+    else:
+        sink = open(args.raw, "wb")
+
+    init = (
+        args.log, args.skin, args.scale, args.controller, _parse_background(args.background),
+        settings, args.guid,
+    )
+    t_start = time.perf_counter()
+    done = 0
+    workers = max(1, args.workers)
+    try:
+        with mp.Pool(workers, initializer=_init_worker, initargs=init) as pool:
+            for _first, n, data in _ordered(pool, tasks, workers * CHUNKS_AHEAD):
+                if sink is not None:
+                    sink.write(data)
+                done += n
+    finally:
+        if sink is not None and sink is not sys.stdout.buffer:
+            sink.close()
+
+    elapsed = time.perf_counter() - t_start
+    print(
+        f"{done} frames in {elapsed:.2f}s ({done / max(elapsed, 1e-9):.1f} fps, "
+        f"{done / args.fps / max(elapsed, 1e-9):.1f}x real time)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
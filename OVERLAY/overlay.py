@@ -1,18 +1,40 @@
 import os
 import sys
 import json
-import socket
+import time
 import threading
 import importlib
 
 import pygame
-import win32gui
-import win32con
-import win32api
+
+try:
+    import win32gui
+    import win32con
+    import win32api
+except ImportError:
+    # Headless tools (frame export, benchmarks) only need the skin/draw path.
+    win32gui = win32con = win32api = None
+
+from app_funcs.control_server import ControlServer
+from app_funcs.protocol import REMOVED, now_us
+from app_funcs.input_feed import InputFeed, DEFAULT_TARGET, DEFAULT_RATE_HZ
+from app_funcs.input_log import InputRecorder, DEFAULT_KEYFRAME_S
+from app_funcs.alloc_tracker import AllocTracker
+from app_funcs.trace import TRACER, now as trace_now
+from app_funcs.perf_hud import PerfHud, hud_corner
+from app_funcs.latency_probe import LatencyProbe, DEFAULT_WINDOW
+from app_funcs.frame_cache import FrameCache, DEFAULT_MAX_BYTES
+from app_funcs.scene import Scene
+from app_funcs.axis_conditioning import AxisConditioner, AxisLayout
+from app_funcs.calibration import CalibratedInput, CalibrationStore, joystick_guid
+from app_funcs.skin_format import find_data_skin, load_data_skin
+from app_funcs.pad_mapping import MappedInput, MappingDB, PadBindings, default_maps
 
 os.environ["SDL_JOYSTICK_ALLOW_BACKGROUND_EVENTS"] = "1"
 
 FPS = 120
+STANDBY_FPS = 10
+STATUS_EVERY_FRAMES = 10
 DEADZONE = 0.12
 MAX_CONTROLLERS = 4
 COLORKEY = (0, 0, 0)
@@ -71,6 +93,12 @@ class InputState:
         except pygame.error:
             return 0.0
 
+    def stick(self, name: str, dz) -> float:
+        return dz(self.axis(name))
+
+    def trigger(self, name: str, norm_trigger) -> float:
+        return norm_trigger(self.axis(name))
+
     def hat(self, index: int = 0) -> tuple[int, int]:
         if not self.joystick or self.joystick.get_numhats() <= index:
             return (0, 0)
@@ -80,10 +108,73 @@ class InputState:
             return (0, 0)
 
 
-def setup_window(width, height, x, y, transparency_percent):
-    screen = pygame.display.set_mode((width, height), pygame.NOFRAME)
+# -----------------------
+# Input stack
+# -----------------------
+# What a skin draws from, shared by the live engine and offline export: the
+# pad's compiled bindings and calibration profile per overlay, then one
+# AxisLayout that reads, calibrates and conditions every overlay's axes in a
+# batch - or, without one, CalibratedInput per overlay and the scalar dz().
+# Overlays are the engine's layout items: dicts with "skin", "joystick",
+# "pad" and "calibration".
+
+def open_calibration(cfg):
+    """CalibrationStore for the "calibration" setting; None when it's false."""
+    if cfg is False:
+        return None
+    opts = cfg if isinstance(cfg, dict) else {}
+    return CalibrationStore(opts.get("path"))
+
+
+def open_pad(skin, js, calibration=None, mapping_db=None):
+    """(pad, profile) for drawing `skin` from `js`: PadBindings or None, calibration profile or None."""
+    profile = calibration.get(joystick_guid(js)) if calibration is not None else None
+    pad = None
+    if getattr(skin, "bindings", None):
+        source, mapping = (mapping_db or MappingDB()).resolve(js)
+        pad = PadBindings(skin.bindings, mapping, source)
+    return pad, profile
+
+
+def axis_layout_for(conditioner, items):
+    """AxisLayout over the overlays, or None on the scalar path (no conditioner)."""
+    if conditioner is None:
+        return None
+    return AxisLayout(
+        conditioner,
+        [item["skin"] for item in items],
+        [item["calibration"] for item in items],
+        [item["skin"].axis_map if item["pad"] is None else item["pad"].axis_map for item in items],
+    )
+
+
+def sample_inputs(items, axis_layout, conditioner):
+    """(inputs, dz, norm_trigger) for drawing each overlay this frame."""
+    inputs = [
+        InputState(item["joystick"], item["skin"].btn_map, item["skin"].axis_map)
+        if item["pad"] is None else MappedInput(item["joystick"], item["pad"])
+        for item in items
+    ]
+    if axis_layout is None:
+        # Scalar path (no numpy, or "axes": false): calibration per axis read.
+        inputs = [
+            CalibratedInput(inp, item["calibration"]) if item["calibration"] and inp.joystick else inp
+            for item, inp in zip(items, inputs)
+        ]
+        return inputs, dz, norm_trigger
+    # Every axis of every pad read and conditioned in one batch.
+    return axis_layout.sample(inputs), conditioner.dz, conditioner.norm_trigger
+
+
+def setup_window(width, height, x, y, transparency_percent, visible=True):
+    flags = pygame.NOFRAME | (pygame.SHOWN if visible else pygame.HIDDEN)
+    screen = pygame.display.set_mode((width, height), flags)
     pygame.display.set_caption("Retro Overlay")
 
+    if win32gui is None:
+        # Non-Windows / headless: plain window, no layered click-through styling.
+        return screen, None
+
     hwnd = pygame.display.get_wm_info()["window"]
 
     ex = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
@@ -95,12 +186,23 @@ def setup_window(width, height, x, y, transparency_percent):
     win32gui.SetWindowPos(
         hwnd, win32con.HWND_TOPMOST,
         x, y, width, height,
-        win32con.SWP_SHOWWINDOW,
+        win32con.SWP_SHOWWINDOW if visible else win32con.SWP_HIDEWINDOW,
     )
 
     return screen, hwnd
 
 
+def set_window_visible(hwnd, visible):
+    if visible:
+        win32gui.ShowWindow(hwnd, win32con.SW_SHOWNOACTIVATE)
+        win32gui.SetWindowPos(
+            hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0,
+            win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE,
+        )
+    else:
+        win32gui.ShowWindow(hwnd, win32con.SW_HIDE)
+
+
 def set_transparency(hwnd, transparency_percent):
     alpha = int(255 * (clamp(transparency_percent, 0, 100) / 100.0))
     win32gui.SetLayeredWindowAttributes(
@@ -147,6 +249,9 @@ def get_friendly_monitor_name(display_device):
 
 
 def list_active_monitors():
+    if win32api is None:
+        return _list_pygame_monitors()
+
     monitors = []
     for hmon, hdc, rect in win32api.EnumDisplayMonitors(None, None):
         info = win32api.GetMonitorInfo(hmon)
@@ -161,9 +266,51 @@ def list_active_monitors():
     return monitors
 
 
+def _list_pygame_monitors():
+    if not pygame.display.get_init():
+        pygame.display.init()
+    sizes = list(pygame.display.get_desktop_sizes()) or [(1280, 720)]
+
+    monitors = []
+    left = 0
+    for i, (w, h) in enumerate(sizes):
+        monitors.append(
+            {"monitor_rect": (left, 0, left + w, h), "primary": i == 0, "device": f"display{i}", "friendly": ""}
+        )
+        left += w
+    return monitors
+
+
 def load_skin(skin_name):
-    skin_mod = importlib.import_module(f"skins.{skin_name}")
-    return skin_mod.build()
+    # Declarative skins (skins/<name>.json / .toml) are parsed, never imported.
+    path = find_data_skin(skin_name)
+    if path is not None:
+        skin = load_data_skin(path)
+    else:
+        skin = importlib.import_module(f"skins.{skin_name}").build()
+    bindings = getattr(skin, "bindings", None)
+    if bindings:
+        # Semantic bindings: XInput indices until the engine resolves a pad.
+        skin.btn_map, skin.axis_map = default_maps(bindings)
+    return skin
+
+
+def warm_skins():
+    # Import every skin and draw it once so a standby overlay pays
+    # module import and first-draw costs before the user hits Start.
+    from app_funcs.discovery import list_skins
+
+    for skin_name in list_skins():
+        try:
+            skin = load_skin(skin_name)
+            surf = make_overlay_surface(
+                int(getattr(skin, "design_width", 400)),
+                int(getattr(skin, "design_height", 300)),
+            )
+            inp = InputState(None, skin.btn_map, skin.axis_map)
+            skin.draw(surf, inp, dz, norm_trigger, 1.0)
+        except Exception:
+            continue
 
 
 def make_overlay_surface(w, h):
@@ -172,9 +319,9 @@ def make_overlay_surface(w, h):
     return surf
 
 
-def get_controller(ci: int):
+def get_controller(ci: int, driver=None):
     try:
-        js = pygame.joystick.Joystick(ci)
+        js = (driver or pygame.joystick).Joystick(ci)
         js.init()
         return js
     except pygame.error:
@@ -185,62 +332,157 @@ def get_controller(ci: int):
 # Live update channel
 # -----------------------
 class LiveConfig:
-    def __init__(self, initial: dict):
+    def __init__(self, initial: dict, visible: bool = True):
         self.lock = threading.Lock()
         self.data = initial
         self.dirty_window = True
         self.dirty_layout = True
         self.stop = False
-
-    def apply_update(self, patch: dict):
+        self.visible = visible
+        self.dirty_visible = False
+        # Set by the control thread so a parked loop wakes at once.
+        self.wake = threading.Event()
+        # (addr, session, seq) of binary updates waiting to be acked
+        self.pending_acks = []
+        # Published by the engine for the control server's queries.
+        self.stats = {}
+        self.controllers = []
+        # Diagnostics requested over the control channel ({"frames", "top"})
+        # and the last finished allocation report.
+        self.alloc_request = None
+        self.alloc_report = None
+
+    def apply_update(self, patch: dict, ack=None):
         with self.lock:
+            if ack is not None:
+                self.pending_acks.append(ack)
+
             if patch.get("_stop") is True:
                 self.stop = True
+                self.wake.set()
                 return
 
-            for k, v in patch.items():
-                self.data[k] = v
-
-            if "monitor_index" in patch:
+            removed = patch.get(REMOVED)
+            changed = {k for k, v in patch.items() if k != REMOVED and (k not in self.data or self.data[k] != v)}
+            for k in changed:
+                self.data[k] = patch[k]
+            if isinstance(removed, list):
+                for k in removed:
+                    if isinstance(k, str) and k in self.data and k not in patch:
+                        del self.data[k]
+                        changed.add(k)
+
+            if "monitor_index" in changed:
                 self.dirty_window = True
 
-            if any(k in patch for k in ["scale", "margin", "overlays"]):
+            if any(k in changed for k in ["scale", "margin", "overlays"]):
                 self.dirty_layout = True
 
+    def set_visible(self, visible: bool):
+        with self.lock:
+            if visible != self.visible:
+                self.visible = visible
+                self.dirty_visible = True
+        self.wake.set()
+
     def snapshot(self) -> dict:
         with self.lock:
             return json.loads(json.dumps(self.data))
 
-
-def start_udp_listener(live: LiveConfig, port: int):
-    def run():
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind(("127.0.0.1", port))
-
-        while True:
-            data, _addr = sock.recvfrom(65535)
-            try:
-                msg = json.loads(data.decode("utf-8", errors="ignore"))
-            except Exception:
-                continue
-            if not isinstance(msg, dict):
-                continue
-
-            if msg.get("type") == "update":
-                patch = msg.get("settings", {})
-                if isinstance(patch, dict):
-                    live.apply_update(patch)
-
-    t = threading.Thread(target=run, daemon=True)
-    t.start()
+    def snapshot_with_acks(self) -> tuple[dict, list]:
+        # Taken together so every acked update is part of the returned state.
+        with self.lock:
+            acks, self.pending_acks = self.pending_acks, []
+            return json.loads(json.dumps(self.data)), acks
 
 
 # -----------------------
 # Overlay engine
 # -----------------------
-def run_overlay_live(initial_settings: dict, udp_port: int = 29301):
+def run_overlay_live(
+    initial_settings: dict,
+    udp_port: int = 29301,
+    standby: bool = False,
+    shm_name: str | None = None,
+    stream_port: int | None = None,
+    stream_path: str | None = None,
+    remote_port: int | None = None,
+    remote_jitter_ms: float | None = None,
+    joystick_driver=None,
+    fps: int | None = None,
+    frame_hook=None,
+):
+    """
+    Runs the overlay window until stopped.
+
+    With standby=True the window is created hidden and every skin is warmed up
+    front; "show"/"hide" messages then toggle visibility instead of the App
+    spawning and killing a fresh process for every Start/Stop.
+
+    With shm_name the settings record is also polled from the App's shared
+    memory block each frame, and fps / frame time / controllers are written
+    back to it.
+
+    The control server always listens on UDP udp_port; stream_port /
+    stream_path additionally expose it as a local TCP port / Unix socket.
+
+    Setting "input_feed" to {"target": "host:port" | "unix:/path", "rate_hz": n}
+    publishes every connected pad's state for other local tools; a falsy value
+    turns it off.
+
+    Setting "input_record" to {"path": ..., "keyframe_s": n} (or just a path)
+    appends every pad's displayed state to a binary log (app_funcs/input_log.py).
+
+    With remote_port the overlay renders from input frames streamed by a
+    sender on another PC (app_funcs/remote_input.py) instead of local pads;
+    frames are held remote_jitter_ms in a jitter buffer. "remote" in the
+    stats has the delay they spend there and, once the clocks are synced,
+    the sender-sample -> apply latency; latency_probe then reports the
+    remote pads' sample -> present across both PCs.
+
+    joystick_driver replaces pygame.joystick as the source of pads (anything
+    with get_count()/Joystick(i), e.g. app_funcs.fake_joystick); without one,
+    RETRO_OVERLAY_FAKE_PADS can select a scripted driver.
+
+    fps overrides the visible frame cap (0 = uncapped). frame_hook(frame,
+    frame_ms) runs after every presented frame; returning False stops the
+    overlay. Both exist for headless benchmarks and soak runs.
+
+    An "alloc_start" control command arms a tracemalloc tracker for the next
+    N visible frames; "query_alloc" returns its report. "trace_start" /
+    "trace_dump" record frame phases into app_funcs.trace.TRACER.
+
+    Setting "hud" to true or a corner ("ul".."lr") draws the performance HUD
+    (app_funcs/perf_hud.py): fps, frame-time graph, per-overlay draw cost,
+    input-sample age and idle state.
+
+    Setting "latency_probe" to true (or {"window": n}) times every pad state
+    change from the frame that sampled it to the present that showed it
+    (app_funcs/latency_probe.py); the distribution is under "latency" in the
+    stats. Toggling it off and on starts a fresh measurement.
+
+    Each overlay of a hand-drawn skin (no scene) keeps an LRU of drawn frames
+    keyed by its quantized input state (app_funcs/frame_cache.py) and blits a
+    hit instead of calling skin.draw. Setting "frame_cache" to false turns it
+    off, {"max_mb": n} sizes it; a cache is dropped when its overlay's skin or
+    the scale changes.
+
+    Skins that declare a scene (skin.scene, skins/shapes/nodes.py) render
+    retained: only nodes whose bound inputs changed are repainted, and only
+    their rects are presented. Other skins are drawn whole every frame
+    (through the frame cache); the window is fully redrawn after a relayout.
+
+    Skins that declare semantic bindings (skin.bindings, app_funcs/
+    pad_mapping.py) are resolved against each pad's mapping at layout time;
+    the source used per controller is under "mapping" in the stats.
+    """
+    if joystick_driver is None:
+        from app_funcs.fake_joystick import driver_from_env
+
+        joystick_driver = driver_from_env() or pygame.joystick
+
     pygame.init()
-    pygame.joystick.init()
+    joystick_driver.init()
 
     settings = {
         "monitor_index": 0,
@@ -252,8 +494,35 @@ def run_overlay_live(initial_settings: dict, udp_port: int = 29301):
     if isinstance(initial_settings, dict):
         settings.update(initial_settings)
 
-    live = LiveConfig(settings)
-    start_udp_listener(live, udp_port)
+    live = LiveConfig(settings, visible=not standby)
+    server = ControlServer(live, udp_port, stream_port=stream_port, stream_path=stream_path)
+    server.start()
+
+    shm = None
+    shm_gen = 0
+    shm_applied_us = 0
+    if shm_name:
+        from app_funcs.shm_channel import SharedChannel
+
+        try:
+            shm = SharedChannel.attach(shm_name)
+        except Exception:
+            shm = None
+
+    def open_controller(ci):
+        return get_controller(ci, joystick_driver)
+
+    remote = None
+    if remote_port:
+        from app_funcs.remote_input import RemoteInputReceiver, DEFAULT_JITTER_MS
+
+        remote = RemoteInputReceiver(
+            remote_port, jitter_ms=DEFAULT_JITTER_MS if remote_jitter_ms is None else remote_jitter_ms
+        )
+        open_controller = remote.joystick
+
+    if standby:
+        warm_skins()
 
     screen = None
     hwnd = None
@@ -261,6 +530,133 @@ def run_overlay_live(initial_settings: dict, udp_port: int = 29301):
     mon_left = mon_top = 0
 
     loaded = []
+    tracker = None
+
+    feed = None
+    feed_cfg = None
+    recorder = None
+    record_cfg = None
+    sampled_joysticks = []
+
+    hud = None
+    hud_cfg = None
+    probe = None
+    probe_cfg = None
+    cache_cfg = None
+    cache_bytes = DEFAULT_MAX_BYTES
+    frame_caches = {}
+    axes_cfg = None
+    conditioner = None
+    axis_layout = None
+    calibration_cfg = None
+    calibration = None
+    mapping_db = MappingDB()
+    full_redraw = True
+
+    def refresh_sampled_joysticks():
+        nonlocal sampled_joysticks
+        # Remote pads aren't enumerated by SDL; their slots always exist.
+        count = MAX_CONTROLLERS if remote is not None else min(joystick_driver.get_count(), MAX_CONTROLLERS)
+        sampled_joysticks = [(i, open_controller(i)) for i in range(count)]
+
+    def update_feed(cfg):
+        nonlocal feed, feed_cfg
+        if cfg == feed_cfg:
+            return
+        feed_cfg = cfg
+        if feed is not None:
+            feed.close()
+            feed = None
+        if cfg:
+            opts = cfg if isinstance(cfg, dict) else {}
+            try:
+                feed = InputFeed(
+                    target=str(opts.get("target", DEFAULT_TARGET)),
+                    rate_hz=float(opts.get("rate_hz", DEFAULT_RATE_HZ)),
+                )
+            except (OSError, ValueError):
+                feed = None
+            refresh_sampled_joysticks()
+
+    def update_recorder(cfg):
+        nonlocal recorder, record_cfg
+        if cfg == record_cfg:
+            return
+        record_cfg = cfg
+        if recorder is not None:
+            recorder.close()
+            recorder = None
+        if cfg:
+            opts = cfg if isinstance(cfg, dict) else {"path": cfg}
+            try:
+                recorder = InputRecorder(
+                    str(opts["path"]),
+                    keyframe_s=float(opts.get("keyframe_s", DEFAULT_KEYFRAME_S)),
+                )
+            except (KeyError, OSError, ValueError):
+                recorder = None
+            refresh_sampled_joysticks()
+
+    def update_hud(cfg):
+        nonlocal hud, hud_cfg, full_redraw
+        if cfg == hud_cfg:
+            return
+        hud_cfg = cfg
+        full_redraw = True
+        if not cfg:
+            hud = None
+        elif hud is None:
+            hud = PerfHud(target_fps=FPS if fps is None else fps)
+
+    def update_probe(cfg):
+        nonlocal probe, probe_cfg
+        if cfg == probe_cfg:
+            return
+        probe_cfg = cfg
+        if not cfg:
+            probe = None
+        else:
+            opts = cfg if isinstance(cfg, dict) else {}
+            try:
+                probe = LatencyProbe(window=int(opts.get("window", DEFAULT_WINDOW)))
+            except (TypeError, ValueError):
+                probe = None
+
+    def update_frame_cache(cfg):
+        nonlocal cache_cfg, cache_bytes, frame_caches
+        if cfg == cache_cfg:
+            return
+        cache_cfg = cfg
+        if cfg is False:
+            cache_bytes = 0
+        elif isinstance(cfg, dict):
+            try:
+                cache_bytes = int(float(cfg.get("max_mb", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+            except (TypeError, ValueError):
+                cache_bytes = DEFAULT_MAX_BYTES
+        else:
+            cache_bytes = DEFAULT_MAX_BYTES
+        frame_caches = {}
+        live.dirty_layout = True
+
+    def update_axes(cfg):
+        nonlocal axes_cfg, conditioner, frame_caches
+        if cfg == axes_cfg:
+            return
+        axes_cfg = cfg
+        conditioner = AxisConditioner.from_settings(cfg)
+        # Cached frames were drawn with the old response.
+        frame_caches = {}
+        live.dirty_layout = True
+
+    def update_calibration(cfg):
+        nonlocal calibration_cfg, calibration, frame_caches
+        if cfg == calibration_cfg:
+            return
+        calibration_cfg = cfg
+        calibration = open_calibration(cfg)
+        frame_caches = {}
+        live.dirty_layout = True
 
     def rebuild_window(s):
         nonlocal screen, hwnd, mon_w, mon_h, mon_left, mon_top
@@ -276,12 +672,68 @@ def run_overlay_live(initial_settings: dict, udp_port: int = 29301):
         mon_w = mon_right - mon_left
         mon_h = mon_bottom - mon_top
 
-        screen, hwnd = setup_window(mon_w, mon_h, mon_left, mon_top, int(s.get("transparency", 100)))
+        screen, hwnd = setup_window(
+            mon_w, mon_h, mon_left, mon_top, int(s.get("transparency", 100)), visible=live.visible
+        )
         return True
 
+    t_start = time.perf_counter()
+
+    def publish_status(frame_ms):
+        ctrls = []
+        for item in loaded:
+            js = item["joystick"]
+            if js is not None:
+                try:
+                    ctrls.append((item["ci"], js.get_name()))
+                except pygame.error:
+                    continue
+
+        live.controllers = [{"index": ci, "name": name} for ci, name in ctrls]
+        live.stats = {
+            "frame": frame,
+            "fps": round(clock.get_fps(), 2),
+            "frame_ms": round(frame_ms, 3),
+            "visible": live.visible,
+            "overlays": len(loaded),
+            "uptime_s": round(time.perf_counter() - t_start, 1),
+            "control": dict(server.counters),
+        }
+        if feed is not None:
+            live.stats["input_feed"] = feed.stats()
+        if remote is not None:
+            live.stats["remote"] = remote.stats()
+        if recorder is not None:
+            live.stats["input_record"] = recorder.stats()
+        if TRACER.enabled:
+            live.stats["trace"] = TRACER.stats()
+        if probe is not None:
+            live.stats["latency"] = probe.stats()
+        caches = {item["trace_name"][5:]: item["cache"].stats() for item in loaded if item["cache"] is not None}
+        if caches:
+            live.stats["frame_cache"] = caches
+        scenes = {item["trace_name"][5:]: item["scene"].stats() for item in loaded if item["scene"] is not None}
+        if scenes:
+            live.stats["scene"] = scenes
+        calibrated = {str(item["ci"]): item["calibration"]["guid"] for item in loaded if item["calibration"]}
+        if calibrated:
+            live.stats["calibration"] = calibrated
+        mapped = {str(item["ci"]): item["pad"].source for item in loaded if item["pad"] is not None}
+        if mapped:
+            live.stats["mapping"] = mapped
+
+        if shm is not None:
+            shm.write_status(frame, clock.get_fps(), frame_ms, shm_gen, ctrls, shm_applied_us)
+
     def rebuild_layout(s):
-        nonlocal loaded
+        nonlocal loaded, frame_caches, axis_layout, full_redraw
         loaded = []
+        caches = {}
+        full_redraw = True
+        if hud is not None:
+            hud.forget_layout()
+        if probe is not None:
+            probe.forget()
 
         scale = float(s.get("scale", 1.0))
         margin = int(s.get("margin", 24))
@@ -305,66 +757,274 @@ def run_overlay_live(initial_settings: dict, udp_port: int = 29301):
                 surf = make_overlay_surface(out_w, out_h)
 
                 px, py = compute_position_in_rect(corner, margin, out_w, out_h, (0, 0, mon_w, mon_h))
-                js = get_controller(ci)
-
-                loaded.append({"cfg": cfg, "skin": skin, "surf": surf, "pos": (px, py), "joystick": js})
+                js = open_controller(ci)
+                # Read here, once per layout (the stores skip unchanged files).
+                pad, profile = open_pad(skin, js, calibration, mapping_db)
+
+                scene = None
+                cache = None
+                if getattr(skin, "scene", None):
+                    scene = Scene(skin.scene)
+                elif cache_bytes > 0 and getattr(skin, "cacheable", True):
+                    # Kept across relayouts (moves, pad hot-plug) while skin and scale stay.
+                    ck = (ci, skin_name, scale, profile and (profile["guid"], profile.get("captured")))
+                    cache = frame_caches.get(ck) or FrameCache(skin, scale, cache_bytes)
+                    caches[ck] = cache
+
+                loaded.append({
+                    "cfg": cfg, "skin": skin, "surf": surf, "pos": (px, py), "joystick": js, "ci": ci,
+                    "scene": scene, "cache": cache, "last_key": None, "frame": surf, "calibration": profile,
+                    "pad": pad,
+                    "rect": pygame.Rect(px, py, out_w, out_h),
+                    "trace_name": f"draw {skin_name} #{ci}",
+                })
             except Exception:
                 continue
+        frame_caches = caches
+        axis_layout = axis_layout_for(conditioner, loaded)
 
-    s0 = live.snapshot()
-    if not rebuild_window(s0):
-        return
-    rebuild_layout(s0)
-    live.dirty_window = False
-    live.dirty_layout = False
+    try:
+        s0 = live.snapshot()
+        update_frame_cache(s0.get("frame_cache", True))
+        update_axes(s0.get("axes", True))
+        update_calibration(s0.get("calibration", True))
+        if not rebuild_window(s0):
+            return
+        rebuild_layout(s0)
+        live.dirty_window = False
+        live.dirty_layout = False
 
-    clock = pygame.time.Clock()
+        clock = pygame.time.Clock()
+        frame = 0
+        frame_ms = 0.0
 
-    while True:
-        clock.tick(FPS)
+        while True:
+            t_sleep = trace_now()
+            if live.visible:
+                clock.tick(FPS if fps is None else fps)
+            else:
+                # Parked: poll slowly, but a "show" wakes the loop immediately.
+                live.wake.wait(1.0 / STANDBY_FPS)
+                live.wake.clear()
+            TRACER.complete("sleep", t_sleep)
+            frame += 1
+            t_trace = trace_now()
+
+            if live.alloc_request is not None and tracker is None:
+                req, live.alloc_request = live.alloc_request, None
+                # control_server checked both values before queueing the request.
+                tracker = AllocTracker(frames=req["frames"], top=req["top"])
+                tracker.start()
+            if tracker is not None:
+                tracker.begin_frame()
+
+            t_frame = time.perf_counter()
+
+            t_phase = trace_now()
+            if shm is not None:
+                # One unpack_from per frame; decoding only happens on a new gen.
+                got = shm.read_settings(shm_gen)
+                if got is not None:
+                    shm_gen, patch = got
+                    shm_applied_us = now_us()
+                    live.apply_update(patch)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if frame % STATUS_EVERY_FRAMES == 0:
+                publish_status(frame_ms)
+            TRACER.complete("status", t_phase)
+
+            t_phase = trace_now()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                if event.type in (pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED):
+                    live.dirty_layout = True
+                    if feed is not None or recorder is not None:
+                        refresh_sampled_joysticks()
+            TRACER.complete("event pump", t_phase)
+            # Local pad state is current as of the event pump.
+            t_input = trace_now()
+
+            if live.stop:
                 return
 
-        s = live.snapshot()
+            if live.dirty_visible:
+                live.dirty_visible = False
+                if hwnd is not None:
+                    set_window_visible(hwnd, live.visible)
+                else:
+                    # No win32: re-create the window shown or hidden instead.
+                    rebuild_window(live.snapshot())
+                if live.visible:
+                    # Controllers may have been plugged in while parked.
+                    live.dirty_layout = True
+
+            if remote is not None:
+                t_phase = trace_now()
+                remote.advance()
+                TRACER.complete("remote advance", t_phase, "input")
+                t_input = trace_now()
+
+            if feed is not None:
+                t_phase = trace_now()
+                feed.publish(sampled_joysticks)
+                TRACER.complete("feed publish", t_phase, "input")
+
+            if not live.visible:
+                # Parked updates still take effect (on the next show), so ack them.
+                server.send_acks(live.snapshot_with_acks()[1], frame)
+                continue
 
-        if live.stop:
-            return
+            t_phase = trace_now()
+            s, acks = live.snapshot_with_acks()
+            server.send_acks(acks, frame)
+            update_feed(s.get("input_feed"))
+            update_recorder(s.get("input_record"))
+            update_hud(s.get("hud"))
+            update_probe(s.get("latency_probe"))
+            update_frame_cache(s.get("frame_cache", True))
+            update_axes(s.get("axes", True))
+            update_calibration(s.get("calibration", True))
+
+            keys = pygame.key.get_pressed()
+            if keys[pygame.K_ESCAPE]:
+                return
 
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_ESCAPE]:
-            return
+            if hwnd is not None:
+                set_transparency(hwnd, int(s.get("transparency", 100)))
 
-        if hwnd is not None:
-            set_transparency(hwnd, int(s.get("transparency", 100)))
+            if live.dirty_window:
+                if rebuild_window(s):
+                    rebuild_layout(s)
+                live.dirty_window = False
+                live.dirty_layout = False
 
-        if live.dirty_window:
-            if rebuild_window(s):
+            if live.dirty_layout:
                 rebuild_layout(s)
-            live.dirty_window = False
-            live.dirty_layout = False
-
-        if live.dirty_layout:
-            rebuild_layout(s)
-            live.dirty_layout = False
-
-        screen.fill(COLORKEY)
-
-        scale = float(s.get("scale", 1.0))
-
-        for item in loaded:
-            skin = item["skin"]
-            js = item["joystick"]
-            surf = item["surf"]
-
-            surf.fill(COLORKEY)
-            inp = InputState(js, skin.btn_map, skin.axis_map)
-            skin.draw(surf, inp, dz, norm_trigger, scale)
-            screen.blit(surf, item["pos"])
-
-        pygame.display.update()
+                live.dirty_layout = False
+            TRACER.complete("config", t_phase)
+
+            if hud is not None:
+                hud.sample(loaded)
+            if probe is not None:
+                probe.sample([(item["ci"], item["joystick"]) for item in loaded], t_input)
+
+            full = full_redraw
+            full_redraw = False
+            if full:
+                screen.fill(COLORKEY)
+            dirty_rects = []
+
+            scale = float(s.get("scale", 1.0))
+
+            t_phase = trace_now()
+            inputs, skin_dz, skin_trigger = sample_inputs(loaded, axis_layout, conditioner)
+            TRACER.complete("axes", t_phase, "input")
+
+            for row, (item, inp) in enumerate(zip(loaded, inputs)):
+                skin = item["skin"]
+                surf = item["surf"]
+
+                t_phase = trace_now()
+                scene = item["scene"]
+                cache = item["cache"]
+                frame_surf = surf
+                if scene is not None:
+                    if full:
+                        scene.invalidate()
+                    rects = scene.update(surf, inp, skin_dz, skin_trigger, scale, COLORKEY)
+                elif cache is None:
+                    surf.fill(COLORKEY)
+                    skin.draw(surf, inp, skin_dz, skin_trigger, scale)
+                    rects = [surf.get_rect()]
+                else:
+                    key = cache.key(inp)
+                    if key == item["last_key"] and not full:
+                        # Same frame as on screen; nothing to blit or present.
+                        rects = []
+                    else:
+                        item["last_key"] = key
+                        frame_surf = cache.get(key)
+                        if frame_surf is None:
+                            surf.fill(COLORKEY)
+                            replay = cache.input_for(key)
+                            if axis_layout is not None:
+                                replay = axis_layout.replay(row, replay)
+                            skin.draw(surf, replay, skin_dz, skin_trigger, scale)
+                            frame_surf = cache.put(key, surf)
+                        rects = [frame_surf.get_rect()]
+                TRACER.complete(item["trace_name"], t_phase, "draw")
+                if hud is not None:
+                    hud.draw_cost(item, trace_now() - t_phase)
+
+                item["frame"] = frame_surf
+                px, py = item["pos"]
+                dirty_rects.extend(rect.move(px, py) for rect in rects)
+
+            t_phase = trace_now()
+            if full:
+                for item in loaded:
+                    screen.blit(item["frame"], item["pos"])
+            else:
+                # Recompose each changed screen rect from every overlay under
+                # it, in order, so overlapping overlays stay layered.
+                for dst in dirty_rects:
+                    screen.fill(COLORKEY, dst)
+                    for item in loaded:
+                        if item["rect"].colliderect(dst):
+                            px, py = item["pos"]
+                            area = dst.clip(item["rect"]).move(-px, -py)
+                            screen.blit(item["frame"], (area.x + px, area.y + py), area)
+            TRACER.complete("blit", t_phase, "draw")
+
+            if hud is not None:
+                t_phase = trace_now()
+                hud_surf = hud.render(clock.get_fps())
+                hw, hh = hud_surf.get_size()
+                hud_pos = compute_position_in_rect(
+                    hud_corner(hud_cfg), int(s.get("margin", 24)), hw, hh, (0, 0, mon_w, mon_h)
+                )
+                dirty_rects.append(screen.blit(hud_surf, hud_pos))
+                TRACER.complete("hud", t_phase, "draw")
+
+            t_phase = trace_now()
+            if full:
+                pygame.display.update()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+            TRACER.complete("present", t_phase)
+            if probe is not None:
+                probe.presented()
+            frame_ms = (time.perf_counter() - t_frame) * 1000.0
+            if hud is not None:
+                hud.presented(frame_ms)
+
+            if tracker is not None and tracker.end_frame():
+                live.alloc_report = tracker.report
+                tracker = None
+
+            if recorder is not None:
+                t_phase = trace_now()
+                recorder.record(sampled_joysticks)
+                TRACER.complete("record", t_phase, "input")
+
+            TRACER.complete("frame", t_trace)
+
+            if frame_hook is not None and frame_hook(frame, frame_ms) is False:
+                return
 
+    finally:
+        server.close()
+        if tracker is not None:
+            tracker.finish()
+        if remote is not None:
+            remote.close()
+        if feed is not None:
+            feed.close()
+        if recorder is not None:
+            recorder.close()
+        if shm is not None:
+            shm.close()
 
 if __name__ == "__main__":
-    run_overlay_live({}, udp_port=29301)
\ No newline at end of file
+    run_overlay_live({}, udp_port=29301, standby="--standby" in sys.argv)
\ No newline at end of file
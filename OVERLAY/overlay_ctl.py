@@ -0,0 +1,408 @@
+"""
+Command-line control client for a running overlay.
+
+Examples:
+    python overlay_ctl.py ping
+    python overlay_ctl.py stats --watch 2
+    python overlay_ctl.py push scene_gameplay.json
+    python overlay_ctl.py set scale=1.25 margin=40
+    python overlay_ctl.py batch scene_switch.json
+    python overlay_ctl.py load --field scale --values 1.0,1.2 --rate 240 --duration 10
+    python overlay_ctl.py stop
+    python overlay_ctl.py feed --count 20
+    python overlay_ctl.py allocs --frames 240
+    python overlay_ctl.py trace capture overlay_trace.json --seconds 5
+
+Batch files are a JSON list of steps, each {"at": seconds, "settings": {...}};
+steps are applied as patches on top of the overlay's current settings.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+from app_funcs import protocol
+from app_funcs.input_feed import DEFAULT_TARGET, subscribe, iter_frames
+from app_funcs.udp import open_control_socket, send_delta, recv_acks, request, wait_for_ack
+
+DEFAULT_UDP_PORT = 29301
+ACK_TIMEOUT = 1.0
+
+
+# =========================
+# Helpers
+# =========================
+
+def _print_json(obj) -> None:
+    print(json.dumps(obj, indent=2, sort_keys=True))
+
+
+def _percentiles(vals: list[float]) -> dict:
+    if not vals:
+        return {"count": 0}
+    vals = sorted(vals)
+    n = len(vals)
+    return {
+        "count": n,
+        "p50_ms": round(vals[n // 2], 3),
+        "p95_ms": round(vals[min(n - 1, int(n * 0.95))], 3),
+        "p99_ms": round(vals[min(n - 1, int(n * 0.99))], 3),
+        "max_ms": round(vals[-1], 3),
+    }
+
+
+def _parse_value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def _load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Channel:
+    """Binary delta session against one overlay, seeded from its live settings."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.sock = open_control_socket()
+        self.session = protocol.DeltaSession()
+
+        reply = request({"type": "query_settings"}, port)
+        if reply is None:
+            raise SystemExit(f"No overlay answering on UDP port {port}.")
+        self.current = reply.get("settings", {})
+        self.session.reset(self.current)
+
+    def apply(self, patch: dict, wait: bool = True) -> tuple[bool, float | None]:
+        self.current = {**self.current, **patch}
+        if not send_delta(self.session, self.sock, self.current, self.port):
+            return True, None
+        seq = self.session.seq
+        if not wait:
+            return True, None
+        ok = wait_for_ack(self.session, self.sock, seq, ACK_TIMEOUT)
+        return ok, self.session.latencies_ms[-1] if ok else None
+
+    def poll(self) -> list[float]:
+        """Drains acks; returns the latencies of the newly acked updates."""
+        n = recv_acks(self.session, self.sock)
+        return list(self.session.latencies_ms)[-n:] if n else []
+
+    def drain(self, timeout: float) -> list[float]:
+        out = []
+        deadline = time.perf_counter() + timeout
+        while self.session.pending and time.perf_counter() < deadline:
+            out += self.poll()
+            time.sleep(0.001)
+        return out
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+# =========================
+# Commands
+# =========================
+
+def cmd_ping(args) -> int:
+    t0 = time.perf_counter()
+    reply = request({"type": "ping"}, args.port, timeout=args.timeout)
+    if reply is None:
+        print("no reply")
+        return 1
+    print(f"pong in {(time.perf_counter() - t0) * 1000:.2f} ms")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    while True:
+        stats = request({"type": "query_stats"}, args.port, timeout=args.timeout)
+        ctrls = request({"type": "list_controllers"}, args.port, timeout=args.timeout)
+        if stats is None:
+            print(json.dumps({"ok": False, "error": "no reply"}))
+            return 1
+        _print_json({"stats": stats.get("stats", {}), "controllers": (ctrls or {}).get("controllers", [])})
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+def cmd_settings(args) -> int:
+    reply = request({"type": "query_settings"}, args.port, timeout=args.timeout)
+    if reply is None:
+        print("no reply")
+        return 1
+    _print_json(reply.get("settings", {}))
+    return 0
+
+
+def cmd_push(args) -> int:
+    settings = _load_json(args.file)
+    if not isinstance(settings, dict):
+        raise SystemExit(f"{args.file}: expected a JSON object of settings")
+
+    ch = Channel(args.port)
+    try:
+        ok, latency = ch.apply(settings)
+    finally:
+        ch.close()
+    if not ok:
+        print("update sent, no ack")
+        return 1
+    print("no change" if latency is None else f"applied in {latency:.2f} ms (frame {ch.session.acked_frame})")
+    return 0
+
+
+def cmd_set(args) -> int:
+    patch = {}
+    for item in args.fields:
+        key, sep, raw = item.partition("=")
+        if not sep:
+            raise SystemExit(f"expected key=value, got {item!r}")
+        patch[key.strip()] = _parse_value(raw)
+
+    ch = Channel(args.port)
+    try:
+        ok, latency = ch.apply(patch)
+    finally:
+        ch.close()
+    if not ok:
+        print("update sent, no ack")
+        return 1
+    print("no change" if latency is None else f"applied in {latency:.2f} ms (frame {ch.session.acked_frame})")
+    return 0
+
+
+def cmd_stop(args) -> int:
+    reply = request({"type": "stop"}, args.port, timeout=args.timeout)
+    print("stopped" if reply is not None else "no reply")
+    return 0 if reply is not None else 1
+
+
+def cmd_batch(args) -> int:
+    steps = _load_json(args.file)
+    if not isinstance(steps, list):
+        raise SystemExit(f"{args.file}: expected a JSON list of steps")
+    for n, st in enumerate(steps, 1):
+        if not isinstance(st, dict):
+            raise SystemExit(f"{args.file}: step {n}: expected an object, got {st!r}")
+        at = st.get("at", 0.0)
+        if isinstance(at, bool) or not isinstance(at, (int, float)) or not math.isfinite(at):
+            raise SystemExit(f"{args.file}: step {n}: \"at\" must be a number of seconds, got {at!r}")
+        if not isinstance(st.get("settings", {}), dict):
+            raise SystemExit(f"{args.file}: step {n}: \"settings\" must be an object")
+    steps = sorted(steps, key=lambda st: float(st.get("at", 0.0)))
+
+    ch = Channel(args.port)
+    lost = 0
+    t0 = time.perf_counter()
+    try:
+        for st in steps:
+            delay = float(st.get("at", 0.0)) / args.speed - (time.perf_counter() - t0)
+            if delay > 0:
+                time.sleep(delay)
+            ok, latency = ch.apply(st.get("settings", {}))
+            lost += 0 if ok else 1
+            if args.verbose:
+                print(f"t={time.perf_counter() - t0:7.3f}s  {'ok' if ok else 'NO ACK'}  "
+                      f"{'' if latency is None else f'{latency:.2f} ms'}")
+    finally:
+        ch.close()
+
+    _print_json({"steps": len(steps), "unacked": lost, "latency": _percentiles(list(ch.session.latencies_ms))})
+    return 0 if lost == 0 else 1
+
+
+def cmd_load(args) -> int:
+    values = [_parse_value(v) for v in args.values.split(",")]
+    period = 1.0 / args.rate
+
+    ch = Channel(args.port)
+    sent = 0
+    latencies = []
+    frames = set()
+    t0 = time.perf_counter()
+    next_t = t0
+    try:
+        while time.perf_counter() - t0 < args.duration:
+            ch.apply({args.field: values[sent % len(values)]}, wait=False)
+            sent += 1
+
+            got = ch.poll()
+            if got:
+                latencies += got
+                frames.add(ch.session.acked_frame)
+
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        latencies += ch.drain(ACK_TIMEOUT)
+    finally:
+        ch.close()
+
+    elapsed = time.perf_counter() - t0
+    _print_json({
+        "sent": sent,
+        "acked": len(latencies),
+        "send_rate_hz": round(sent / elapsed, 1),
+        "ack_rate_hz": round(len(latencies) / elapsed, 1),
+        "distinct_apply_frames": len(frames),
+        "latency": _percentiles(latencies),
+    })
+    return 0
+
+
+def cmd_feed(args) -> int:
+    # Enable with: overlay_ctl.py set 'input_feed={"target": "239.255.43.21:29310", "rate_hz": 120}'
+    sock = subscribe(args.target, timeout=args.idle_timeout)
+    n = 0
+    try:
+        for fr in iter_frames(sock):
+            print(json.dumps(fr), flush=True)
+            n += 1
+            if args.count and n >= args.count:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return 0 if n else 1
+
+
+def cmd_allocs(args) -> int:
+    reply = request({"type": "alloc_start", "frames": args.frames, "top": args.top}, args.port, timeout=args.timeout)
+    if reply is None:
+        print("no reply")
+        return 1
+    if not reply.get("ok", True):
+        print(f"alloc_start failed: {reply.get('error')}")
+        return 1
+
+    deadline = time.perf_counter() + args.wait
+    while time.perf_counter() < deadline:
+        time.sleep(0.25)
+        reply = request({"type": "query_alloc"}, args.port, timeout=args.timeout)
+        if reply is not None and reply.get("report"):
+            _print_json(reply["report"])
+            return 0
+    print("no report (is the overlay visible?)")
+    return 1
+
+
+def cmd_trace(args) -> int:
+    if args.action in ("start", "capture"):
+        reply = request({"type": "trace_start", "capacity": args.capacity}, args.port, timeout=args.timeout)
+        if reply is None:
+            print("no reply")
+            return 1
+        if not reply.get("ok", True):
+            print(f"trace_start failed: {reply.get('error')}")
+            return 1
+        if args.action == "start":
+            _print_json(reply.get("trace"))
+            return 0
+        time.sleep(args.seconds)
+
+    if args.action in ("dump", "capture"):
+        msg = {"type": "trace_dump"}
+        if args.path:
+            msg["path"] = os.path.abspath(args.path)
+        reply = request(msg, args.port, timeout=max(args.timeout, 5.0))
+        if reply is None:
+            print("no reply")
+            return 1
+        if not reply.get("ok", True):
+            print(f"dump failed: {reply.get('error')}")
+            return 1
+        print(f"{reply.get('events', 0)} events -> {reply.get('path')}")
+        if args.action == "dump":
+            return 0
+
+    reply = request({"type": "trace_stop"}, args.port, timeout=args.timeout)
+    if reply is None:
+        print("no reply")
+        return 1
+    if args.action == "stop":
+        _print_json(reply.get("trace"))
+    return 0
+
+
+# =========================
+# Main
+# =========================
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="overlay_ctl", description="Control a running Retro Overlay.")
+    p.add_argument("--port", type=int, default=DEFAULT_UDP_PORT, help="overlay control UDP port")
+    p.add_argument("--timeout", type=float, default=1.0, help="reply timeout in seconds")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("ping", help="round-trip a ping").set_defaults(fn=cmd_ping)
+
+    sp = sub.add_parser("stats", help="dump live stats and controllers as JSON")
+    sp.add_argument("--watch", type=float, default=0.0, help="repeat every N seconds")
+    sp.set_defaults(fn=cmd_stats)
+
+    sub.add_parser("settings", help="dump current settings as JSON").set_defaults(fn=cmd_settings)
+
+    sp = sub.add_parser("push", help="apply settings from a JSON file")
+    sp.add_argument("file")
+    sp.set_defaults(fn=cmd_push)
+
+    sp = sub.add_parser("set", help="apply key=value patches (values parsed as JSON)")
+    sp.add_argument("fields", nargs="+")
+    sp.set_defaults(fn=cmd_set)
+
+    sub.add_parser("stop", help="stop the overlay").set_defaults(fn=cmd_stop)
+
+    sp = sub.add_parser("batch", help="replay a timed list of updates")
+    sp.add_argument("file")
+    sp.add_argument("--speed", type=float, default=1.0, help="time compression factor")
+    sp.add_argument("-v", "--verbose", action="store_true")
+    sp.set_defaults(fn=cmd_batch)
+
+    sp = sub.add_parser("load", help="flood one field with updates and measure absorption")
+    sp.add_argument("--field", default="scale")
+    sp.add_argument("--values", default="1.0,1.01")
+    sp.add_argument("--rate", type=float, default=240.0, help="updates per second")
+    sp.add_argument("--duration", type=float, default=5.0, help="seconds")
+    sp.set_defaults(fn=cmd_load)
+
+    sp = sub.add_parser("feed", help="print input frames from the overlay's broadcast feed")
+    sp.add_argument("--target", default=DEFAULT_TARGET, help="host:port or unix:/path")
+    sp.add_argument("--count", type=int, default=0, help="stop after N frames")
+    sp.add_argument("--idle-timeout", type=float, default=5.0, help="give up after N idle seconds")
+    sp.set_defaults(fn=cmd_feed)
+
+    sp = sub.add_parser("allocs", help="track per-frame allocations and GC for N frames")
+    sp.add_argument("--frames", type=int, default=120)
+    sp.add_argument("--top", type=int, default=15, help="allocation sites to list")
+    sp.add_argument("--wait", type=float, default=60.0, help="give up after N seconds")
+    sp.set_defaults(fn=cmd_allocs)
+
+    sp = sub.add_parser("trace", help="record frame phases as a Chrome trace (chrome://tracing, Perfetto)")
+    sp.add_argument("action", choices=("start", "stop", "dump", "capture"))
+    sp.add_argument("path", nargs="?", default="", help="output file, written by the overlay process")
+    sp.add_argument("--seconds", type=float, default=5.0, help="capture length")
+    sp.add_argument("--capacity", type=int, default=200_000, help="ring buffer size in events")
+    sp.set_defaults(fn=cmd_trace)
+
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
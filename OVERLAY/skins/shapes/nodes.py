@@ -0,0 +1,349 @@
+"""
+Scene nodes for controller skins.
+
+Usage:
+    from skins.shapes import nodes
+
+    def build_scene(self):
+        return [
+            nodes.Trigger((40, 10, 60, 78), "LT"),
+            nodes.Stick((110, 150), "LX", "LY", travel=10),
+            nodes.GlowButton((340, 195), 14, "A", (70, 220, 200)),
+        ]
+
+    def draw(self, screen, inp, dz, norm_trigger, scale):
+        nodes.draw_nodes(self.scene, screen, inp, dz, norm_trigger, scale)
+
+Geometry is in design space. Every node turns the named inputs it is bound
+to into a small state value (what it will actually paint: a nub position, a
+fill height, on/off), paints from that state, and knows its extent at a
+given scale. The overlay engine (app_funcs/scene.py) compares states per
+frame and repaints only the nodes that changed; draw_nodes() paints
+everything for the plain skin.draw() path.
+"""
+
+from abc import ABC, abstractmethod
+
+import pygame
+
+from skins.shapes import bean
+
+
+def scaled_point(x, y, s):
+    return int(x * s), int(y * s)
+
+
+def scaled_rect(x, y, w, h, s):
+    return pygame.Rect(int(x * s), int(y * s), int(w * s), int(h * s))
+
+
+def square_around(center, radius):
+    cx, cy = center
+    return pygame.Rect(cx - radius, cy - radius, 2 * radius + 1, 2 * radius + 1)
+
+
+# Extra pixels around every extent for antialiasing/rounding slop.
+SLOP = 2
+
+
+class Node(ABC):
+    def state(self, inp, dz, norm_trigger, scale):
+        return None
+
+    @abstractmethod
+    def extent(self, scale) -> pygame.Rect:
+        """Surface rect the node can paint at this scale."""
+
+    @abstractmethod
+    def draw(self, surf, state, scale):
+        """Paints the node from a state() value."""
+
+    def paint(self, surf, inp, dz, norm_trigger, scale):
+        self.draw(surf, self.state(inp, dz, norm_trigger, scale), scale)
+
+
+class Trigger(Node):
+    """Vertical analog trigger bar filled from the bottom."""
+
+    def __init__(self, rect, axis):
+        self.rect = rect
+        self.axis = axis
+
+    def _inner(self, scale):
+        rect = scaled_rect(*self.rect, scale)
+        pad = max(1, int(3 * scale))
+        return rect, pygame.Rect(rect.x + pad, rect.y + pad, rect.w - 2 * pad, rect.h - 2 * pad)
+
+    def state(self, inp, dz, norm_trigger, scale):
+        _rect, inner = self._inner(scale)
+        return int(inner.h * inp.trigger(self.axis, norm_trigger))
+
+    def extent(self, scale):
+        return scaled_rect(*self.rect, scale).inflate(2 * SLOP, 2 * SLOP)
+
+    def draw(self, surf, fill_h, scale):
+        rect, inner = self._inner(scale)
+        pygame.draw.rect(
+            surf, (255, 255, 255), rect,
+            width=max(1, int(2 * scale)),
+            border_radius=int(12 * scale)
+        )
+        pygame.draw.rect(surf, (70, 70, 70), inner, border_radius=int(10 * scale))
+
+        fill = pygame.Rect(inner.x, inner.y + inner.h - fill_h, inner.w, fill_h)
+        pygame.draw.rect(surf, (255, 255, 255), fill, border_radius=int(10 * scale))
+
+
+class Pill(Node):
+    """Rounded bumper-style button with a white glow when pressed."""
+
+    def __init__(self, rect, button, fill):
+        self.rect = rect
+        self.button = button
+        self.fill = fill
+
+    def state(self, inp, dz, norm_trigger, scale):
+        return inp.button(self.button)
+
+    def extent(self, scale):
+        return scaled_rect(*self.rect, scale).inflate(int(10 * scale) + 2 * SLOP, int(8 * scale) + 2 * SLOP)
+
+    def draw(self, surf, on, scale):
+        rect = scaled_rect(*self.rect, scale)
+        if on:
+            glow = rect.inflate(int(10 * scale), int(8 * scale))
+            pygame.draw.rect(surf, (255, 255, 255), glow, border_radius=int(999 * scale))
+        pygame.draw.rect(surf, self.fill, rect, border_radius=int(999 * scale))
+        pygame.draw.rect(surf, (0, 0, 0), rect, width=max(1, int(2 * scale)), border_radius=int(999 * scale))
+
+
+class Stick(Node):
+    """Analog stick: base rings and a nub offset by the (deadzoned) axes."""
+
+    def __init__(self, center, x_axis, y_axis, travel, base_col=(80, 80, 80), nub_col=(255, 255, 255), travel_factor=1.0):
+        self.center = center
+        self.x_axis = x_axis
+        self.y_axis = y_axis
+        self.travel = travel
+        self.travel_factor = travel_factor
+        self.base_col = base_col
+        self.nub_col = nub_col
+
+    def state(self, inp, dz, norm_trigger, scale):
+        cx, cy = scaled_point(*self.center, scale)
+        travel = int(self.travel * scale)
+        if self.travel_factor != 1.0:
+            travel = int(travel * self.travel_factor)
+        return (
+            int(cx + inp.stick(self.x_axis, dz) * travel),
+            int(cy + inp.stick(self.y_axis, dz) * travel),
+        )
+
+    def extent(self, scale):
+        return square_around(scaled_point(*self.center, scale), int(26 * scale) + SLOP)
+
+    def draw(self, surf, nub, scale):
+        center = scaled_point(*self.center, scale)
+        pygame.draw.circle(surf, (40, 40, 40), center, int(26 * scale))
+        pygame.draw.circle(surf, self.base_col, center, int(22 * scale))
+        pygame.draw.circle(surf, self.nub_col, nub, int(8 * scale))
+
+
+class GlowButton(Node):
+    """Round button with an outline and a white ring when pressed.
+
+    scaled=False keeps the 4px glow and 2px outline at every scale.
+    """
+
+    def __init__(self, center, radius, button, fill, scaled=True):
+        self.center = center
+        self.radius = radius
+        self.button = button
+        self.fill = fill
+        self.scaled = scaled
+
+    def _sizes(self, scale):
+        r = int(self.radius * scale)
+        if self.scaled:
+            return r, int(4 * scale), max(1, int(2 * scale))
+        return r, 4, 2
+
+    def state(self, inp, dz, norm_trigger, scale):
+        return inp.button(self.button)
+
+    def extent(self, scale):
+        r, glow, _outline = self._sizes(scale)
+        return square_around(scaled_point(*self.center, scale), r + glow + SLOP)
+
+    def draw(self, surf, on, scale):
+        center = scaled_point(*self.center, scale)
+        r, glow, outline = self._sizes(scale)
+        if on:
+            pygame.draw.circle(surf, (255, 255, 255), center, r + glow)
+        pygame.draw.circle(surf, self.fill, center, r)
+        pygame.draw.circle(surf, (0, 0, 0), center, r, outline)
+
+
+class Dpad(Node):
+    """Plus-shaped d-pad lit per hat direction."""
+
+    def __init__(self, center, hat=0):
+        self.center = center
+        self.hat = hat
+
+    def state(self, inp, dz, norm_trigger, scale):
+        hx, hy = inp.hat(self.hat)
+        return hx, hy
+
+    def extent(self, scale):
+        return square_around(scaled_point(*self.center, scale), int(58 * scale) // 2 + SLOP)
+
+    def draw(self, surf, hat, scale):
+        hx, hy = hat
+        cx, cy = scaled_point(*self.center, scale)
+        w = int(58 * scale)
+        h = int(16 * scale)
+        t = int(58 * scale)
+        v = int(16 * scale)
+
+        horiz = pygame.Rect(cx - w // 2, cy - h // 2, w, h)
+        vert = pygame.Rect(cx - v // 2, cy - t // 2, v, t)
+
+        base = (210, 210, 210)
+        edge = (30, 30, 30)
+
+        pygame.draw.rect(surf, base, horiz, border_radius=int(6 * scale))
+        pygame.draw.rect(surf, base, vert, border_radius=int(6 * scale))
+        pygame.draw.rect(surf, edge, horiz, width=max(1, int(2 * scale)), border_radius=int(6 * scale))
+        pygame.draw.rect(surf, edge, vert, width=max(1, int(2 * scale)), border_radius=int(6 * scale))
+
+        hi = (255, 255, 255)
+        lo = (155, 155, 155)
+
+        pygame.draw.rect(surf, hi if hy == 1 else lo, pygame.Rect(cx - v // 2, cy - t // 2, v, t // 2), border_radius=int(5 * scale))
+        pygame.draw.rect(surf, hi if hy == -1 else lo, pygame.Rect(cx - v // 2, cy, v, t // 2), border_radius=int(5 * scale))
+        pygame.draw.rect(surf, hi if hx == -1 else lo, pygame.Rect(cx - w // 2, cy - h // 2, w // 2, h), border_radius=int(5 * scale))
+        pygame.draw.rect(surf, hi if hx == 1 else lo, pygame.Rect(cx, cy - h // 2, w // 2, h), border_radius=int(5 * scale))
+
+
+class Block(Node):
+    """Rounded rectangle that switches color when its button is pressed.
+
+    rect is relative to anchor, both in design space (each scaled on its own).
+    """
+
+    def __init__(self, rect, button, fill, on_fill=(255, 255, 255), radius=999, anchor=(0, 0)):
+        self.rect = rect
+        self.button = button
+        self.fill = fill
+        self.on_fill = on_fill
+        self.radius = radius
+        self.anchor = anchor
+
+    def _rect(self, scale):
+        ax, ay = scaled_point(*self.anchor, scale)
+        x, y, w, h = self.rect
+        return pygame.Rect(ax + int(x * scale), ay + int(y * scale), int(w * scale), int(h * scale))
+
+    def state(self, inp, dz, norm_trigger, scale):
+        return inp.button(self.button)
+
+    def extent(self, scale):
+        return self._rect(scale).inflate(2 * SLOP, 2 * SLOP)
+
+    def draw(self, surf, on, scale):
+        pygame.draw.rect(
+            surf,
+            self.on_fill if on else self.fill,
+            self._rect(scale),
+            border_radius=int(self.radius * scale),
+        )
+
+
+class Bean(Node):
+    """Curved bean button (shapes/bean.py) behind a larger white bean when pressed."""
+
+    def __init__(
+        self, center, button, rx, ry, thickness, rotation_deg=0,
+        fill=(170, 170, 170), glow=(255, 255, 255), start_deg=20, end_deg=160, steps=40,
+    ):
+        self.center = center
+        self.button = button
+        self.rx = rx
+        self.ry = ry
+        self.thickness = thickness
+        self.rotation_deg = rotation_deg
+        self.fill = fill
+        self.glow = glow
+        self.start_deg = start_deg
+        self.end_deg = end_deg
+        self.steps = steps
+
+    def state(self, inp, dz, norm_trigger, scale):
+        return inp.button(self.button)
+
+    def extent(self, scale):
+        reach = max(self.rx, self.ry) * 1.10 + self.thickness * 1.25
+        return square_around(scaled_point(*self.center, scale), int(reach * scale) + SLOP)
+
+    def draw(self, surf, on, scale):
+        center = scaled_point(*self.center, scale)
+        if on:
+            bean.draw(
+                surf,
+                center=center,
+                rx=self.rx * scale * 1.10,
+                ry=self.ry * scale * 1.10,
+                thickness=self.thickness * scale * 1.25,
+                start_deg=self.start_deg,
+                end_deg=self.end_deg,
+                rotation_deg=self.rotation_deg,
+                color=self.glow,
+                steps=self.steps,
+            )
+        bean.draw(
+            surf,
+            center=center,
+            rx=self.rx * scale,
+            ry=self.ry * scale,
+            thickness=self.thickness * scale,
+            start_deg=self.start_deg,
+            end_deg=self.end_deg,
+            rotation_deg=self.rotation_deg,
+            color=self.fill,
+            steps=self.steps,
+        )
+
+
+class Shape(Node):
+    """Custom node from callables.
+
+    state(inp, dz, norm_trigger, scale) -> hashable
+    draw(surf, state, scale)
+    extent(scale) -> pygame.Rect
+    """
+
+    def __init__(self, state, draw, extent):
+        self._state = state
+        self._draw = draw
+        self._extent = extent
+
+    def state(self, inp, dz, norm_trigger, scale):
+        return self._state(inp, dz, norm_trigger, scale)
+
+    def extent(self, scale):
+        return self._extent(scale)
+
+    def draw(self, surf, state, scale):
+        self._draw(surf, state, scale)
+
+
+def pressed(button):
+    """State function for a Shape that only depends on one button."""
+    return lambda inp, dz, norm_trigger, scale: inp.button(button)
+
+
+def draw_nodes(scene, surf, inp, dz, norm_trigger, scale):
+    """Paints every node in order (the immediate-mode skin.draw path)."""
+    for node in scene:
+        node.paint(surf, inp, dz, norm_trigger, scale)